@@ -3,12 +3,14 @@
 HyperCLOVA X Chat Completion API 클라이언트
 """
 
-import http.client
 import json
 import os
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
+from clova_transport import get_clova_transport
+from rate_limiter import get_rate_limiter, is_throttled_response
+
 class ClovaChatClient:
     """HyperCLOVA X Chat Completion API 클라이언트"""
     
@@ -25,6 +27,9 @@ class ClovaChatClient:
         # HyperCLOVA X Chat Completion API 엔드포인트
         self.chat_url = "https://clovastudio.stream.ntruss.com/v3/chat-completions/HCX-005"
         
+        # 공용 keep-alive 전송 계층
+        self.transport = get_clova_transport()
+        
         self.headers = {
             "Authorization": self.api_key,
             "X-NCP-CLOVASTUDIO-REQUEST-ID": self.request_id,
@@ -60,16 +65,22 @@ class ClovaChatClient:
             # print(f"Request ID: {self.request_id}")
             # print(f"API Key (처음 20자): {self.api_key[:20]}...")
             
-            # HTTP 연결 및 요청
-            conn = http.client.HTTPSConnection("clovastudio.stream.ntruss.com")
-            conn.request('POST', '/v3/chat-completions/HCX-005', 
-                        json.dumps(request_data), self.headers)
-            
-            response = conn.getresponse()
+            # 공유 Rate Limiter로 Chat API 요청 한도 관리
+            rate_limiter = get_rate_limiter("chat")
+            rate_limiter.acquire()
             
-            print(f"응답 상태: {response.status} {response.reason}")
-            
-            if response.status == 200:
+            # 공용 keep-alive 전송 계층으로 스트리밍 요청 (연결 재사용)
+            with self.transport.stream('/v3/chat-completions/HCX-005', request_data, self.headers) as response:
+                print(f"응답 상태: {response.status} {response.reason}")
+                if is_throttled_response(response.status, None):
+                    rate_limiter.report_throttled()
+                elif response.status == 200:
+                    rate_limiter.report_success()
+                
+                if response.status != 200:
+                    print(f"Chat API 호출 실패: {response.status} {response.reason}")
+                    return None
+                
                 final_answer = ""
                 is_result_event = False
                 print("🔍 응답 스트림 처리 중...")
@@ -115,13 +126,8 @@ class ClovaChatClient:
                             print(f"JSON 파싱 오류(분리): {e}")
                         break
 
-                conn.close()
-                print(f"📊 최종 답변 길이: {len(final_answer)}")
-                return final_answer.strip()
-            else:
-                print(f"Chat API 호출 실패: {response.status} {response.reason}")
-                conn.close()
-                return None
+            print(f"📊 최종 답변 길이: {len(final_answer)}")
+            return final_answer.strip()
                 
         except Exception as e:
             print(f"HyperCLOVA X Chat API 호출 오류: {e}")
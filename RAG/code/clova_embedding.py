@@ -3,54 +3,227 @@
 CLOVA X Embedding API 직접 호출 클래스 (업데이트된 방식)
 """
 
-import http.client
-import json
+import asyncio
 import os
+import threading
 import time
-from typing import List, Optional
+from collections import deque
+from typing import List, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
 from llama_index.core.embeddings import BaseEmbedding
 
+from config import (
+    get_embedding_cache_enabled,
+    get_embedding_cache_path,
+    get_embedding_cache_max_entries,
+    get_embedding_cache_max_age_days,
+    get_embedding_max_concurrency,
+    get_embedding_request_timeout,
+)
+from clova_transport import get_clova_transport
+from embedding_cache import EmbeddingCache
+from pipeline_metrics import get_pipeline_metrics
+from rate_limiter import get_rate_limiter, is_throttled_response
+
+class EmbeddingError(Exception):
+    """임베딩 생성 실패 (API 오류, 재시도 소진, 잘못된 응답 형태)"""
+
+
+class SharedConcurrencyLimit:
+    """여러 이벤트 루프가 함께 쓰는 동시 요청 수 제한 (비동기 컨텍스트 매니저)
+
+    asyncio.Semaphore는 루프 하나에만 묶이므로, 검색 스레드마다 asyncio.run으로 배치를 돌리면
+    루프마다 따로 세게 된다. 여기서는 스레드 잠금으로 전체 개수를 세고,
+    자리가 없으면 각 루프의 Future로 기다렸다가 자리가 나면 해당 루프에 깨워 넘겨준다.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._active = 0
+        self._waiters = deque()  # (loop, future)
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> int:
+        with self._lock:
+            return self._active
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                waiting = (loop, future) in self._waiters
+                if waiting:
+                    self._waiters.remove((loop, future))
+            # 자리를 넘겨받은 뒤 취소되었으면 반환 (넘겨주기 전 취소는 _hand_over가 처리)
+            if not waiting and future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """자리 반환 - 기다리는 루프가 있으면 개수를 줄이지 않고 그대로 넘겨줌"""
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+                except RuntimeError:
+                    # 이미 종료된 루프의 대기자는 건너뜀
+                    continue
+            self._active -= 1
+
+    def _hand_over(self, future: asyncio.Future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
 class EmbeddingExecutor:
     """CLOVA X Embedding API 직접 호출 클래스 (업데이트된 방식)"""
     
+    endpoint = '/v1/api-tools/embedding/v2'
+    max_retries = 5
+    
     def __init__(self, host, api_key, request_id):
         self._host = host
         self._api_key = api_key
         self._request_id = request_id
         self._total_requests = 0
         self._completed_requests = 0
+        self._rate_limiter = get_rate_limiter("embedding")
+        self._max_concurrency = get_embedding_max_concurrency()
+        self._request_timeout = get_embedding_request_timeout()
+        # 비동기 동시 요청 수 제한 (모든 이벤트 루프 공용, 처음 사용할 때 생성)
+        self._concurrency_limit = None
+        self._concurrency_lock = threading.Lock()
+        # 공용 keep-alive 전송 계층 (동기/비동기 모두 연결 재사용)
+        self._transport = get_clova_transport(host)
     
-    def _send_request(self, completion_request):
-        headers = {
+    def _headers(self):
+        return {
             'Content-Type': 'application/json; charset=utf-8',
             'Authorization': self._api_key,
             'X-NCP-CLOVASTUDIO-REQUEST-ID': self._request_id
         }
-        
-        conn = http.client.HTTPSConnection(self._host)
-        conn.request('POST', '/v1/api-tools/embedding/v2', json.dumps(completion_request), headers)
-        response = conn.getresponse()
-        result = json.loads(response.read().decode(encoding='utf-8'))
-        conn.close()
-        return result
+    
+    def _record_call(self, completion_request, start: float, status):
+        """호출 지연 시간/상태 코드/요청 글자 수 계측"""
+        get_pipeline_metrics().record_call("embedding", time.time() - start, status,
+                                           chars=len(completion_request.get("text", "")))
+    
+    def _send_request(self, completion_request):
+        start = time.time()
+        try:
+            http_status, res = self._transport.post_json(self.endpoint, completion_request, self._headers(),
+                                                         timeout=self._request_timeout)
+        except Exception as e:
+            self._record_call(completion_request, start, type(e).__name__)
+            raise
+        self._record_call(completion_request, start, res.get('status', {}).get('code') or http_status)
+        return http_status, res
     
     def execute(self, completion_request):
         # 진행상황 업데이트
         self._completed_requests += 1
         progress = (self._completed_requests / self._total_requests * 100) if self._total_requests > 0 else 0
         
-        # API 요청 제한을 위한 지연
-        print(f"⏳ 20초 지연 중... ({self._completed_requests}/{self._total_requests} - {progress:.1f}%)")
-        time.sleep(20)  # 20초 지연 (rate limit 방지)
-        print("지연 완료, 다음 요청 진행")
+        for attempt in range(self.max_retries + 1):
+            # 공유 Rate Limiter로 요청 한도 관리 (고정 지연 대신 예산이 생길 때까지만 대기)
+            waited = self._rate_limiter.acquire()
+            get_pipeline_metrics().add_time("embedding.rate_limit_sleep", waited)
+            if waited >= 1:
+                print(f"⏳ 요청 한도 대기 {waited:.1f}초 ({self._completed_requests}/{self._total_requests} - {progress:.1f}%)")
+            
+            http_status, res = self._send_request(completion_request)
+            status_code = res.get('status', {}).get('code')
+            if status_code == '20000':
+                self._rate_limiter.report_success()
+                return res['result']
+            
+            if is_throttled_response(http_status, status_code):
+                self._rate_limiter.report_throttled()
+                print(f"임베딩 API 요청 한도 초과 - 재시도 {attempt + 1}/{self.max_retries}")
+                continue
+            
+            print(f"임베딩 API 응답 오류: {res}")
+            raise EmbeddingError(f"API 응답 오류: {res.get('status', {})}")
         
-        res = self._send_request(completion_request)
-        if res['status']['code'] == '20000':
-            return res['result']
-        else:
+        print("임베딩 API 요청 한도 초과 - 재시도 횟수 소진")
+        raise EmbeddingError("요청 한도 초과 - 재시도 횟수 소진")
+    
+    def _get_concurrency_limit(self) -> SharedConcurrencyLimit:
+        """동시 요청 수 제한 반환 (스레드마다 이벤트 루프가 달라도 합계를 max_concurrency로 제한)"""
+        with self._concurrency_lock:
+            if self._concurrency_limit is None:
+                self._concurrency_limit = SharedConcurrencyLimit(self._max_concurrency)
+            return self._concurrency_limit
+    
+    async def aclose(self):
+        """현재 이벤트 루프가 만든 비동기 클라이언트 종료"""
+        await self._transport.aclose()
+    
+    async def _asend_request(self, completion_request):
+        async with self._get_concurrency_limit():
+            start = time.time()
+            try:
+                http_status, res = await self._transport.apost_json(self.endpoint, completion_request, self._headers(),
+                                                                    timeout=self._request_timeout)
+            except Exception as e:
+                self._record_call(completion_request, start, type(e).__name__)
+                raise
+            self._record_call(completion_request, start, res.get('status', {}).get('code') or http_status)
+            return http_status, res
+    
+    async def aexecute(self, completion_request):
+        """비동기 임베딩 요청 (동시성은 공용 동시 요청 수 제한, 요청 한도는 공유 Rate Limiter로 제한)"""
+        self._completed_requests += 1
+        
+        for attempt in range(self.max_retries + 1):
+            # 예약은 즉시 처리하고 대기는 이벤트 루프를 막지 않도록 asyncio.sleep 사용
+            waited = self._rate_limiter.reserve()
+            if waited > 0:
+                get_pipeline_metrics().add_time("embedding.rate_limit_sleep", waited)
+                await asyncio.sleep(waited)
+            
+            try:
+                http_status, res = await self._asend_request(completion_request)
+            except httpx.TimeoutException:
+                print(f"임베딩 API 타임아웃 ({self._request_timeout}초) - 재시도 {attempt + 1}/{self.max_retries}")
+                continue
+            
+            status_code = res.get('status', {}).get('code')
+            if status_code == '20000':
+                self._rate_limiter.report_success()
+                return res['result']
+            
+            if is_throttled_response(http_status, status_code):
+                self._rate_limiter.report_throttled()
+                print(f"임베딩 API 요청 한도 초과 - 재시도 {attempt + 1}/{self.max_retries}")
+                continue
+            
             print(f"임베딩 API 응답 오류: {res}")
-            return 'Error'
+            raise EmbeddingError(f"API 응답 오류: {res.get('status', {})}")
+        
+        print("임베딩 API 재시도 횟수 소진")
+        raise EmbeddingError("요청 한도 초과 또는 타임아웃 - 재시도 횟수 소진")
 
 class ClovaEmbeddingAPI(BaseEmbedding):
     """CLOVA X Embedding API 래퍼 클래스 (LlamaIndex 호환)"""
@@ -67,32 +240,84 @@ class ClovaEmbeddingAPI(BaseEmbedding):
             api_key = f'Bearer {api_key}'
         
         # EmbeddingExecutor 초기화 (Pydantic 필드 문제 회피)
-        object.__setattr__(self, '_embedding_executor', EmbeddingExecutor(
+        embedding_executor = EmbeddingExecutor(
             host='clovastudio.stream.ntruss.com',
             api_key=api_key,
             request_id=request_id
-        ))
+        )
+        object.__setattr__(self, '_embedding_executor', embedding_executor)
+        
+        # 영구 임베딩 캐시 (동일 텍스트는 API 호출 생략)
+        embedding_cache = None
+        if get_embedding_cache_enabled():
+            try:
+                embedding_cache = EmbeddingCache(
+                    db_path=get_embedding_cache_path(),
+                    model=f"clova:{embedding_executor._host}{embedding_executor.endpoint}",
+                    max_entries=get_embedding_cache_max_entries(),
+                    max_age_days=get_embedding_cache_max_age_days()
+                )
+            except Exception as e:
+                print(f"⚠️ 임베딩 캐시 초기화 실패 (캐시 없이 진행): {e}")
+        object.__setattr__(self, '_embedding_cache', embedding_cache)
         
         print(f"CLOVA X Embedding API 클라이언트 초기화 완료")
         # print(f"API 키 설정: {'완료' if api_key else '미완료'}")
         # print(f"임베딩 Request ID 설정: {'완료' if request_id else '미완료'}")
     
+    def _get_cached_embedding(self, text: str) -> Optional[List[float]]:
+        """캐시에 저장된 임베딩 조회"""
+        if self._embedding_cache is None:
+            return None
+        cached = self._embedding_cache.get(text)
+        if cached is not None and len(cached) == 1024:
+            return cached
+        return None
+    
+    def _parse_embedding(self, text: str, result) -> List[float]:
+        """API 결과에서 임베딩 추출 및 검증 (성공 시 캐시에 저장, 실패 시 EmbeddingError)"""
+        embedding = result.get('embedding') if isinstance(result, dict) else None
+        if not isinstance(embedding, list):
+            print(f"임베딩 형태 오류: {type(embedding)}")
+            raise EmbeddingError(f"임베딩 형태 오류: {type(embedding).__name__}")
+        if len(embedding) != 1024:  # CLOVA X 임베딩은 1024차원
+            print(f"임베딩 길이 오류: {len(embedding)}, 기대값: 1024")
+            raise EmbeddingError(f"임베딩 길이 오류: {len(embedding)}")
+        if self._embedding_cache is not None:
+            self._embedding_cache.put(text, embedding)
+        return embedding
+    
+    def _embed(self, text: str) -> List[float]:
+        """텍스트 임베딩 생성 (실패 시 예외 발생)"""
+        cached = self._get_cached_embedding(text)
+        if cached is not None:
+            return cached
+        result = self._embedding_executor.execute({"text": text})
+        return self._parse_embedding(text, result)
+    
+    async def _aembed(self, text: str) -> List[float]:
+        """비동기 텍스트 임베딩 생성 (실패 시 예외 발생)"""
+        cached = self._get_cached_embedding(text)
+        if cached is not None:
+            return cached
+        result = await self._embedding_executor.aexecute({"text": text})
+        return self._parse_embedding(text, result)
+    
+    async def _aembed_or_error(self, text: str) -> Tuple[Optional[List[float]], Optional[str]]:
+        try:
+            return await self._aembed(text), None
+        except Exception as e:
+            print(f"임베딩 생성 오류: {e}")
+            return None, str(e) or type(e).__name__
+    
     def _get_query_embedding(self, query: str) -> List[float]:
-        """쿼리 텍스트의 임베딩 생성 (내부 메서드)"""
+        """쿼리 텍스트의 임베딩 생성 (내부 메서드)
+        
+        LlamaIndex 인터페이스 호환을 위해 실패 시 영벡터를 반환한다.
+        저장용 임베딩은 실패를 구분할 수 있는 get_text_embeddings_or_errors 를 사용할 것.
+        """
         try:
-            request_data = {"text": query}
-            result = self._embedding_executor.execute(request_data)
-            if result == 'Error':
-                print(f"임베딩 API 오류 - 요청 데이터: {request_data}")
-                return [0.0] * 1024
-            embedding = result.get('embedding', [0.0] * 1024)
-            if not isinstance(embedding, list):
-                print(f"임베딩 형태 오류: {type(embedding)}")
-                return [0.0] * 1024  # CLOVA X 임베딩은 1024차원
-            if len(embedding) != 1024:
-                print(f"임베딩 길이 오류: {len(embedding)}, 기대값: 1024")
-                return [0.0] * 1024
-            return embedding
+            return self._embed(query)
         except Exception as e:
             print(f"임베딩 생성 오류: {e}")
             return [0.0] * 1024
@@ -101,10 +326,18 @@ class ClovaEmbeddingAPI(BaseEmbedding):
         """텍스트의 임베딩 생성 (내부 메서드)"""
         return self._get_query_embedding(text)
     
-    def _aget_query_embedding(self, query: str) -> List[float]:
+    async def _aget_query_embedding(self, query: str) -> List[float]:
         """비동기 쿼리 텍스트의 임베딩 생성 (내부 메서드)"""
-        import asyncio
-        return asyncio.run(self._get_query_embedding(query))
+        vector, _ = await self._aembed_or_error(query)
+        return vector if vector is not None else [0.0] * 1024
+    
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        """비동기 텍스트의 임베딩 생성 (내부 메서드)"""
+        return await self._aget_query_embedding(text)
+    
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트를 동시에 임베딩 (순서 유지)"""
+        return list(await asyncio.gather(*(self._aget_text_embedding(text) for text in texts)))
     
     def get_query_embedding(self, query: str) -> List[float]:
         """쿼리 텍스트의 임베딩 생성"""
@@ -114,13 +347,62 @@ class ClovaEmbeddingAPI(BaseEmbedding):
         """텍스트의 임베딩 생성"""
         return self._get_text_embedding(text)
     
-    def get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """여러 텍스트의 임베딩 생성"""
-        embeddings = []
+    async def aget_query_embedding(self, query: str) -> List[float]:
+        """비동기 쿼리 텍스트의 임베딩 생성"""
+        return await self._aget_query_embedding(query)
+    
+    async def aget_text_embedding(self, text: str) -> List[float]:
+        """비동기 텍스트의 임베딩 생성"""
+        return await self._aget_text_embedding(text)
+    
+    async def aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """비동기로 여러 텍스트의 임베딩 생성"""
+        return await self._aget_text_embeddings(texts)
+    
+    async def aget_text_embeddings_or_errors(self, texts: List[str]) -> List[Tuple[Optional[List[float]], Optional[str]]]:
+        """비동기로 여러 텍스트를 임베딩하고 (벡터, 오류) 목록 반환 - 실패한 항목은 (None, 오류 메시지)"""
+        return list(await asyncio.gather(*(self._aembed_or_error(text) for text in texts)))
+    
+    async def _run_embedding_batch(self, texts: List[str]) -> List[Tuple[Optional[List[float]], Optional[str]]]:
+        """asyncio.run 용 배치 실행 (루프 종료 전 이 루프가 만든 클라이언트 정리)"""
+        try:
+            return await self.aget_text_embeddings_or_errors(texts)
+        finally:
+            await self._embedding_executor.aclose()
+    
+    def get_text_embeddings_or_errors(self, texts: List[str]) -> List[Tuple[Optional[List[float]], Optional[str]]]:
+        """여러 텍스트를 임베딩하고 (벡터, 오류) 목록 반환 (이벤트 루프 밖에서는 동시 요청, 안에서는 순차 처리)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if len(texts) > 1:
+                return asyncio.run(self._run_embedding_batch(texts))
+        
+        # 단건이거나 이미 실행 중인 이벤트 루프 안에서는 asyncio.run 을 쓸 수 없으므로 순차 처리
+        results = []
         for text in texts:
-            embedding = self.get_text_embedding(text)
-            embeddings.append(embedding)
-        return embeddings
+            try:
+                results.append((self._embed(text), None))
+            except Exception as e:
+                print(f"임베딩 생성 오류: {e}")
+                results.append((None, str(e) or type(e).__name__))
+        return results
+    
+    def get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트의 임베딩 생성 (실패한 항목은 영벡터)"""
+        return [vector if vector is not None else [0.0] * 1024
+                for vector, _ in self.get_text_embeddings_or_errors(texts)]
+    
+    def get_cache_stats(self) -> Optional[dict]:
+        """임베딩 캐시 적중/실패 통계 (캐시 비활성화 시 None)"""
+        if self._embedding_cache is None:
+            return None
+        return self._embedding_cache.get_stats()
+    
+    @property
+    def model_id(self) -> str:
+        """저장된 벡터의 출처 확인용 모델 식별자"""
+        return f"clova:{self._embedding_executor.endpoint}"
     
     @property
     def dimension(self) -> int:
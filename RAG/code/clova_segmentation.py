@@ -3,11 +3,12 @@
 CLOVA Studio 세그멘테이션 API 클라이언트
 """
 
-import requests
-import json
-import http.client
+import time
 from typing import List, Dict, Any, Optional
 from config import get_clova_api_key, get_clova_segmentation_request_id
+from clova_transport import get_clova_transport
+from pipeline_metrics import get_pipeline_metrics
+from rate_limiter import get_rate_limiter, is_throttled_response
 
 class ClovaSegmentationClient:
     """CLOVA Studio 세그멘테이션 API 클라이언트"""
@@ -23,6 +24,9 @@ class ClovaSegmentationClient:
         # CLOVA 세그멘테이션 API 엔드포인트
         self.segmentation_url = "https://clovastudio.stream.ntruss.com/v1/api-tools/segmentation"
         
+        # 공용 keep-alive 전송 계층
+        self.transport = get_clova_transport()
+        
         # 기본 헤더
         self.headers = {
             "Authorization": self.api_key,
@@ -53,11 +57,25 @@ class ClovaSegmentationClient:
                 "postProcess": True  # 후처리 활성화
             }
             
-            conn = http.client.HTTPSConnection("clovastudio.stream.ntruss.com")
-            conn.request('POST', '/v1/api-tools/segmentation', json.dumps(body), headers)
-            response = conn.getresponse()
-            result = json.loads(response.read().decode('utf-8'))
-            conn.close()
+            # 공유 Rate Limiter로 세그멘테이션 API 요청 한도 관리
+            rate_limiter = get_rate_limiter("segmentation")
+            metrics = get_pipeline_metrics()
+            metrics.add_time("segmentation.rate_limit_sleep", rate_limiter.acquire())
+            
+            # 공용 keep-alive 전송 계층으로 요청 (연결 재사용, 지연 시간/상태 코드 계측)
+            start = time.time()
+            try:
+                http_status, result = self.transport.post_json('/v1/api-tools/segmentation', body, headers)
+            except Exception as e:
+                metrics.record_call("segmentation", time.time() - start, type(e).__name__, chars=len(text))
+                raise
+            metrics.record_call("segmentation", time.time() - start,
+                                result.get('status', {}).get('code') or http_status, chars=len(text))
+            
+            if is_throttled_response(http_status, result.get('status', {}).get('code')):
+                rate_limiter.report_throttled()
+            elif result.get('status', {}).get('code') == '20000':
+                rate_limiter.report_success()
             
             if result['status']['code'] == '20000':
                 # 세그멘테이션 결과 처리
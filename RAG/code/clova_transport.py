@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+CLOVA Studio 공용 HTTPS 전송 계층
+- 호스트별 keep-alive 연결 풀 (요청마다 TCP/TLS 핸드셰이크 반복 방지)
+- 연결/읽기 타임아웃 설정
+- 요청 수, 상태 코드별 응답 수, 지연 시간 카운터
+- 비동기 경로용 httpx.AsyncClient 공유 (이벤트 루프별 - 스레드마다 asyncio.run을 실행해도 서로 덮어쓰지 않음)
+"""
+
+import asyncio
+import http.client
+import json
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+
+from config import get_clova_connect_timeout, get_clova_read_timeout, get_clova_pool_size
+
+CLOVA_STUDIO_HOST = "clovastudio.stream.ntruss.com"
+
+# 재사용한 연결이 서버 쪽에서 이미 끊긴 경우 발생하는 예외 (새 연결로 1회 재시도)
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+def _parse_json_body(status: int, body: bytes) -> Dict[str, Any]:
+    """응답 본문을 JSON으로 변환 (JSON이 아니면 CLOVA 형식의 오류 응답으로 감쌈)"""
+    text = body.decode('utf-8', errors='replace')
+    try:
+        return json.loads(text)
+    except ValueError:
+        return {'status': {'code': str(status), 'message': text[:200]}}
+
+
+class ClovaTransport:
+    """호스트 하나에 대한 keep-alive HTTPS 연결 풀"""
+
+    def __init__(self, host: str, pool_size: int = 8,
+                 connect_timeout: float = 5.0, read_timeout: float = 120.0):
+        self.host = host
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self._idle = []
+        self._lock = threading.Lock()
+        # 이벤트 루프 → httpx.AsyncClient (루프가 사라지면 항목도 제거)
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "total_latency_seconds": 0.0,
+            "max_latency_seconds": 0.0,
+            "status_counts": {}
+        }
+
+    # ------------------------------------------------------------------
+    # 연결 풀
+    # ------------------------------------------------------------------
+    def _new_connection(self) -> http.client.HTTPSConnection:
+        conn = http.client.HTTPSConnection(self.host, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        with self._lock:
+            self._stats["connections_created"] += 1
+        return conn
+
+    def _acquire(self) -> Tuple[http.client.HTTPSConnection, bool]:
+        """유휴 연결을 꺼내거나 새 연결 생성 (반환값: 연결, 재사용 여부)"""
+        with self._lock:
+            if self._idle:
+                self._stats["connections_reused"] += 1
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, conn: http.client.HTTPSConnection):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _record(self, status: Optional[int], latency: float):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["total_latency_seconds"] += latency
+            self._stats["max_latency_seconds"] = max(self._stats["max_latency_seconds"], latency)
+            if status is None:
+                self._stats["errors"] += 1
+            else:
+                key = str(status)
+                self._stats["status_counts"][key] = self._stats["status_counts"].get(key, 0) + 1
+
+    def _send(self, method: str, path: str, body: Optional[bytes], headers: Dict[str, str],
+              timeout: Optional[float]) -> Tuple[http.client.HTTPSConnection, http.client.HTTPResponse]:
+        """요청 전송 후 (연결, 응답) 반환 - 끊긴 재사용 연결은 새 연결로 1회 재시도"""
+        for attempt in range(2):
+            conn, reused = self._acquire()
+            try:
+                conn.sock.settimeout(timeout or self.read_timeout)
+                conn.request(method, path, body, headers)
+                return conn, conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused or attempt == 1:
+                    raise
+            except Exception:
+                conn.close()
+                raise
+
+    # ------------------------------------------------------------------
+    # 동기 요청
+    # ------------------------------------------------------------------
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> Tuple[int, bytes]:
+        """요청 후 (HTTP 상태 코드, 응답 본문) 반환"""
+        start = time.time()
+        try:
+            conn, response = self._send(method, path, body, headers or {}, timeout)
+            data = response.read()
+        except Exception:
+            self._record(None, time.time() - start)
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        self._record(response.status, time.time() - start)
+        return response.status, data
+
+    def post_json(self, path: str, payload: Dict[str, Any], headers: Dict[str, str],
+                  timeout: Optional[float] = None) -> Tuple[int, Dict[str, Any]]:
+        """JSON POST 요청 후 (HTTP 상태 코드, 파싱된 JSON) 반환"""
+        status, body = self.request('POST', path, json.dumps(payload).encode('utf-8'), headers, timeout)
+        return status, _parse_json_body(status, body)
+
+    @contextmanager
+    def stream(self, path: str, payload: Dict[str, Any], headers: Dict[str, str],
+               timeout: Optional[float] = None):
+        """스트리밍 응답(SSE 등)용 POST - 응답 객체를 넘겨주고, 끝까지 읽었으면 연결을 풀에 반환"""
+        start = time.time()
+        try:
+            conn, response = self._send('POST', path, json.dumps(payload).encode('utf-8'), headers, timeout)
+        except Exception:
+            self._record(None, time.time() - start)
+            raise
+
+        try:
+            yield response
+        finally:
+            # 스트림을 중간에 멈춘 경우 남은 데이터가 있으므로 연결을 재사용하지 않음
+            if response.isclosed() and not response.will_close:
+                self._release(conn)
+            else:
+                conn.close()
+            self._record(response.status, time.time() - start)
+
+    # ------------------------------------------------------------------
+    # 비동기 요청
+    # ------------------------------------------------------------------
+    def get_async_client(self) -> httpx.AsyncClient:
+        """현재 이벤트 루프용 공유 httpx.AsyncClient 반환 (루프마다 따로 생성)"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    base_url=f"https://{self.host}",
+                    timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                    limits=httpx.Limits(max_connections=self.pool_size,
+                                        max_keepalive_connections=self.pool_size)
+                )
+                self._async_clients[loop] = client
+        return client
+
+    async def apost_json(self, path: str, payload: Dict[str, Any], headers: Dict[str, str],
+                         timeout: Optional[float] = None) -> Tuple[int, Dict[str, Any]]:
+        """비동기 JSON POST 요청 후 (HTTP 상태 코드, 파싱된 JSON) 반환"""
+        client = self.get_async_client()
+        start = time.time()
+        try:
+            response = await client.post(
+                path, json=payload, headers=headers,
+                timeout=httpx.Timeout(timeout or self.read_timeout, connect=self.connect_timeout)
+            )
+        except Exception:
+            self._record(None, time.time() - start)
+            raise
+        self._record(response.status_code, time.time() - start)
+        return response.status_code, _parse_json_body(response.status_code, response.content)
+
+    async def aclose(self):
+        """현재 이벤트 루프가 만든 비동기 클라이언트 종료 (다른 루프의 클라이언트는 그대로)"""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    # ------------------------------------------------------------------
+    # 관리
+    # ------------------------------------------------------------------
+    def close(self):
+        """유휴 연결 모두 종료"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """요청/지연 카운터 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["status_counts"] = dict(self._stats["status_counts"])
+            stats["idle_connections"] = len(self._idle)
+            stats["async_clients"] = len(self._async_clients)
+        stats["host"] = self.host
+        stats["avg_latency_seconds"] = (
+            stats["total_latency_seconds"] / stats["requests"] if stats["requests"] else 0.0
+        )
+        return stats
+
+
+_transports: Dict[str, ClovaTransport] = {}
+_transports_lock = threading.Lock()
+
+def get_clova_transport(host: str = CLOVA_STUDIO_HOST) -> ClovaTransport:
+    """호스트별 공유 ClovaTransport 반환"""
+    with _transports_lock:
+        if host not in _transports:
+            _transports[host] = ClovaTransport(
+                host=host,
+                pool_size=get_clova_pool_size(),
+                connect_timeout=get_clova_connect_timeout(),
+                read_timeout=get_clova_read_timeout()
+            )
+        return _transports[host]
@@ -18,6 +18,8 @@ EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
 # 벡터 데이터베이스 설정
 VECTOR_DB_PATH = PROJECT_ROOT / "vector_db"
+# 벡터 컬렉션 (이름 -> 벡터 디렉토리, 저장소 이름 - 한 API 서버가 모든 컬렉션을 함께 제공, 첫 번째가 기본 컬렉션)
+VECTOR_COLLECTIONS = "market_daily=vector_db:hybrid,focus_stocks=vector_db_1:vector_db_1"
 CHUNK_SIZE = 512
 CHUNK_OVERLAP = 50
 
@@ -25,6 +27,17 @@ CHUNK_OVERLAP = 50
 TOP_K_RESULTS = 5
 SIMILARITY_THRESHOLD = 0.7
 
+# 임베딩 캐시 설정
+EMBEDDING_CACHE_PATH = PROJECT_ROOT / "cache" / "embedding_cache.db"
+
+# API 요청 한도 설정 (분당 요청 수, 같은 호스트의 모든 프로세스가 공유)
+RATE_LIMIT_STATE_DIR = PROJECT_ROOT / "cache" / "rate_limits"
+DEFAULT_RATE_LIMIT_RPM = {
+    "embedding": 60,
+    "segmentation": 60,
+    "chat": 10
+}
+
 # API 키 설정 (환경변수에서 로드)
 # TODO: .env 파일에 다음 키들을 추가하세요:
 # CLOVA_API_KEY=your_clova_api_key_here
@@ -50,6 +63,184 @@ def get_clova_segmentation_app_id():
     """CLOVA Segmentation App ID를 반환합니다."""
     return os.getenv("CLOVA_SEGMENTATION_APP_ID", "")
 
+def get_embedding_cache_enabled():
+    """임베딩 캐시 사용 여부를 반환합니다."""
+    return os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+def get_embedding_cache_path():
+    """임베딩 캐시 DB 경로를 반환합니다."""
+    return Path(os.getenv("EMBEDDING_CACHE_PATH", str(EMBEDDING_CACHE_PATH)))
+
+def get_embedding_cache_max_entries():
+    """임베딩 캐시 최대 항목 수를 반환합니다."""
+    return int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+def get_embedding_cache_max_age_days():
+    """임베딩 캐시 항목 최대 보관 일수를 반환합니다."""
+    return int(os.getenv("EMBEDDING_CACHE_MAX_AGE_DAYS", "90"))
+
+def get_embedding_max_concurrency():
+    """비동기 임베딩 최대 동시 요청 수를 반환합니다."""
+    return int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "8"))
+
+def get_embedding_request_timeout():
+    """임베딩 요청 1건당 타임아웃(초)을 반환합니다."""
+    return float(os.getenv("EMBEDDING_REQUEST_TIMEOUT", "30"))
+
+def get_clova_connect_timeout():
+    """CLOVA Studio 연결 타임아웃(초)을 반환합니다."""
+    return float(os.getenv("CLOVA_CONNECT_TIMEOUT", "5"))
+
+def get_clova_read_timeout():
+    """CLOVA Studio 응답 읽기 타임아웃(초)을 반환합니다."""
+    return float(os.getenv("CLOVA_READ_TIMEOUT", "120"))
+
+def get_clova_pool_size():
+    """CLOVA Studio keep-alive 연결 풀 크기를 반환합니다."""
+    return int(os.getenv("CLOVA_POOL_SIZE", "8"))
+
+def get_pipeline_batch_size():
+    """벡터 구축 파이프라인의 임베딩 배치 크기를 반환합니다."""
+    return int(os.getenv("PIPELINE_BATCH_SIZE", "32"))
+
+def get_pipeline_segment_workers():
+    """세그멘테이션 단계 동시 작업 수를 반환합니다."""
+    return int(os.getenv("PIPELINE_SEGMENT_WORKERS", "4"))
+
+def get_pipeline_concurrent():
+    """세그멘테이션과 임베딩을 생산자/소비자로 동시에 실행할지 여부를 반환합니다."""
+    return os.getenv("PIPELINE_CONCURRENT", "false").lower() in ("1", "true", "yes")
+
+def get_pipeline_checkpoint_every():
+    """체크포인트를 저장할 신규 청크 수 간격을 반환합니다."""
+    return int(os.getenv("PIPELINE_CHECKPOINT_EVERY", "20"))
+
+def get_pipeline_checkpoint_seconds():
+    """체크포인트를 저장할 최대 시간 간격(초)을 반환합니다."""
+    return float(os.getenv("PIPELINE_CHECKPOINT_SECONDS", "300"))
+
+def get_pipeline_resume():
+    """중단된 벡터 구축을 체크포인트에서 이어서 진행할지 여부를 반환합니다."""
+    return os.getenv("PIPELINE_RESUME", "true").lower() in ("1", "true", "yes")
+
+def get_pipeline_retry_rounds():
+    """구축 마지막에 실패 청크를 재시도할 횟수를 반환합니다."""
+    return int(os.getenv("PIPELINE_RETRY_ROUNDS", "3"))
+
+def get_pipeline_retry_backoff_seconds():
+    """실패 청크 재시도 기본 대기 시간(초)을 반환합니다 (재시도마다 2배)."""
+    return float(os.getenv("PIPELINE_RETRY_BACKOFF_SECONDS", "10"))
+
+def get_embedding_backend():
+    """임베딩 백엔드 이름을 반환합니다 ("clova" 또는 오프라인용 "local")."""
+    return os.getenv("EMBEDDING_BACKEND", "clova").strip().lower()
+
+def get_segmentation_backend():
+    """세그멘테이션 백엔드 이름을 반환합니다 (기본값: 임베딩 백엔드와 동일)."""
+    return os.getenv("SEGMENTATION_BACKEND", get_embedding_backend()).strip().lower()
+
+def get_local_embedding_dim():
+    """로컬 해시 임베딩 차원을 반환합니다 (CLOVA 임베딩과 같은 1024가 기본값)."""
+    return int(os.getenv("LOCAL_EMBEDDING_DIM", "1024"))
+
+def get_vector_storage_format():
+    """벡터 추가 저장 형식을 반환합니다 ("float32", 절반 크기 "float16", 1/4 크기 "int8")."""
+    return os.getenv("VECTOR_STORAGE_FORMAT", "float32").strip().lower()
+
+def get_vector_index_type():
+    """FAISS 인덱스 종류를 반환합니다 ("flat", "ivf_flat", "ivf_pq", "hnsw")."""
+    return os.getenv("VECTOR_INDEX_TYPE", "flat").strip().lower()
+
+def get_vector_index_nlist():
+    """IVF 인덱스의 클러스터 수를 반환합니다. (0이면 벡터 수에 맞춰 자동)"""
+    return int(os.getenv("VECTOR_INDEX_NLIST", "0"))
+
+def get_vector_index_nprobe():
+    """IVF 인덱스 검색 시 탐색할 클러스터 수를 반환합니다."""
+    return int(os.getenv("VECTOR_INDEX_NPROBE", "16"))
+
+def get_vector_index_pq_m():
+    """IVF-PQ 인덱스의 서브 벡터 수를 반환합니다. (차원의 약수가 아니면 가장 가까운 작은 약수 사용)"""
+    return int(os.getenv("VECTOR_INDEX_PQ_M", "64"))
+
+def get_vector_index_pq_bits():
+    """IVF-PQ 인덱스의 서브 벡터당 코드 비트 수를 반환합니다."""
+    return int(os.getenv("VECTOR_INDEX_PQ_BITS", "8"))
+
+def get_vector_index_hnsw_m():
+    """HNSW 인덱스의 노드당 이웃 수를 반환합니다."""
+    return int(os.getenv("VECTOR_INDEX_HNSW_M", "32"))
+
+def get_vector_index_ef_construction():
+    """HNSW 인덱스 구축 시 탐색 폭을 반환합니다."""
+    return int(os.getenv("VECTOR_INDEX_EF_CONSTRUCTION", "200"))
+
+def get_vector_index_ef_search():
+    """HNSW 인덱스 검색 시 탐색 폭을 반환합니다."""
+    return int(os.getenv("VECTOR_INDEX_EF_SEARCH", "64"))
+
+def get_vector_shard_compact_after_days():
+    """가장 최근 거래일보다 이 일수 이상 오래된 날짜 샤드를 월 단위 샤드로 병합합니다. (0이면 병합 안 함)"""
+    return int(os.getenv("VECTOR_SHARD_COMPACT_AFTER_DAYS", "30"))
+
+def get_vector_retention_days():
+    """가장 최근 거래일보다 이 일수 이상 오래된 벡터를 삭제합니다. (0이면 모두 보존)"""
+    return int(os.getenv("VECTOR_RETENTION_DAYS", "0"))
+
+def get_vector_snapshot_keep():
+    """보관할 벡터 스냅샷 버전 수를 반환합니다. (현재 버전 포함, 최소 2 - 전환 중인 서버가 이전 버전을 읽을 수 있도록)"""
+    return max(2, int(os.getenv("VECTOR_SNAPSHOT_KEEP", "3")))
+
+def get_vector_reload_interval():
+    """API 서버가 새 벡터 스냅샷을 확인하는 주기(초)를 반환합니다. (0이면 /admin/reload 요청으로만 전환)"""
+    return float(os.getenv("VECTOR_RELOAD_INTERVAL", "5"))
+
+def get_vector_collections():
+    """벡터 컬렉션 설정을 반환합니다. {이름: (벡터 디렉토리, 저장소 이름)} (상대 경로는 RAG 폴더 기준, 첫 번째가 기본 컬렉션)"""
+    collections = {}
+    for entry in os.getenv("VECTOR_COLLECTIONS", VECTOR_COLLECTIONS).split(","):
+        if not entry.strip():
+            continue
+        name, _, location = entry.partition("=")
+        directory, _, store_name = location.partition(":")
+        if not name.strip() or not directory.strip() or not store_name.strip():
+            raise ValueError(f"VECTOR_COLLECTIONS 형식 오류 (이름=디렉토리:저장소명): {entry}")
+        collections[name.strip()] = (PROJECT_ROOT / directory.strip(), store_name.strip())
+    return collections
+
+def get_query_embedding_cache_size():
+    """검색 서버의 질문 임베딩 메모리 캐시 최대 항목 수를 반환합니다. (0이면 사용하지 않음)"""
+    return max(0, int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024")))
+
+def get_query_embedding_cache_ttl_seconds():
+    """질문 임베딩 메모리 캐시 항목의 유효 시간(초)을 반환합니다. (0이면 만료 없음)"""
+    return float(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "3600"))
+
+def get_search_batch_max_queries():
+    """/search/batch 요청 한 번에 받을 최대 질문 수를 반환합니다."""
+    return max(1, int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "32")))
+
+def get_search_max_concurrency():
+    """검색 서버가 동시에 처리할 최대 검색 수(스레드 풀 크기)를 반환합니다."""
+    return max(1, int(os.getenv("SEARCH_MAX_CONCURRENCY", "8")))
+
+def get_search_timeout_seconds():
+    """검색 요청 한 건의 최대 처리 시간(초, 대기 포함)을 반환합니다."""
+    return float(os.getenv("SEARCH_TIMEOUT_SECONDS", "60"))
+
+def get_rate_limit_state_dir():
+    """Rate Limiter 공유 상태 디렉토리를 반환합니다."""
+    return Path(os.getenv("RATE_LIMIT_STATE_DIR", str(RATE_LIMIT_STATE_DIR)))
+
+def get_rate_limit_rpm(name):
+    """API 종류별 최대 분당 요청 수를 반환합니다. (예: CLOVA_EMBEDDING_RPM)"""
+    default = DEFAULT_RATE_LIMIT_RPM.get(name, 60)
+    return float(os.getenv(f"CLOVA_{name.upper()}_RPM", str(default)))
+
+def get_rate_limit_min_rpm(name):
+    """한도 초과 시 낮출 수 있는 최소 분당 요청 수를 반환합니다."""
+    return float(os.getenv(f"CLOVA_{name.upper()}_MIN_RPM", "1"))
+
 # Hugging Face API 키 (임베딩 모델용)
 def get_huggingface_api_key():
     """Hugging Face API 키를 반환합니다."""
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+테스트 공용 도우미
+- 벡터 구축 프로세스처럼 저장소를 저장하고 스냅샷을 만드는 publish_test_store
+  (스냅샷/컬렉션/검색 테스트 스크립트가 함께 사용, 스크립트로 직접 실행할 때도 import 가능)
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from metadata_store import open_metadata_store
+from text_store import TextBlobStore
+from vector_snapshot import publish_snapshot
+from vector_storage import save_vector_matrix
+
+def publish_test_store(vector_dir: Path, vectors, texts, store_name: str = "test", keep: int = 2, **fields) -> str:
+    """벡터, 청크 텍스트, 메타데이터를 저장하고 스냅샷 생성 (새 버전 반환)
+
+    fields는 모든 청크 메타데이터에 함께 넣을 값 (예: type="news").
+    """
+    vector_dir = Path(vector_dir)
+    vector_dir.mkdir(parents=True, exist_ok=True)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    save_vector_matrix(vector_dir / f"{store_name}_vectors.npy", vectors)
+    metadata = [dict(fields, doc_id=str(i), text_content=text) for i, text in enumerate(texts)]
+    TextBlobStore(vector_dir, store_name).externalize(metadata)
+    store = open_metadata_store(vector_dir, store_name)
+    try:
+        store.replace_all(metadata)
+        return publish_snapshot(vector_dir, store_name, store, len(vectors), keep=keep)
+    finally:
+        store.close()
@@ -14,8 +14,7 @@ import os
 from dotenv import load_dotenv
 
 # CLOVA API 클라이언트들
-from clova_segmentation import ClovaSegmentationClient
-from clova_embedding import ClovaEmbeddingAPI
+from embedding_backends import create_embedding_client, create_segmentation_client
 from clova_chat_client import ClovaChatClient
 
 # 환경변수 로드
@@ -31,8 +30,8 @@ class DataAnalyzer:
         self.output_dir.mkdir(exist_ok=True)
         
         # CLOVA API 클라이언트들 초기화
-        self.segmentation_client = ClovaSegmentationClient()
-        self.embedding_client = ClovaEmbeddingAPI()
+        self.segmentation_client = create_segmentation_client()
+        self.embedding_client = create_embedding_client()
         self.chat_client = ClovaChatClient()
         
         print("🔧 DataAnalyzer 초기화 완료")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+임베딩/세그멘테이션 백엔드 선택
+- EMBEDDING_BACKEND=clova : CLOVA Studio 임베딩 API (기본값)
+- EMBEDDING_BACKEND=local : 문자 n-gram 해시 투영 임베딩 (API 키 없이 CPU만 사용, 결정적)
+- SEGMENTATION_BACKEND 도 같은 방식으로 선택 (기본값은 임베딩 백엔드와 동일)
+
+로컬 백엔드는 검색 품질이 아니라 파이프라인/서버 부하 테스트, 벤치마크,
+API 없이 실행하는 테스트용이다. 두 백엔드의 벡터는 서로 호환되지 않는다.
+"""
+
+import re
+import zlib
+from typing import ClassVar, List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.embeddings import BaseEmbedding
+
+from config import get_embedding_backend, get_segmentation_backend, get_local_embedding_dim
+from embedding_cache import normalize_text
+
+
+class LocalHashEmbedding(BaseEmbedding):
+    """문자 n-gram 해시 투영 임베딩 (LlamaIndex 호환, ClovaEmbeddingAPI와 같은 인터페이스)
+
+    정규화한 텍스트의 문자 2/3-gram과 단어를 CRC32로 해시해 차원에 부호와 함께 누적하고
+    L2 정규화한다. 같은 텍스트는 항상 같은 벡터가 되고, 겹치는 표현이 많을수록 내적이 커진다.
+    """
+
+    NGRAM_SIZES: ClassVar[Tuple[int, ...]] = (2, 3)
+
+    def __init__(self, dim: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        object.__setattr__(self, '_dim', dim or get_local_embedding_dim())
+        print(f"로컬 해시 임베딩 초기화 완료 ({self._dim}차원)")
+
+    def _features(self, text: str) -> List[str]:
+        text = normalize_text(text).lower()
+        features = [f"w:{word}" for word in text.split()]
+        for n in self.NGRAM_SIZES:
+            features.extend(f"{n}:{text[i:i + n]}" for i in range(len(text) - n + 1))
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        """텍스트 임베딩 생성"""
+        hashes = np.fromiter(
+            (zlib.crc32(feature.encode('utf-8')) for feature in self._features(text)),
+            dtype=np.uint32
+        )
+        vector = np.zeros(self._dim, dtype=np.float32)
+        if hashes.size:
+            signs = np.where(hashes >> np.uint32(31), -1.0, 1.0).astype(np.float32)
+            np.add.at(vector, (hashes % np.uint32(self._dim)).astype(np.int64), signs)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            # 빈 텍스트도 영벡터가 되지 않도록 고정 축 사용 (영벡터는 실패로 취급됨)
+            vector[0] = 1.0
+        else:
+            vector /= norm
+        return vector.tolist()
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._embed(query)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def get_query_embedding(self, query: str) -> List[float]:
+        """쿼리 텍스트의 임베딩 생성"""
+        return self._embed(query)
+
+    def get_text_embedding(self, text: str) -> List[float]:
+        """텍스트의 임베딩 생성"""
+        return self._embed(text)
+
+    def get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트의 임베딩 생성"""
+        return [self._embed(text) for text in texts]
+
+    def get_text_embeddings_or_errors(self, texts: List[str]) -> List[Tuple[Optional[List[float]], Optional[str]]]:
+        """여러 텍스트를 임베딩하고 (벡터, 오류) 목록 반환 (로컬 백엔드는 실패하지 않음)"""
+        return [(self._embed(text), None) for text in texts]
+
+    async def aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """비동기로 여러 텍스트의 임베딩 생성"""
+        return self.get_text_embeddings(texts)
+
+    async def aget_text_embeddings_or_errors(self, texts: List[str]) -> List[Tuple[Optional[List[float]], Optional[str]]]:
+        """비동기로 여러 텍스트를 임베딩하고 (벡터, 오류) 목록 반환"""
+        return self.get_text_embeddings_or_errors(texts)
+
+    def get_cache_stats(self) -> Optional[dict]:
+        """로컬 백엔드는 캐시를 사용하지 않음"""
+        return None
+
+    @property
+    def model_id(self) -> str:
+        """저장된 벡터의 출처 확인용 모델 식별자"""
+        return f"local-hash-ngram-{self._dim}"
+
+    @property
+    def dimension(self) -> int:
+        """임베딩 차원"""
+        return self._dim
+
+
+class LocalSegmentationClient:
+    """규칙 기반 세그멘테이션 (ClovaSegmentationClient와 같은 인터페이스)
+
+    줄 → 문장 → 글자 수 순서로 나눈 뒤 max_length 이하가 되도록 이어 붙인다.
+    """
+
+    _SENTENCE_END = re.compile(r'(?<=[.!?。])\s+')
+
+    def __init__(self):
+        print("로컬 세그멘테이션 클라이언트 초기화 완료")
+
+    def _units(self, text: str, max_length: int) -> List[str]:
+        units = []
+        for line in text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            if len(line) <= max_length:
+                units.append(line)
+                continue
+            for sentence in self._SENTENCE_END.split(line):
+                sentence = sentence.strip()
+                for start in range(0, len(sentence), max_length):
+                    if sentence[start:start + max_length]:
+                        units.append(sentence[start:start + max_length])
+        return units
+
+    def segment_text(self, text: str, max_length: int = 512, overlap: int = 50) -> Optional[List[str]]:
+        """텍스트를 max_length 이하 청크로 분할 (overlap은 CLOVA 클라이언트와 같이 인터페이스 호환용)"""
+        chunks = []
+        current = ""
+        for unit in self._units(text, max_length):
+            if current and len(current) + 1 + len(unit) > max_length:
+                chunks.append(current)
+                current = unit
+            else:
+                current = f"{current} {unit}" if current else unit
+        if current:
+            chunks.append(current)
+        return chunks or None
+
+
+def create_embedding_client(backend: Optional[str] = None):
+    """설정에 맞는 임베딩 클라이언트 생성"""
+    backend = backend or get_embedding_backend()
+    if backend == "local":
+        return LocalHashEmbedding()
+    if backend == "clova":
+        from clova_embedding import ClovaEmbeddingAPI
+        return ClovaEmbeddingAPI()
+    raise ValueError(f"지원하지 않는 임베딩 백엔드: {backend} (clova, local 중 선택)")
+
+
+def create_segmentation_client(backend: Optional[str] = None):
+    """설정에 맞는 세그멘테이션 클라이언트 생성"""
+    backend = backend or get_segmentation_backend()
+    if backend == "local":
+        return LocalSegmentationClient()
+    if backend == "clova":
+        from clova_segmentation import ClovaSegmentationClient
+        return ClovaSegmentationClient()
+    raise ValueError(f"지원하지 않는 세그멘테이션 백엔드: {backend} (clova, local 중 선택)")
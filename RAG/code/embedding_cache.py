@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+영구 임베딩 캐시 (SQLite 기반)
+- 정규화된 텍스트 + 모델/엔드포인트 해시를 키로 사용
+- 벡터는 float32 BLOB으로 저장
+- 오래된 항목(나이 기준)과 초과 항목(크기 기준, LRU) 자동 정리
+- 검색 서버용 메모리 쿼리 임베딩 캐시 (QueryEmbeddingCache - LRU + TTL, 반복 질문은 API 호출 없이 응답)
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 계산용 텍스트 정규화 (유니코드 NFC + 공백 정리)"""
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class EmbeddingCache:
+    """임베딩 결과를 디스크에 저장하는 콘텐츠 주소 기반 캐시"""
+
+    # put 이 이 횟수만큼 호출될 때마다 크기 기준 정리 수행
+    EVICTION_CHECK_INTERVAL = 100
+
+    def __init__(self, db_path, model: str, max_entries: int = 200000, max_age_days: int = 90):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.model = model
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+
+        self._lock = threading.Lock()
+        self._puts_since_eviction = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        with self._lock:
+            # 여러 프로세스(벡터 빌드, API 서버)가 동시에 읽고 쓸 수 있도록 WAL 사용
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_created_at ON embeddings(created_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used_at ON embeddings(last_used_at)")
+            self._conn.commit()
+
+        self.evict()
+
+    def make_key(self, text: str) -> str:
+        """정규화된 텍스트와 모델 식별자로 캐시 키 생성"""
+        payload = f"{self.model}\n{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """캐시된 임베딩 조회 (없으면 None)"""
+        key = self.make_key(text)
+        with self._lock:
+            row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE embeddings SET last_used_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self._stats["hits"] += 1
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def put(self, text: str, embedding: List[float]):
+        """임베딩을 캐시에 저장"""
+        key = self.make_key(text)
+        blob = np.asarray(embedding, dtype=np.float32).tobytes()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, len(embedding), blob, now, now)
+            )
+            self._conn.commit()
+            self._stats["writes"] += 1
+            self._puts_since_eviction += 1
+            should_evict = self._puts_since_eviction >= self.EVICTION_CHECK_INTERVAL
+
+        if should_evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """나이/크기 기준으로 오래된 항목 정리"""
+        removed = 0
+        with self._lock:
+            if self.max_age_days and self.max_age_days > 0:
+                cutoff = time.time() - self.max_age_days * 86400
+                cursor = self._conn.execute("DELETE FROM embeddings WHERE created_at < ?", (cutoff,))
+                removed += cursor.rowcount
+
+            if self.max_entries and self.max_entries > 0:
+                count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                overflow = count - self.max_entries
+                if overflow > 0:
+                    cursor = self._conn.execute(
+                        "DELETE FROM embeddings WHERE key IN "
+                        "(SELECT key FROM embeddings ORDER BY last_used_at ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                    removed += cursor.rowcount
+
+            self._conn.commit()
+            self._puts_since_eviction = 0
+            self._stats["evictions"] += removed
+
+        if removed:
+            print(f"🧹 임베딩 캐시 정리: {removed}개 항목 삭제")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 적중/실패 통계 반환"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = entries
+        stats["hit_rate"] = (stats["hits"] / lookups) if lookups else 0.0
+        stats["db_path"] = str(self.db_path)
+        return stats
+
+    def close(self):
+        """DB 연결 종료"""
+        with self._lock:
+            self._conn.close()
+
+
+class QueryEmbeddingCache:
+    """질문 임베딩 메모리 캐시 (최대 max_entries개 LRU, ttl_seconds가 지나면 만료)
+
+    임베딩 클라이언트 앞에 두며, 미적중 시 클라이언트가 영구 캐시(EmbeddingCache)를 거쳐 API를 호출한다.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """캐시된 질문 임베딩 (없거나 만료되었으면 None)"""
+        key = normalize_text(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0 and self._clock() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def put(self, text: str, embedding: List[float]):
+        """질문 임베딩 저장 (가득 차면 가장 오래 사용하지 않은 항목 삭제)"""
+        key = normalize_text(text)
+        with self._lock:
+            self._entries[key] = (embedding, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 적중/실패 통계 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] / lookups) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 FAISS 벡터 검색 기반 데이터 분석기
-- FAISS API 서버에서 벡터 검색 수행
+- 벡터 검색 라이브러리로 같은 프로세스 안에서 벡터 검색 수행 (API 서버 불필요)
 - 검색된 관련 텍스트를 CLOVA에게 전달
 - 실제 벡터 검색을 활용한 RAG 시스템
 """
@@ -9,7 +9,6 @@ FAISS 벡터 검색 기반 데이터 분석기
 import os
 import sys
 import json
-import requests
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
@@ -20,51 +19,31 @@ sys.path.append(str(current_dir))
 
 from clova_chat_client import ClovaChatClient
 from hybrid_vector_manager import HybridVectorManager
+from vector_search import get_vector_search
 
 class FAISSDataAnalyzer:
     def __init__(self):
         self.chat_client = ClovaChatClient()
         self.vector_manager = HybridVectorManager()
-        self.api_base_url = "http://localhost:8000"
         self.data_1_path = current_dir.parent / "data_1"
         self.data_1_path.mkdir(exist_ok=True)
     
-    def check_api_server(self):
-        """API 서버 연결 확인"""
+    def check_vector_search(self):
+        """벡터 검색 준비 확인 (벡터 스냅샷 로드)"""
         try:
-            response = requests.get(f"{self.api_base_url}/health", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"✅ FAISS API 서버 연결 성공")
-                print(f"   벡터 로드: {data.get('vectors_loaded', 0)}개")
-                print(f"   FAISS 인덱스: {'구축됨' if data.get('faiss_index_built') else '미구축'}")
-                return True
-            else:
-                print(f"❌ API 서버 응답 오류: {response.status_code}")
-                return False
+            snapshot = get_vector_search().collections.current()
         except Exception as e:
-            print(f"❌ API 서버 연결 실패: {e}")
-            print("💡 FAISS API 서버를 먼저 실행해주세요: python faiss_vector_api.py")
+            print(f"❌ 벡터 검색 로드 실패: {e}")
             return False
+        print(f"✅ 벡터 검색 준비 완료")
+        print(f"   벡터 로드: {len(snapshot.vectors) if snapshot else 0}개")
+        print(f"   FAISS 인덱스: {'구축됨' if snapshot else '미구축'}")
+        return True
     
     def search_vectors(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """FAISS API 서버에서 벡터 검색"""
+        """벡터 검색 (새 벡터 스냅샷이 있으면 교체 후 검색)"""
         try:
-            response = requests.post(
-                f"{self.api_base_url}/search",
-                json={"query": query, "top_k": top_k},
-                timeout=120
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("results", [])
-            else:
-                print(f"❌ 검색 요청 실패: {response.status_code}")
-                return []
-        except requests.exceptions.Timeout:
-            print(f"❌ 검색 타임아웃 (120초)")
-            return []
+            return get_vector_search().search(query, top_k)
         except Exception as e:
             print(f"❌ 검색 중 오류: {e}")
             return []
@@ -95,8 +74,8 @@ class FAISSDataAnalyzer:
         print("🔍 FAISS 벡터 검색 기반 분석")
         print("=" * 60)
         
-        # 1. API 서버 연결 확인
-        if not self.check_api_server():
+        # 1. 벡터 검색 준비 확인 (벡터가 아직 없으면 아래에서 구축 후 검색 시 로드)
+        if not self.check_vector_search():
             return False
         
         # 2. 벡터 재구축 (필요한 경우)
@@ -109,10 +88,11 @@ class FAISSDataAnalyzer:
         else:
             print("\n📊 기존 벡터 사용 중...")
             # 기존 벡터 파일이 있는지 확인
-            vector_file = self.vector_manager.vector_dir / "hybrid_vectors.pkl"
-            metadata_file = self.vector_manager.vector_dir / "hybrid_metadata.json"
+            vector_exists = (self.vector_manager.vectors_file.exists()
+                             or self.vector_manager.legacy_vectors_file.exists())
+            metadata_exists = self.vector_manager.metadata_store.count() > 0
             
-            if not vector_file.exists() or not metadata_file.exists():
+            if not vector_exists or not metadata_exists:
                 print("❌ 기존 벡터 파일이 없습니다!")
                 print("벡터 재구축을 시도합니다...")
                 if not self.vector_manager.process_documents():
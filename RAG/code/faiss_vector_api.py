@@ -4,34 +4,67 @@ FAISS 기반 벡터 검색 API 서버
 - FastAPI + uvicorn으로 REST API 제공
 - 로컬 벡터를 FAISS로 검색
 - CLOVA Studio에서 호출 가능
+- 벡터 구축이 새 스냅샷을 만들면 재시작 없이 교체 (주기적 확인 또는 POST /admin/reload)
+- 한 프로세스가 모든 벡터 컬렉션 (market_daily, focus_stocks 등)을 제공하고 임베딩 클라이언트를 공유
+  (검색 요청의 collection으로 선택, 없으면 기본 컬렉션)
+- 검색은 벡터 검색 라이브러리 (vector_search.VectorSearch)가 처리 - 분석기는 서버 없이 같은 라이브러리를 직접 사용
+- POST /search/batch: 여러 질문을 동시에 임베딩하고 FAISS 행렬 검색 한 번으로 처리
+- POST /search/vector: 이미 임베딩한 쿼리 벡터로 바로 검색 (임베딩 API 호출 없음, 차원이 다르면 400)
+- 질문 임베딩 메모리 캐시 (LRU + TTL) - 반복 질문은 임베딩 API 호출 없이 응답, 통계는 /health
+- 임베딩/FAISS 검색은 이벤트 루프 밖 스레드 풀에서 실행 (검색 중에도 /health 등 다른 요청 응답,
+  동시 검색 수 초과 대기 시 503, 제한 시간 초과 시 504)
 """
 
-import os
 import sys
-import json
-import pickle
-import numpy as np
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
-import faiss
 
 # 현재 디렉토리를 Python 경로에 추가
 current_dir = Path(__file__).parent
 sys.path.append(str(current_dir))
 
-from clova_embedding import ClovaEmbeddingAPI
+from config import get_search_batch_max_queries, get_vector_reload_interval
+from vector_search import SearchBusyError, SearchExecutor, SearchTimeoutError, VectorSearch
 
 class SearchRequest(BaseModel):
     query: str
-    top_k: int = 5
+    top_k: int = Field(5, gt=0)  # 반환할 결과 수 (0 이하면 422)
+    date_from: Optional[str] = None  # 거래일 범위 (YYYY-MM-DD, 양 끝 포함)
+    date_to: Optional[str] = None
+    collection: Optional[str] = None  # 벡터 컬렉션 이름 (없으면 기본 컬렉션)
 
 class SearchResponse(BaseModel):
     results: List[Dict[str, Any]]
     total_found: int
     query: str
+    collection: str
+
+class VectorSearchRequest(BaseModel):
+    query_vector: List[float]  # 미리 계산한 쿼리 임베딩 (인덱스와 같은 차원)
+    top_k: int = Field(5, gt=0)  # 반환할 결과 수 (0 이하면 422)
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    collection: Optional[str] = None
+
+class VectorSearchResponse(BaseModel):
+    results: List[Dict[str, Any]]
+    total_found: int
+    collection: str
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    top_k: int = Field(5, gt=0)  # 반환할 결과 수 (0 이하면 422)
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    collection: Optional[str] = None
+
+class BatchSearchResponse(BaseModel):
+    results: List[Dict[str, Any]]  # 질문별 {"query", "results", "total_found"} (임베딩 실패 시 "error")
+    total_queries: int
+    collection: str
 
 class FAISSVectorAPI:
     def __init__(self):
@@ -40,11 +73,12 @@ class FAISSVectorAPI:
             description="CLOVA Studio용 FAISS 벡터 검색 API",
             version="1.0.0"
         )
-        self.vector_db_path = current_dir.parent / "vector_db"
-        self.vectors = []
-        self.metadata = []
+        # 벡터 검색 라이브러리 (컬렉션별 현재 스냅샷 - 새 버전이 나오면 통째로 교체, 임베딩 클라이언트 공유)
+        self.search = VectorSearch()
+        self.collections = self.search.collections
+        # 블로킹 검색 실행기 (동시 검색 수 제한 + 요청별 제한 시간)
+        self.executor = SearchExecutor()
         self.embedding_client = None
-        self.faiss_index = None
         self.dimension = 1024  # CLOVA X 임베딩 차원
         
         # API 엔드포인트 등록
@@ -55,39 +89,97 @@ class FAISSVectorAPI:
         
         @self.app.get("/")
         async def root():
+            snapshot = self.collections.current()
             return {
                 "message": "FAISS Vector Search API", 
                 "status": "running",
-                "vectors_loaded": len(self.vectors),
-                "faiss_index_built": self.faiss_index is not None
+                "vectors_loaded": len(snapshot.vectors) if snapshot else 0,
+                "faiss_index_built": snapshot is not None,
+                "collections": self.collections.names()
             }
         
         @self.app.post("/search", response_model=SearchResponse)
         async def search_vectors(request: SearchRequest):
             """벡터 검색 API"""
-            try:
-                results = self.search_similar_vectors(request.query, request.top_k)
-                return SearchResponse(
-                    results=results, 
-                    total_found=len(results),
-                    query=request.query
-                )
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=str(e))
+            collection = request.collection or self.collections.default
+            if collection not in self.collections.holders:
+                raise HTTPException(status_code=404, detail=f"알 수 없는 벡터 컬렉션: {collection}")
+            results = await self.run_search(self.search_similar_vectors, request.query, request.top_k,
+                                            request.date_from, request.date_to, collection)
+            return SearchResponse(
+                results=results, 
+                total_found=len(results),
+                query=request.query,
+                collection=collection
+            )
+        
+        @self.app.post("/search/vector", response_model=VectorSearchResponse)
+        async def search_by_vector(request: VectorSearchRequest):
+            """미리 계산한 쿼리 벡터로 검색 (임베딩 API를 거치지 않음)"""
+            collection = request.collection or self.collections.default
+            if collection not in self.collections.holders:
+                raise HTTPException(status_code=404, detail=f"알 수 없는 벡터 컬렉션: {collection}")
+            results = await self.run_search(self.search.search_vector, request.query_vector, request.top_k,
+                                            request.date_from, request.date_to, collection)
+            return VectorSearchResponse(results=results, total_found=len(results), collection=collection)
+        
+        @self.app.post("/search/batch", response_model=BatchSearchResponse)
+        async def search_vectors_batch(request: BatchSearchRequest):
+            """여러 질문을 한 번에 검색 (동시 임베딩 + FAISS 행렬 검색 한 번)"""
+            collection = request.collection or self.collections.default
+            if collection not in self.collections.holders:
+                raise HTTPException(status_code=404, detail=f"알 수 없는 벡터 컬렉션: {collection}")
+            max_queries = get_search_batch_max_queries()
+            if len(request.queries) > max_queries:
+                raise HTTPException(status_code=400, detail=f"질문은 한 번에 최대 {max_queries}개까지 검색할 수 있습니다")
+            results = await self.run_search(self.search.search_batch, request.queries, request.top_k,
+                                            request.date_from, request.date_to, collection)
+            return BatchSearchResponse(results=results, total_queries=len(results), collection=collection)
         
         @self.app.get("/health")
-        async def health_check():
-            """헬스 체크"""
+        async def health_check(collection: Optional[str] = None):
+            """헬스 체크 (상위 필드는 collection 또는 기본 컬렉션 기준, collections에 전체 컬렉션)"""
+            try:
+                snapshot = self.collections.current(collection)
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail=str(e))
             return {
                 "status": "healthy", 
-                "vectors_loaded": len(self.vectors),
-                "faiss_index_built": self.faiss_index is not None,
-                "embedding_client_ready": self.embedding_client is not None
+                "collection": collection or self.collections.default,
+                "vectors_loaded": len(snapshot.vectors) if snapshot else 0,
+                "total_vectors": len(snapshot.vectors) if snapshot else 0,
+                "total_metadata": snapshot.metadata_count if snapshot else 0,
+                "faiss_index_built": snapshot is not None,
+                "snapshot": snapshot.info() if snapshot else None,
+                "shards": snapshot.index.shard_info() if snapshot else [],
+                "collections": self.collections.info(),
+                "embedding_client_ready": self.embedding_client is not None,
+                "embedding_cache": self.search.cache_stats(),
+                "search_executor": self.executor.get_stats()
             }
         
+        @self.app.get("/collections")
+        async def list_collections():
+            """컬렉션 목록과 컬렉션별 스냅샷 정보"""
+            return {"default": self.collections.default, "collections": self.collections.info()}
+        
+        @self.app.post("/admin/reload")
+        def reload_snapshot(collection: Optional[str] = None, force: bool = False):
+            """새 벡터 스냅샷으로 교체 (collection이 없으면 전체, 로드하는 동안에도 기존 스냅샷으로 검색 처리)"""
+            try:
+                results = self.collections.reload(collection, force=force)
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            # 아직 구축되지 않은 컬렉션 (스냅샷 없음)은 오류로 보지 않음
+            errors = {name: result["error"] for name, result in results.items()
+                      if result.get("error") and not result.get("missing")}
+            if errors:
+                raise HTTPException(status_code=500, detail=errors)
+            return {"collections": results}
+        
         @self.app.get("/test")
         async def test_search():
-            """테스트 검색"""
+            """테스트 검색 (배치 검색 한 번)"""
             test_queries = [
                 "삼성전자 주가",
                 "하이브 세무조사", 
@@ -95,127 +187,78 @@ class FAISSVectorAPI:
                 "주식 시장 이슈"
             ]
             
+            try:
+                batch = await self.run_search(self.search.search_batch, test_queries, 3)
+            except HTTPException as e:
+                return {"test_results": {query: {"error": e.detail} for query in test_queries}}
+            
             test_results = {}
-            for query in test_queries:
-                try:
-                    results = self.search_similar_vectors(query, top_k=3)
-                    test_results[query] = {
-                        "found": len(results),
-                        "top_result": results[0] if results else None
+            for entry in batch:
+                if entry.get("error"):
+                    test_results[entry["query"]] = {"error": entry["error"]}
+                else:
+                    test_results[entry["query"]] = {
+                        "found": entry["total_found"],
+                        "top_result": entry["results"][0] if entry["results"] else None
                     }
-                except Exception as e:
-                    test_results[query] = {"error": str(e)}
             
             return {"test_results": test_results}
     
-    def load_vectors(self):
-        """저장된 벡터와 메타데이터 로드"""
-        print("🔍 벡터 데이터 로드 중...")
-        
-        # 벡터 파일 로드
-        vectors_file = self.vector_db_path / "hybrid_vectors.pkl"
-        if vectors_file.exists():
-            with open(vectors_file, 'rb') as f:
-                self.vectors = pickle.load(f)
-            print(f"✅ 벡터 로드 완료: {len(self.vectors)}개")
-        else:
-            print("❌ 벡터 파일을 찾을 수 없습니다!")
-            return False
-        
-        # 메타데이터 파일 로드
-        metadata_file = self.vector_db_path / "hybrid_metadata.json"
-        if metadata_file.exists():
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                self.metadata = json.load(f)
-            print(f"✅ 메타데이터 로드 완료: {len(self.metadata)}개")
-        else:
-            print("❌ 메타데이터 파일을 찾을 수 없습니다!")
+    async def run_search(self, fn, *args):
+        """검색 작업을 스레드 풀에서 실행하고 오류를 HTTP 상태로 변환 (이벤트 루프는 막지 않음)"""
+        try:
+            return await self.executor.run(fn, *args)
+        except (SearchBusyError, SearchTimeoutError) as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    def load_snapshot(self) -> bool:
+        """컬렉션별로 current 포인터가 가리키는 벡터 스냅샷 로드 (하나 이상 로드되면 성공)
+
+        아직 구축되지 않은 컬렉션은 벡터 구축이 스냅샷을 만들면 워처 또는 /admin/reload로 로드된다.
+        """
+        print(f"🔍 벡터 스냅샷 로드 중... (컬렉션: {', '.join(self.collections.names())})")
+        loaded = self.search.load()
+        if not loaded:
             return False
-        
+        self.dimension = self.collections.current(loaded[0]).index.d
         return True
     
     def initialize_embedding_client(self):
         """임베딩 클라이언트 초기화"""
         try:
-            self.embedding_client = ClovaEmbeddingAPI()
+            self.embedding_client = self.search.embedding_client
             print("✅ 임베딩 클라이언트 초기화 완료")
             return True
         except Exception as e:
             print(f"❌ 임베딩 클라이언트 초기화 실패: {e}")
             return False
     
-    def build_faiss_index(self):
-        """FAISS 인덱스 구축"""
-        if not self.vectors:
-            print("❌ 벡터가 로드되지 않았습니다!")
-            return False
-        
-        print("🔧 FAISS 인덱스 구축 중...")
-        
-        try:
-            # 벡터를 numpy 배열로 변환
-            vectors_array = np.array(self.vectors, dtype=np.float32)
-            
-            # FAISS 인덱스 생성 (FlatIP 사용 - 내적 기반)
-            self.faiss_index = faiss.IndexFlatIP(self.dimension)
-            
-            # 벡터 추가
-            self.faiss_index.add(vectors_array)
-            
-            print(f"✅ FAISS 인덱스 구축 완료: {self.faiss_index.ntotal}개 벡터")
-            return True
-            
-        except Exception as e:
-            print(f"❌ FAISS 인덱스 구축 실패: {e}")
-            return False
-    
-    def search_similar_vectors(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """질문과 유사한 벡터 검색"""
-        if not self.embedding_client:
-            raise Exception("임베딩 클라이언트가 초기화되지 않았습니다.")
-        
-        if not self.faiss_index:
-            raise Exception("FAISS 인덱스가 구축되지 않았습니다.")
-        
-        # 질문을 벡터로 변환
-        query_vector = self.embedding_client.get_text_embedding(query)
-        query_array = np.array([query_vector], dtype=np.float32)
-        
-        # FAISS로 검색
-        similarities, indices = self.faiss_index.search(query_array, top_k)
-        
-        # 결과 반환
-        results = []
-        for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
-            if idx != -1:  # 유효한 결과인 경우
-                meta = self.metadata[idx]
-                results.append({
-                    "index": int(idx),
-                    "similarity": float(similarity),
-                    "type": meta.get("type", "unknown"),
-                    "filename": meta.get("filename", ""),
-                    "title": meta.get("title", ""),
-                    "text_content": meta.get("text_content", ""),
-                    "text_length": meta.get("text_length", 0),
-                    "created_at": meta.get("created_at", "")
-                })
-        
-        return results
+    def search_similar_vectors(self, query: str, top_k: int = 5, date_from: Optional[str] = None,
+                               date_to: Optional[str] = None, collection: Optional[str] = None) -> List[Dict[str, Any]]:
+        """질문과 유사한 벡터 검색 (collection이 없으면 기본 컬렉션, date_from/date_to가 있으면 해당 거래일 샤드만 검색)"""
+        return self.search.search(query, top_k, date_from, date_to, collection)
     
     def run_server(self, host: str = "0.0.0.0", port: int = 8000):
         """API 서버 실행"""
         print(f"🚀 FAISS 벡터 검색 API 서버 시작: http://{host}:{port}")
         print(f"📊 API 문서: http://{host}:{port}/docs")
         print(f"🔍 테스트: http://{host}:{port}/test")
+        self.collections.watch(get_vector_reload_interval())
         uvicorn.run(self.app, host=host, port=port)
 
 def main():
     """메인 함수"""
     api = FAISSVectorAPI()
     
-    # 벡터 데이터 로드
-    if not api.load_vectors():
-        print("❌ 벡터 데이터 로드 실패!")
+    # 벡터 스냅샷 로드 (FAISS 인덱스 포함)
+    if not api.load_snapshot():
+        print("❌ 벡터 스냅샷 로드 실패!")
         return
     
     # 임베딩 클라이언트 초기화
@@ -223,11 +266,6 @@ def main():
         print("❌ 임베딩 클라이언트 초기화 실패!")
         return
     
-    # FAISS 인덱스 구축
-    if not api.build_faiss_index():
-        print("❌ FAISS 인덱스 구축 실패!")
-        return
-    
     # API 서버 실행
     api.run_server()
 
@@ -3,121 +3,100 @@
 Vector DB1용 FAISS 벡터 검색 API 서버
 - vector_db_1의 벡터를 로드하여 FAISS 인덱스 구축
 - FastAPI를 통한 벡터 검색 API 제공
+- 벡터 구축이 새 스냅샷을 만들면 재시작 없이 교체 (주기적 확인 또는 POST /admin/reload)
+- 호환용 단독 서버: 같은 데이터는 FAISS API 서버 (포트 8000)의 focus_stocks 컬렉션으로도 제공
+- FAISS 검색은 이벤트 루프 밖 스레드 풀에서 실행 (동시 검색 수 제한, 요청별 제한 시간)
+- POST /search: 질문을 공유 임베딩 경로 (메모리 LRU 캐시 + 영구 캐시)로 임베딩해 검색
+- POST /search/vector: 이미 임베딩한 쿼리 벡터로 바로 검색 (임베딩 API 호출 없음, 차원이 다르면 400)
 """
 
-import pickle
-import json
-import numpy as np
-from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
-import faiss
 from datetime import datetime
 
+from config import get_vector_reload_interval
+from vector_collections import VectorCollections
+from vector_search import SearchBusyError, SearchExecutor, SearchTimeoutError, VectorSearch
+
 app = FastAPI(title="Vector DB1 FAISS API", version="1.0.0")
 
 class SearchRequest(BaseModel):
     query: str
-    top_k: int = 5
+    top_k: int = Field(5, gt=0)  # 반환할 결과 수 (0 이하면 422)
+    date_from: Optional[str] = None  # 거래일 범위 (YYYY-MM-DD, 양 끝 포함)
+    date_to: Optional[str] = None
 
 class SearchResponse(BaseModel):
     results: List[Dict[str, Any]]
     total_results: int
     query: str
 
+class VectorSearchRequest(BaseModel):
+    query_vector: List[float]  # 미리 계산한 쿼리 임베딩 (인덱스와 같은 차원)
+    top_k: int = Field(5, gt=0)  # 반환할 결과 수 (0 이하면 422)
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+
+class VectorSearchResponse(BaseModel):
+    results: List[Dict[str, Any]]
+    total_results: int
+
 class VectorDB1Manager:
     """Vector DB1 관리자"""
     
     def __init__(self):
-        # 현재 스크립트 위치를 기준으로 상대 경로 설정
-        current_dir = Path(__file__).parent
-        self.vector_dir = current_dir.parent / "vector_db_1"
-        self.vectors = []
-        self.metadata = []
-        self.index = None
-        self.is_loaded = False
+        # vector_db_1 저장소 컬렉션만 로드하는 벡터 검색 라이브러리 (VECTOR_COLLECTIONS 설정)
+        self.search = VectorSearch(VectorCollections(["vector_db_1"]))
+        self.collection = self.search.collections.default
+        # 현재 벡터 스냅샷 (코사인 유사도 인덱스 - 새 버전이 나오면 통째로 교체)
+        self.snapshots = self.search.collections.holder()
+        self.vector_dir = self.snapshots.vector_dir
+        # 블로킹 검색 실행기 (동시 검색 수 제한 + 요청별 제한 시간)
+        self.executor = SearchExecutor()
         
         print("🔧 Vector DB1 매니저 초기화 완료")
         print(f"📁 벡터 디렉토리: {self.vector_dir}")
     
+    @property
+    def is_loaded(self) -> bool:
+        return self.snapshots.current is not None
+    
     def load_vectors(self) -> bool:
-        """vector_db_1의 벡터와 메타데이터 로드"""
+        """current 포인터가 가리키는 vector_db_1 스냅샷 로드 (벡터, 메타데이터, FAISS 인덱스)"""
         try:
-            vectors_file = self.vector_dir / "vector_db_1_vectors.pkl"
-            metadata_file = self.vector_dir / "vector_db_1_metadata.json"
-            
-            if not vectors_file.exists():
-                print("❌ vector_db_1의 벡터 파일을 찾을 수 없습니다.")
-                return False
-            
-            if not metadata_file.exists():
-                print("❌ vector_db_1의 메타데이터 파일을 찾을 수 없습니다.")
-                return False
-            
-            # 벡터 로드
-            with open(vectors_file, 'rb') as f:
-                self.vectors = pickle.load(f)
-            
-            # 메타데이터 로드
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                self.metadata = json.load(f)
-            
-            print(f"✅ vector_db_1 벡터 로드 완료: {len(self.vectors)}개")
-            print(f"✅ vector_db_1 메타데이터 로드 완료: {len(self.metadata)}개")
-            
-            # FAISS 인덱스 구축
-            if self.vectors:
-                vectors_array = np.array(self.vectors, dtype=np.float32)
-                dimension = vectors_array.shape[1]
-                
-                # FAISS 인덱스 생성 (L2 거리)
-                self.index = faiss.IndexFlatL2(dimension)
-                self.index.add(vectors_array)
-                
-                print(f"✅ FAISS 인덱스 구축 완료: {self.index.ntotal}개 벡터")
-                self.is_loaded = True
-                return True
-            
-            return False
-            
+            return self.snapshots.reload(force=True)["reloaded"]
         except Exception as e:
             print(f"❌ 벡터 로드 실패: {e}")
             return False
     
-    def search_vectors(self, query_vector: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
-        """벡터 검색 수행"""
-        if not self.is_loaded or not self.index:
+    def search_vectors(self, query_vector: List[float], top_k: int = 5, date_from: Optional[str] = None,
+                       date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """벡터 검색 수행 (date_from/date_to가 있으면 해당 거래일 샤드만 검색)
+
+        쿼리 벡터 차원이 인덱스와 다르면 ValueError.
+        """
+        if not self.is_loaded:
             return []
         
-        try:
-            # 쿼리 벡터를 numpy 배열로 변환
-            query_array = np.array([query_vector], dtype=np.float32)
-            
-            # FAISS 검색 수행
-            distances, indices = self.index.search(query_array, top_k)
-            
-            # 결과 구성
-            results = []
-            for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-                if idx < len(self.metadata):
-                    result = {
-                        "rank": i + 1,
-                        "distance": float(distance),
-                        "metadata": self.metadata[idx],
-                        "text_content": self.metadata[idx].get('text_content', ''),
-                        "filename": self.metadata[idx].get('filename', ''),
-                        "type": self.metadata[idx].get('type', ''),
-                        "title": self.metadata[idx].get('title', '')
-                    }
-                    results.append(result)
-            
-            return results
-            
-        except Exception as e:
-            print(f"❌ 벡터 검색 실패: {e}")
-            return []
+        # 코사인 유사도 검색 (FAISS 검색 한 번, 메타데이터 일괄 조회)
+        hits = self.search.search_hits([query_vector], top_k, date_from, date_to)[0]
+        return [{
+            "rank": i + 1,
+            "similarity": similarity,
+            "distance": 1.0 - similarity,  # 코사인 거리
+            "metadata": meta,
+            "text_content": meta.get('text_content', ''),
+            "filename": meta.get('filename', ''),
+            "type": meta.get('type', ''),
+            "title": meta.get('title', '')
+        } for i, (similarity, _, meta) in enumerate(hits)]
+    
+    def search_text(self, query: str, top_k: int = 5, date_from: Optional[str] = None,
+                    date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """질문을 임베딩해 벡터 검색 (반복 질문은 캐시된 쿼리 벡터 사용, 임베딩 실패 시 Exception)"""
+        return self.search_vectors(self.search.embed(query), top_k, date_from, date_to)
 
 # 전역 매니저 인스턴스
 vector_manager = VectorDB1Manager()
@@ -131,54 +110,78 @@ async def startup_event():
         print("✅ 서버 시작 완료")
     else:
         print("❌ 서버 시작 실패")
+    # 새 스냅샷이 나오면 재시작 없이 교체 (처음 로드에 실패했어도 다음 버전이 나오면 로드)
+    vector_manager.snapshots.watch(get_vector_reload_interval())
 
 @app.get("/health")
 async def health_check():
     """헬스 체크"""
+    snapshot = vector_manager.snapshots.current
     return {
         "status": "healthy",
-        "vectors_loaded": vector_manager.is_loaded,
-        "total_vectors": len(vector_manager.vectors),
-        "total_metadata": len(vector_manager.metadata),
+        "vectors_loaded": snapshot is not None,
+        "total_vectors": len(snapshot.vectors) if snapshot else 0,
+        "total_metadata": snapshot.metadata_count if snapshot else 0,
+        "snapshot_version": snapshot.version if snapshot else None,
+        "search_executor": vector_manager.executor.get_stats(),
+        "embedding_cache": vector_manager.search.cache_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
 @app.get("/info")
 async def get_info():
     """벡터 정보 조회"""
+    snapshot = vector_manager.snapshots.current
     return {
         "vector_dir": str(vector_manager.vector_dir),
-        "vectors_loaded": vector_manager.is_loaded,
-        "total_vectors": len(vector_manager.vectors),
-        "total_metadata": len(vector_manager.metadata),
-        "faiss_index_built": vector_manager.index is not None,
-        "index_size": vector_manager.index.ntotal if vector_manager.index else 0
+        "vectors_loaded": snapshot is not None,
+        "total_vectors": len(snapshot.vectors) if snapshot else 0,
+        "total_metadata": snapshot.metadata_count if snapshot else 0,
+        "faiss_index_built": snapshot is not None,
+        "index_size": snapshot.index.ntotal if snapshot else 0,
+        "snapshot": snapshot.info() if snapshot else None,
+        "shards": snapshot.index.shard_info() if snapshot else []
     }
 
-@app.post("/search", response_model=SearchResponse)
-async def search_vectors(request: SearchRequest):
-    """벡터 검색 API"""
+@app.post("/admin/reload")
+def reload_snapshot(force: bool = False):
+    """새 벡터 스냅샷으로 교체 (로드하는 동안에도 기존 스냅샷으로 검색 처리)"""
+    result = vector_manager.snapshots.reload(force=force)
+    if result.get("error"):
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
+
+async def run_search(fn, *args):
+    """검색 작업을 스레드 풀에서 실행하고 오류를 HTTP 상태로 변환 (검색 중에도 다른 요청 응답)"""
+    if not vector_manager.is_loaded:
+        raise HTTPException(status_code=404, detail="벡터가 로드되지 않았습니다")
     try:
-        # 여기서는 간단히 쿼리 텍스트를 기반으로 검색
-        # 실제로는 쿼리 텍스트를 벡터로 변환해야 함
-        # 임시로 첫 번째 벡터를 사용
-        if not vector_manager.vectors:
-            raise HTTPException(status_code=404, detail="벡터가 로드되지 않았습니다")
-        
-        # 임시 쿼리 벡터 (실제로는 텍스트를 벡터로 변환해야 함)
-        query_vector = vector_manager.vectors[0]  # 임시
-        
-        results = vector_manager.search_vectors(query_vector, request.top_k)
-        
-        return SearchResponse(
-            results=results,
-            total_results=len(results),
-            query=request.query
-        )
-        
+        return await vector_manager.executor.run(fn, *args)
+    except (SearchBusyError, SearchTimeoutError) as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"검색 중 오류: {str(e)}")
 
+@app.post("/search", response_model=SearchResponse)
+async def search_vectors(request: SearchRequest):
+    """벡터 검색 API (질문 임베딩 - 캐시 확인 후 필요할 때만 임베딩 API 호출)"""
+    results = await run_search(vector_manager.search_text, request.query, request.top_k,
+                               request.date_from, request.date_to)
+    return SearchResponse(
+        results=results,
+        total_results=len(results),
+        query=request.query
+    )
+
+@app.post("/search/vector", response_model=VectorSearchResponse)
+async def search_by_vector(request: VectorSearchRequest):
+    """미리 계산한 쿼리 벡터로 검색 (임베딩 API를 거치지 않음)"""
+    results = await run_search(vector_manager.search_vectors, request.query_vector, request.top_k,
+                               request.date_from, request.date_to)
+    return VectorSearchResponse(results=results, total_results=len(results))
+
 @app.get("/test")
 async def test_endpoint():
     """테스트 엔드포인트"""
@@ -4,26 +4,53 @@
 - LlamaIndex의 문서 처리 파이프라인 유지
 - CLOVA 세그멘테이션 API 사용
 - CLOVA 임베딩 API로 직접 저장
+- 문서 ID 기준 upsert (같은 청크는 한 번만 저장, 출처별 삭제 지원)
+- 거래일 순으로 정렬 저장 + 날짜 샤드 매니페스트 (오래된 샤드 병합, 보존 기간 적용)
+- 저장이 끝나면 버전별 스냅샷을 만들고 current 포인터 교체 (API 서버는 재시작 없이 새 버전으로 전환)
 """
 
+import hashlib
 import json
+from email.utils import parsedate_to_datetime
 import os
-import pickle
+import queue
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 import numpy as np
 from datetime import datetime
 import pandas as pd
 
-from clova_embedding import ClovaEmbeddingAPI
-from clova_segmentation import ClovaSegmentationClient
+from config import (
+    get_pipeline_batch_size, get_pipeline_segment_workers, get_pipeline_concurrent,
+    get_pipeline_checkpoint_every, get_pipeline_checkpoint_seconds, get_pipeline_resume,
+    get_pipeline_retry_rounds, get_pipeline_retry_backoff_seconds, get_vector_storage_format,
+    get_vector_shard_compact_after_days, get_vector_retention_days, get_vector_snapshot_keep
+)
+from embedding_backends import create_embedding_client, create_segmentation_client
+from embedding_cache import normalize_text
+from metadata_store import open_metadata_store
+from ingestion_pipeline import (
+    BuildCheckpoint, DeadLetterQueue, ProgressTracker, batched, chunk_key, completed_chunk_keys, document_id
+)
 from news_content_extractor import NewsContentExtractor
+from pipeline_metrics import get_pipeline_metrics, reset_pipeline_metrics
+from text_store import TextBlobStore
+from vector_shards import (
+    date_cutoff, manifest_path, plan_shards, remove_stale_shard_indexes, shard_sort_key, write_manifest
+)
+from vector_snapshot import publish_snapshot, read_pointer
+from vector_storage import load_vector_matrix, save_quantized, save_vector_matrix
 
 
 class HybridVectorManager:
     """하이브리드 벡터 관리 시스템 (LlamaIndex + CLOVA)"""
     
-    def __init__(self, data_dir: str = None):
+    def __init__(self, data_dir: str = None, vector_dir: str = None, store_name: str = "hybrid"):
         # 현재 스크립트 위치를 기준으로 상대 경로 설정
         current_dir = Path(__file__).parent
         project_root = current_dir.parent  # RAG 폴더
@@ -32,88 +59,470 @@ class HybridVectorManager:
             self.data_dir = project_root / "data"
         else:
             self.data_dir = Path(data_dir)
-        self.vector_dir = project_root / "vector_db"
+        if vector_dir is None:
+            self.vector_dir = project_root / "vector_db"
+        else:
+            self.vector_dir = Path(vector_dir)
         self.vector_dir.mkdir(exist_ok=True)
+        self.store_name = store_name
         
-        # CLOVA 클라이언트 초기화
-        self.embedding_client = ClovaEmbeddingAPI()
-        self.segmentation_client = ClovaSegmentationClient()
+        # 임베딩/세그멘테이션 클라이언트 초기화 (EMBEDDING_BACKEND / SEGMENTATION_BACKEND 설정)
+        self.embedding_client = create_embedding_client()
+        self.segmentation_client = create_segmentation_client()
         self.news_extractor = NewsContentExtractor()
         
-        # 벡터 저장소
-        self.vectors_file = self.vector_dir / "hybrid_vectors.pkl"
-        self.metadata_file = self.vector_dir / "hybrid_metadata.json"
+        # 벡터 저장소 (예: hybrid_vectors.npy, vector_db_1_vectors.npy - 연속 float32 행렬)
+        self.vectors_file = self.vector_dir / f"{store_name}_vectors.npy"
+        self.legacy_vectors_file = self.vector_dir / f"{store_name}_vectors.pkl"
+        # 메타데이터는 벡터 id(행 번호) 기준 SQLite 저장소 (이전 형식 JSON은 처음 열 때 가져옴)
+        self.metadata_store = open_metadata_store(self.vector_dir, store_name)
+        self.metadata_file = self.metadata_store.db_path
+        self.legacy_metadata_file = self.vector_dir / f"{store_name}_metadata.json"
+        
+        # 청크 텍스트는 append-only blob 파일에 저장 (메타데이터에는 위치만 기록)
+        self.text_store = TextBlobStore(self.vector_dir, store_name)
+        
+        # 구축 중 체크포인트 (중단 시 재개용)
+        self.checkpoint = BuildCheckpoint(
+            self.vector_dir / f"{store_name}_checkpoint.pkl",
+            every_chunks=get_pipeline_checkpoint_every(),
+            every_seconds=get_pipeline_checkpoint_seconds()
+        )
+        
+        # 문서 ID → 저장 위치 색인, 이번 실행에서 다시 처리한 출처별 문서 ID (이전 청크 정리용)
+        self._doc_positions: Dict[str, int] = {}
+        self._ingested_sources: Dict[str, set] = {}
+        self._ingested_files = set()
+        self._ingest_lock = threading.Lock()
+        
+        # 임베딩 실패 청크 (인덱스에서 제외하고 재시도 대기)
+        self.dead_letters = DeadLetterQueue(self.vector_dir / f"{store_name}_dead_letter.json")
+        
+        # 거래일 샤드 매니페스트 (오래된 날짜 샤드는 월 단위로 병합)
+        self.shard_manifest_file = manifest_path(self.vector_dir, store_name)
+        self.shard_compact_after_days = get_vector_shard_compact_after_days()
+        
+        # 실행별 계측 보고서 (지연 시간, 대기 시간, 처리량)
+        self.report_file = self.vector_dir / f"{store_name}_run_report.json"
         
         # 벡터 데이터 로드
         self.vectors = []
         self.metadata = []
         self._load_vectors()
     
+    def _pending_vectors_file(self, generation: str) -> Path:
+        """메타데이터 커밋 전에 새 세대 벡터를 기록해 두는 파일"""
+        return self.vectors_file.with_name(f"{self.vectors_file.name}.{generation}.pending")
+    
+    def _recover_pending_vectors(self):
+        """저장 도중 중단된 벡터 파일 정리
+        
+        메타데이터 DB에 기록된 세대의 파일이 남아 있으면 커밋 후 교체 전에 중단된 것이므로 마저 교체하고,
+        다른 세대의 파일은 메타데이터 커밋 전에 중단된 것이므로 삭제한다.
+        """
+        generation = self.metadata_store.generation()
+        for pending in self.vector_dir.glob(f"{self.vectors_file.name}.*.pending"):
+            if generation is not None and pending == self._pending_vectors_file(generation):
+                os.replace(pending, self.vectors_file)
+                print(f"♻️ 중단된 저장 마무리: {self.vectors_file.name} (세대 {generation})")
+            else:
+                pending.unlink()
+    
     def _load_vectors(self):
-        """저장된 벡터 데이터 로드"""
+        """저장된 벡터 데이터 로드 (벡터 수와 메타데이터 수가 다르면 짝이 맞지 않으므로 사용하지 않음)"""
         try:
-            if self.vectors_file.exists():
-                with open(self.vectors_file, 'rb') as f:
-                    self.vectors = pickle.load(f)
-                print(f"✅ 기존 벡터 로드 완료: {len(self.vectors)}개")
+            self._recover_pending_vectors()
             
-            if self.metadata_file.exists():
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    self.metadata = json.load(f)
-                print(f"✅ 기존 메타데이터 로드 완료: {len(self.metadata)}개")
+            # mmap으로 열어 행 단위 뷰 목록으로 사용 (새 벡터는 뒤에 추가)
+            matrix = load_vector_matrix(self.vectors_file)
+            vectors = list(matrix) if matrix is not None else []
+            metadata = self.metadata_store.load_all()
+            if len(vectors) != len(metadata):
+                raise ValueError(f"벡터 파일 ({len(vectors)}개)과 메타데이터 ({len(metadata)}개)의 짝이 맞지 않습니다")
+            
+            self.vectors, self.metadata = vectors, metadata
+            if self.vectors:
+                print(f"✅ 기존 벡터 로드 완료: {len(self.vectors)}개 (세대 {self.metadata_store.generation() or '없음'})")
+            
+            self._drop_zero_vectors()
                 
         except Exception as e:
             print(f"⚠️ 벡터 로드 오류: {e}")
             self.vectors = []
             self.metadata = []
+        self._index_documents()
+    
+    def _index_documents(self):
+        """문서 ID → 저장 위치 색인 재구성 (doc_id가 없는 이전 형식 항목은 제외)"""
+        self._doc_positions = {meta["doc_id"]: i for i, meta in enumerate(self.metadata) if meta.get("doc_id")}
+    
+    def _remove_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """메타데이터가 조건에 맞는 벡터 삭제 (대기 중인 실패 청크 포함) - 삭제된 벡터 수 반환"""
+        kept = [i for i, meta in enumerate(self.metadata) if not predicate(meta)]
+        removed = len(self.metadata) - len(kept)
+        if removed:
+            self.vectors = [self.vectors[i] for i in kept]
+            self.metadata = [self.metadata[i] for i in kept]
+            self._index_documents()
+        self.dead_letters.discard_where(predicate)
+        return removed
+    
+    def delete_by_source(self, source: str, save: bool = True) -> int:
+        """출처의 청크를 모두 삭제하고 삭제 수 반환
+        
+        source: source_id (예: "url:https://...", "stock:005930", "file:krx_daily_trading_20250801.csv")
+                또는 원본 파일명
+        """
+        removed = self._remove_where(lambda meta: source in (meta.get("source_id"), meta.get("filename")))
+        self.dead_letters.save()
+        if removed and save:
+            self._save_vectors()
+        print(f"🗑️ 출처 삭제: {source} ({removed}개 벡터)")
+        return removed
+    
+    def _drop_zero_vectors(self):
+        """이전 버전이 임베딩 실패 시 저장한 영벡터 제거 (검색 결과를 왜곡하므로 인덱스에서 제외)"""
+        if len(self.vectors) != len(self.metadata):
+            return
+        kept = [(vector, meta) for vector, meta in zip(self.vectors, self.metadata) if any(vector)]
+        dropped = len(self.vectors) - len(kept)
+        if dropped:
+            self.vectors = [vector for vector, _ in kept]
+            self.metadata = [meta for _, meta in kept]
+            print(f"🧹 임베딩 실패로 저장된 영벡터 {dropped}개 제외")
+    
+    def _sort_by_trading_date(self):
+        """거래일 순으로 행 정렬 (같은 거래일 행이 연속 구간이 되어 샤드 = 행 구간)"""
+        order = sorted(range(len(self.metadata)), key=lambda i: shard_sort_key(self.metadata[i]))
+        if order != list(range(len(order))):
+            self.vectors = [self.vectors[i] for i in order]
+            self.metadata = [self.metadata[i] for i in order]
+            self._index_documents()
     
-    def _save_vectors(self):
-        """벡터 데이터 저장"""
+    def apply_retention(self, retention_days: int) -> int:
+        """가장 최근 거래일보다 retention_days일 이상 오래된 벡터 삭제 (거래일이 없는 항목은 유지)"""
+        cutoff = date_cutoff(max((shard_sort_key(meta) for meta in self.metadata), default=""), retention_days)
+        if not cutoff:
+            return 0
+        removed = self._remove_where(lambda meta: bool(meta.get("trading_date")) and meta["trading_date"] < cutoff)
+        if removed:
+            print(f"🗑️ 보존 기간({retention_days}일, {cutoff} 이전) 지난 벡터 {removed}개 삭제")
+        return removed
+    
+    def maintain_shards(self, retention_days: Optional[int] = None,
+                        compact_after_days: Optional[int] = None) -> Dict[str, Any]:
+        """보존 기간 적용 및 샤드 재병합 후 저장 (vector_shards.py 명령에서 사용)"""
+        if compact_after_days is not None:
+            self.shard_compact_after_days = compact_after_days
+        removed = self.apply_retention(get_vector_retention_days() if retention_days is None else retention_days)
+        self.dead_letters.save()
+        saved = self._save_vectors()
+        return {
+            "removed_vectors": removed,
+            "total_vectors": len(self.vectors),
+            "shards": len(plan_shards([shard_sort_key(meta) for meta in self.metadata], self.shard_compact_after_days)),
+            "saved": saved
+        }
+    
+    def _save_vectors(self) -> bool:
+        """벡터 데이터 저장 (거래일 순 정렬 후 벡터, 메타데이터, 샤드 매니페스트 순으로 기록)
+        
+        벡터 파일과 메타데이터 DB는 한 세대로 함께 교체한다. 새 벡터를 세대 이름의 임시 파일에 먼저 쓰고,
+        메타데이터와 세대를 한 트랜잭션으로 커밋한 뒤 벡터 파일을 교체한다 (커밋이 교체 시점,
+        중간에 중단되면 다음 로드 시 _recover_pending_vectors가 정리).
+        """
         try:
-            with open(self.vectors_file, 'wb') as f:
-                pickle.dump(self.vectors, f)
-            
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+            with get_pipeline_metrics().timer("stage.save"):
+                self._sort_by_trading_date()
+                generation = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+                pending_file = self._pending_vectors_file(generation)
+                matrix = save_vector_matrix(pending_file, self.vectors)
+                
+                # 새 청크 텍스트를 blob 파일로 옮기고, 쓰이지 않는 영역이 많으면 새 파일로 압축
+                self.text_store.externalize(self.metadata)
+                if self.text_store.needs_compaction(self.metadata):
+                    path = self.text_store.compact(self.metadata)
+                    print(f"🗜️ 청크 텍스트 파일 압축: {path.name}")
+                self.metadata_store.replace_all(self.metadata, generation=generation)
+                os.replace(pending_file, self.vectors_file)
+                self.text_store.remove_unused(self.metadata)
+                
+                # 거래일 샤드 매니페스트 (서버는 날짜 범위와 겹치는 샤드만 검색)
+                shards = plan_shards([shard_sort_key(meta) for meta in self.metadata], self.shard_compact_after_days)
+                write_manifest(self.shard_manifest_file, shards, self.shard_compact_after_days)
+                remove_stale_shard_indexes(self.vectors_file.with_suffix(""), shards)
+                
+                # 양자화 저장 형식 (float16 / int8) 파일 추가 저장
+                storage_format = get_vector_storage_format()
+                if len(matrix):
+                    save_quantized(self.vectors_file.with_suffix(""), matrix, storage_format)
+                
+                # .npy / SQLite로 변환이 끝난 이전 형식 파일 삭제
+                for legacy_file in (self.legacy_vectors_file, self.legacy_metadata_file):
+                    if legacy_file.exists():
+                        legacy_file.unlink()
+                
+                # 서버가 읽는 새 버전 스냅샷을 만들고 current 포인터 교체
+                version = publish_snapshot(self.vector_dir, self.store_name, self.metadata_store,
+                                           len(self.vectors), keep=get_vector_snapshot_keep())
                 
-            print(f"✅ 벡터 저장 완료: {len(self.vectors)}개")
+            print(f"✅ 벡터 저장 완료: {len(self.vectors)}개 ({storage_format}, 샤드 {len(shards)}개, 스냅샷 {version})")
+            return True
             
         except Exception as e:
             print(f"❌ 벡터 저장 오류: {e}")
+            return False
     
-    def process_documents(self, rebuild: bool = False) -> bool:
-        """문서들을 처리하여 벡터로 변환 (LlamaIndex 방식 + CLOVA 저장)"""
+    def process_documents(self, rebuild: bool = False, concurrent: Optional[bool] = None,
+                          resume: Optional[bool] = None) -> bool:
+        """문서들을 처리하여 벡터로 변환 (LlamaIndex 방식 + CLOVA 저장)
+        
+        단계: 로드 → 정규화 → 세그멘테이션 → 중복 제거 → 임베딩 → 저장
+        - concurrent=False: 단계별로 전체 작업 목록을 만든 뒤 다음 단계 실행 (전체 청크 수 기준 ETA)
+        - concurrent=True: 세그멘테이션(생산자)과 임베딩(소비자)을 동시에 실행
+        - rebuild=False: 문서 ID (출처, 거래일, 청크 해시) 기준 upsert - 이미 저장된 청크는 건너뛰고,
+          다시 처리한 출처에서 더 이상 나오지 않는 이전 청크는 삭제
+        - resume=True: 이전 실행의 체크포인트를 불러와 이미 임베딩된 청크는 건너뜀 (문서 ID 기준)
+        
+        실행이 끝나면 (중단 포함) 계측 보고서를 {store_name}_run_report.json 에 저장한다.
+        """
+        if concurrent is None:
+            concurrent = get_pipeline_concurrent()
+        if resume is None:
+            resume = get_pipeline_resume()
+        
+        metrics = reset_pipeline_metrics()
+        metrics.set_info("run", {
+            "store": self.store_name,
+            "data_dir": str(self.data_dir),
+            "embedding_model": self.embedding_client.model_id,
+            "mode": "concurrent" if concurrent else "staged",
+            "rebuild": rebuild,
+            "resume": resume
+        })
+        status = "interrupted"
+        self._failure_status = "no_documents"
+        try:
+            success = self._process_documents(rebuild, concurrent, resume)
+            status = "completed" if success else self._failure_status
+            return success
+        finally:
+            metrics.set_info("status", status)
+            metrics.set_info("pending_embeddings", len(self.dead_letters))
+            metrics.set_info("total_vectors", len(self.vectors))
+            try:
+                metrics.write_report(self.report_file)
+                print(f"📊 실행 보고서 저장: {self.report_file}")
+            except Exception as e:
+                print(f"⚠️ 실행 보고서 저장 실패: {e}")
+    
+    def _process_documents(self, rebuild: bool, concurrent: bool, resume: bool) -> bool:
+        metrics = get_pipeline_metrics()
         if rebuild:
             print("🔄 벡터 재구축 모드")
             self.vectors = []
             self.metadata = []
         
-        print("📚 문서 처리 시작...")
+        state = self.checkpoint.load() if resume else None
+        if state:
+            # 체크포인트의 기준 상태 위에 저장된 배치를 순서대로 다시 적용
+            if state["base"] == "empty":
+                self.vectors = []
+                self.metadata = []
+            self._index_documents()
+            for vector, metadata in state["entries"]:
+                self._upsert(vector, metadata)
+            print(f"⏯️ 체크포인트에서 재개: {len(state['entries'])}개 벡터 복원, 총 {len(self.vectors)}개 "
+                  f"({state['saved_at']} 저장)")
+        else:
+            self.checkpoint.start("empty" if rebuild else "store")
+        # 저장소/체크포인트에 이미 있는 문서 ID는 임베딩하지 않음
+        self._index_documents()
+        self._ingested_sources = {}
+        self._ingested_files = set()
         
-        # CSV 파일 처리
-        csv_success = self._process_csv_files()
+        print("📚 문서 처리 시작...")
         
-        # 뉴스 파일 처리
-        news_success = self._process_news_files()
+        # 1. 로드
+        with metrics.timer("stage.load"):
+            documents = self._load_documents()
+        metrics.increment("documents.loaded", len(documents))
+        if not documents:
+            print("❌ 문서 처리 실패")
+            return False
         
-        if csv_success or news_success:
-            self._save_vectors()
-            print(f"🎉 문서 처리 완료: 총 {len(self.vectors)}개 벡터")
-            return True
+        # 2. 정규화
+        with metrics.timer("stage.normalize"):
+            documents = [doc for doc in (self._normalize_document(doc) for doc in documents) if doc]
+        print(f"📋 처리 대상 문서: {len(documents)}개")
         
-        print("❌ 문서 처리 실패")
-        return False
+        # 3~6. 세그멘테이션 → 중복 제거 → 임베딩 → 저장 (문서 ID 기준 upsert)
+        try:
+            if concurrent:
+                added = self._run_concurrent_pipeline(documents)
+            else:
+                added = self._run_staged_pipeline(documents)
+            # 7. 다시 처리한 출처에서 더 이상 나오지 않는 이전 청크 삭제, 보존 기간 적용
+            with metrics.timer("stage.remove_superseded"):
+                removed = self._remove_superseded()
+                removed += self.apply_retention(get_vector_retention_days())
+            # 8. 실패 청크 재시도 (백오프)
+            added += self._retry_dead_letters()
+        except BaseException:
+            # Ctrl-C 또는 예기치 않은 오류: 지금까지의 결과를 남기고 종료
+            print("⏸️ 벡터 구축 중단 - 체크포인트 저장 후 종료합니다 (다음 실행 시 이어서 진행)")
+            self.checkpoint.save()
+            self.dead_letters.save()
+            raise
+        
+        cache_stats = self.embedding_client.get_cache_stats()
+        metrics.set_info("embedding_cache", cache_stats)
+        if cache_stats:
+            print(f"💾 임베딩 캐시: 적중 {cache_stats['hits']}회, 미적중 {cache_stats['misses']}회 "
+                  f"(적중률 {cache_stats['hit_rate']:.1%}, 저장 항목 {cache_stats['entries']}개)")
+        
+        if not self._save_vectors():
+            # 스냅샷을 만들지 못했으므로 실패로 반환 (임베딩 결과는 체크포인트에 남겨 다음 실행에서 재사용)
+            self._failure_status = "save_failed"
+            self.checkpoint.save()
+            self.dead_letters.save()
+            print("❌ 문서 처리 실패: 벡터를 저장하지 못해 새 스냅샷을 만들지 않았습니다 (다음 실행 시 체크포인트에서 재개)")
+            return False
+        self.checkpoint.clear()
+        print(f"🎉 문서 처리 완료: 신규/갱신 {added}개, 삭제 {removed}개, "
+              f"변경 없음 {metrics.counter('chunks.unchanged')}개, 총 {len(self.vectors)}개 벡터")
+        if len(self.dead_letters):
+            print(f"⚠️ 임베딩 대기 청크: {len(self.dead_letters)}개 (인덱스 제외, {self.dead_letters.path.name}에 기록 - 다음 실행 시 재시도)")
+        return True
+    
+    # ------------------------------------------------------------------
+    # 파이프라인 실행
+    # ------------------------------------------------------------------
+    def _run_staged_pipeline(self, documents: List[Dict[str, Any]]) -> int:
+        """단계별 실행: 전체 청크 목록을 먼저 만든 뒤 배치 임베딩"""
+        # 3. 세그멘테이션 (네트워크 지연을 겹치도록 문서 단위 병렬 처리)
+        print(f"✂️ 세그멘테이션 단계: {len(documents)}개 문서")
+        with ThreadPoolExecutor(max_workers=get_pipeline_segment_workers()) as pool:
+            chunk_lists = list(pool.map(self._segment_document, documents))
+        chunks = [chunk for chunk_list in chunk_lists for chunk in chunk_list]
+        
+        # 4. 중복 제거
+        unique_chunks = self._dedupe_chunks(chunks, set())
+        print(f"🧹 중복 제거 단계: {len(chunks)}개 → {len(unique_chunks)}개 청크")
+        
+        # 5~6. 임베딩 및 저장 (전체 청크 수를 알고 있으므로 정확한 ETA 제공)
+        progress = ProgressTracker("임베딩", total=len(unique_chunks))
+        added = 0
+        for batch in batched(unique_chunks, get_pipeline_batch_size()):
+            added += self._persist_chunks(self._embed_chunks(batch))
+            progress.update(len(batch))
+        get_pipeline_metrics().set_info("embedding_progress", progress.summary())
+        return added
+    
+    def _run_concurrent_pipeline(self, documents: List[Dict[str, Any]]) -> int:
+        """생산자/소비자 실행: 세그멘테이션과 임베딩을 겹쳐서 처리"""
+        batch_size = get_pipeline_batch_size()
+        work_queue = queue.Queue(maxsize=batch_size * 4)
+        progress = ProgressTracker("임베딩")
+        seen = set()
+        done_marker = object()
+        
+        def produce():
+            try:
+                with ThreadPoolExecutor(max_workers=get_pipeline_segment_workers()) as pool:
+                    for chunk_list in pool.map(self._segment_document, documents):
+                        unique_chunks = self._dedupe_chunks(chunk_list, seen)
+                        progress.add_total(len(unique_chunks))
+                        for chunk in unique_chunks:
+                            work_queue.put(chunk)
+            except Exception as e:
+                print(f"❌ 세그멘테이션 단계 오류: {e}")
+            finally:
+                progress.finalize_total()
+                work_queue.put(done_marker)
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        
+        added = 0
+        batch = []
+        while True:
+            item = work_queue.get()
+            if item is not done_marker:
+                batch.append(item)
+            # 배치가 찼거나 대기 중인 작업이 없으면 바로 임베딩 (생산 속도에 맞춰 지연 최소화)
+            if batch and (item is done_marker or len(batch) >= batch_size or work_queue.empty()):
+                added += self._persist_chunks(self._embed_chunks(batch))
+                progress.update(len(batch))
+                batch = []
+            if item is done_marker:
+                break
+        
+        producer.join()
+        get_pipeline_metrics().set_info("embedding_progress", progress.summary())
+        return added
+    
+    def _remove_superseded(self) -> int:
+        """이번 실행에서 다시 처리한 출처의 청크 중 새 결과에 없는 청크 (내용이 바뀐 이전 청크) 삭제"""
+        def superseded(meta: Dict[str, Any]) -> bool:
+            doc_ids = self._ingested_sources.get(meta.get("source_id"))
+            if doc_ids is not None:
+                return meta.get("doc_id") not in doc_ids
+            # doc_id가 없는 이전 형식 항목은 같은 파일을 다시 처리하면 새 항목으로 교체
+            return not meta.get("doc_id") and meta.get("filename") in self._ingested_files
+        
+        removed = self._remove_where(superseded)
+        get_pipeline_metrics().increment("chunks.superseded", removed)
+        if removed:
+            print(f"🧹 다시 처리한 출처의 이전 청크 {removed}개 삭제")
+        return removed
+    
+    def _retry_dead_letters(self) -> int:
+        """실패 청크를 지수 백오프로 재시도하고 성공한 청크 수 반환"""
+        added = 0
+        backoff = get_pipeline_retry_backoff_seconds()
+        rounds = get_pipeline_retry_rounds()
+        for attempt in range(rounds):
+            done_keys = completed_chunk_keys(self.metadata)
+            pending = []
+            for chunk in self.dead_letters.pending():
+                if chunk["metadata"].get("doc_id") in self._doc_positions or chunk_key(chunk["metadata"]) in done_keys:
+                    self.dead_letters.discard(chunk)
+                else:
+                    pending.append(chunk)
+            if not pending:
+                break
+            
+            delay = backoff * (2 ** attempt)
+            print(f"🔁 실패 청크 재시도 {attempt + 1}/{rounds}: {len(pending)}개 ({delay:.0f}초 후)")
+            get_pipeline_metrics().add_time("retry.backoff_sleep", delay)
+            time.sleep(delay)
+            for batch in batched(pending, get_pipeline_batch_size()):
+                added += self._persist_chunks(self._embed_chunks(batch))
+        
+        self.dead_letters.save()
+        return added
+    
+    # ------------------------------------------------------------------
+    # 단계별 처리
+    # ------------------------------------------------------------------
+    def _load_documents(self) -> List[Dict[str, Any]]:
+        """1단계: CSV/뉴스 파일을 읽어 문서 목록 생성"""
+        documents = self._load_csv_documents() + self._load_news_documents()
+        print(f"📥 로드 단계 완료: {len(documents)}개 문서")
+        return documents
     
-    def _process_csv_files(self) -> bool:
-        """CSV 파일들을 처리하여 벡터로 변환 (LlamaIndex 방식)"""
+    def _load_csv_documents(self) -> List[Dict[str, Any]]:
+        """CSV 파일들을 문서로 변환 (LlamaIndex 방식)"""
         csv_files = list(self.data_dir.glob("*.csv"))
         
         if not csv_files:
             print("📁 CSV 파일을 찾을 수 없습니다.")
-            return False
+            return []
         
         print(f"📊 CSV 파일 처리 중: {len(csv_files)}개")
         
+        documents = []
         for csv_file in csv_files:
             try:
                 print(f"  📄 처리 중: {csv_file.name}")
@@ -122,7 +531,8 @@ class HybridVectorManager:
                 df = pd.read_csv(csv_file, encoding='utf-8-sig')
                 
                 # DataFrame을 텍스트로 변환 (LlamaIndex 방식과 동일)
-                text_content = self._dataframe_to_text(df, csv_file.stem)
+                with get_pipeline_metrics().timer("load.text_build"):
+                    text_content = self._dataframe_to_text(df, csv_file.stem)
                 
                 # 첫 번째 항목 변환 결과 출력 (디버그)
                 print(f"  🔍 첫 번째 종목 변환 결과:")
@@ -133,43 +543,33 @@ class HybridVectorManager:
                 if len(lines) > 10:
                     print(f"    ... (총 {len(lines)}줄)")
                 
-                print(f"  🔧 CSV 데이터 - 최적화된 세그멘테이션 적용")
-                chunks = self._segment_text_with_clova(text_content, max_length=2048)
-                
-                # 각 청크를 CLOVA 임베딩 API로 벡터화 (직접 저장)
-                for i, chunk in enumerate(chunks):
-                    vector = self.embedding_client.get_text_embedding(chunk)
-                    
-                    if vector:
-                        self.vectors.append(vector)
-                        self.metadata.append({
-                            "filename": csv_file.name,
-                            "type": "csv",
-                            "chunk_index": i,
-                            "total_chunks": len(chunks),
-                            "text_content": chunk,  # 실제 텍스트 내용 추가
-                            "text_length": len(chunk),
-                            "created_at": datetime.now().isoformat()
-                        })
-                        print(f"    ✅ 청크 {i+1}/{len(chunks)} 벡터화 완료")
-                    else:
-                        print(f"    ❌ 청크 {i+1} 벡터화 실패")
+                # CSV 데이터는 최적화된 세그멘테이션 (큰 청크) 적용
+                documents.append({
+                    "text": text_content,
+                    "max_length": 2048,
+                    "metadata": {
+                        "filename": csv_file.name,
+                        "type": "csv",
+                        **self._csv_source(csv_file)
+                    }
+                })
                 
             except Exception as e:
                 print(f"  ❌ {csv_file.name} 처리 실패: {e}")
         
-        return True
+        return documents
     
-    def _process_news_files(self) -> bool:
-        """뉴스 파일들을 처리하여 벡터로 변환 (LlamaIndex 방식)"""
+    def _load_news_documents(self) -> List[Dict[str, Any]]:
+        """뉴스 파일들을 기사 단위 문서로 변환 (LlamaIndex 방식)"""
         news_files = list(self.data_dir.glob("*news*.json"))
         
         if not news_files:
             print("📰 뉴스 파일을 찾을 수 없습니다.")
-            return False
+            return []
         
         print(f"📰 뉴스 파일 처리 중: {len(news_files)}개")
         
+        documents = []
         for news_file in news_files:
             try:
                 print(f"  📄 처리 중: {news_file.name}")
@@ -183,7 +583,8 @@ class HybridVectorManager:
                 
                 for i, article in enumerate(articles):
                     # 본문 전체 추출 시도
-                    full_content = self._get_full_article_content(article)
+                    with get_pipeline_metrics().timer("load.article_fetch"):
+                        full_content = self._get_full_article_content(article)
                     
                     if full_content:
                         # 본문 전체가 있는 경우
@@ -200,37 +601,169 @@ class HybridVectorManager:
                             if line.strip():
                                 print(f"    {j+1:2d}: {line}")
                     
-                    # CLOVA 세그멘테이션 API로 청킹 (LlamaIndex 방식과 동일)
-                    print(f"  📰 뉴스 데이터 - 기본 세그멘테이션 적용")
-                    chunks = self._segment_text_with_clova(text_content, max_length=512)
-                    
-                    # 각 청크를 CLOVA 임베딩 API로 벡터화 (직접 저장)
-                    for j, chunk in enumerate(chunks):
-                        vector = self.embedding_client.get_text_embedding(chunk)
-                        
-                        if vector:
-                            self.vectors.append(vector)
-                            self.metadata.append({
-                                "filename": news_file.name,
-                                "type": "news",
-                                "article_index": i,
-                                "chunk_index": j,
-                                "total_articles": len(articles),
-                                "total_chunks": len(chunks),
-                                "title": article.get('title', ''),
-                                "text_content": chunk,  # 실제 텍스트 내용 추가
-                                "text_length": len(chunk),
-                                "created_at": datetime.now().isoformat()
-                            })
-                            print(f"    ✅ 기사 {i+1} 청크 {j+1}/{len(chunks)} 벡터화 완료")
-                        else:
-                            print(f"    ❌ 기사 {i+1} 청크 {j+1} 벡터화 실패")
+                    # 뉴스 데이터는 기본 세그멘테이션 적용
+                    documents.append({
+                        "text": text_content,
+                        "max_length": 512,
+                        "metadata": {
+                            "filename": news_file.name,
+                            "type": "news",
+                            "article_index": i,
+                            "total_articles": len(articles),
+                            "title": article.get('title', ''),
+                            **self._news_source(article, news_file, i)
+                        }
+                    })
                 
             except Exception as e:
                 print(f"  ❌ {news_file.name} 처리 실패: {e}")
         
+        return documents
+    
+    @staticmethod
+    def _csv_source(csv_file: Path) -> Dict[str, str]:
+        """CSV 파일의 출처 정보 (source_id, trading_date, 종목별 파일이면 stock_name)
+        
+        - 종목별 파일 ({종목명}_{종목코드}_{시작일}_{종료일}_{생성시각}.csv): 종목 코드 기준, 거래일은 종료일
+        - 그 외 (예: krx_daily_trading_20250801.csv): 파일명 기준, 거래일은 파일명의 날짜
+        """
+        match = re.match(r'^(.+)_([^_]+)_(\d{4}-\d{2}-\d{2})_(\d{4}-\d{2}-\d{2})_\d{8}_\d{6}$', csv_file.stem)
+        if match:
+            return {"source_id": f"stock:{match.group(2)}", "trading_date": match.group(4),
+                    "stock_name": match.group(1)}
+        
+        date_match = re.search(r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)', csv_file.stem)
+        trading_date = "-".join(date_match.groups()) if date_match else ""
+        return {"source_id": f"file:{csv_file.name}", "trading_date": trading_date}
+    
+    @staticmethod
+    def _news_source(article: Dict, news_file: Path, index: int) -> Dict[str, str]:
+        """뉴스 기사의 출처 정보 (source_id, trading_date) - 기사 URL 기준이라 여러 날의 뉴스 파일에 같은 기사가 있어도 한 번만 저장"""
+        url = article.get('originallink') or article.get('link')
+        source_id = f"url:{url}" if url else f"file:{news_file.name}#{index}"
+        try:
+            trading_date = parsedate_to_datetime(article.get('pubDate', '')).strftime('%Y-%m-%d')
+        except (TypeError, ValueError):
+            trading_date = ""
+        return {"source_id": source_id, "trading_date": trading_date}
+    
+    def _normalize_document(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """2단계: 유니코드 정규화, 줄 끝 공백 및 연속 빈 줄 제거 (빈 문서는 제외)"""
+        text = unicodedata.normalize("NFC", document.get("text") or "")
+        lines = [line.rstrip() for line in text.split('\n')]
+        text = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+        if not text:
+            return None
+        return dict(document, text=text)
+    
+    def _segment_document(self, document: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """3단계: 문서를 청크 작업 목록으로 분할"""
+        metrics = get_pipeline_metrics()
+        try:
+            with metrics.timer("stage.segmentation"):
+                chunks = self._segment_text_with_clova(document["text"], max_length=document["max_length"])
+        except Exception as e:
+            print(f"  ❌ 세그멘테이션 실패 ({document['metadata'].get('filename')}): {e}")
+            metrics.increment("documents.segmentation_failed")
+            return []
+        metrics.increment("chunks.segmented", len(chunks))
+        
+        items = []
+        source_id = document["metadata"].get("source_id") or f"file:{document['metadata'].get('filename', '')}"
+        for i, chunk in enumerate(chunks):
+            metadata = dict(document["metadata"], source_id=source_id)
+            chunk_hash = hashlib.sha256(normalize_text(chunk).encode('utf-8')).hexdigest()
+            metadata.update({
+                "doc_id": document_id(source_id, metadata.get("trading_date", ""), chunk_hash),
+                "chunk_index": i,
+                "total_chunks": len(chunks),
+                "chunk_hash": chunk_hash,
+                "text_content": chunk,  # 실제 텍스트 내용 추가
+                "text_length": len(chunk)
+            })
+            items.append({
+                "text": chunk,
+                "chunk_hash": chunk_hash,
+                "metadata": metadata
+            })
+        
+        # 세그멘테이션에 성공한 출처의 현재 문서 ID 기록 (여기 없는 이전 청크는 실행 끝에 삭제)
+        with self._ingest_lock:
+            self._ingested_sources.setdefault(source_id, set()).update(item["metadata"]["doc_id"] for item in items)
+            self._ingested_files.add(document["metadata"].get("filename"))
+        return items
+    
+    def _dedupe_chunks(self, chunks: List[Dict[str, Any]], seen: set) -> List[Dict[str, Any]]:
+        """4단계: 같은 실행 안에서 내용이 같은 청크와 저장소/체크포인트에 이미 있는 문서 ID 제거
+        
+        같은 문서 ID라도 저장된 임베딩 모델이 현재 모델과 다르면 다시 임베딩해 교체한다.
+        """
+        metrics = get_pipeline_metrics()
+        model_id = self.embedding_client.model_id
+        unique_chunks = []
+        for chunk in chunks:
+            if not chunk["text"].strip() or chunk["chunk_hash"] in seen:
+                metrics.increment("chunks.duplicate")
+                continue
+            position = self._doc_positions.get(chunk["metadata"]["doc_id"])
+            if position is not None and self.metadata[position].get("embedding_model") == model_id:
+                seen.add(chunk["chunk_hash"])
+                metrics.increment("chunks.unchanged")
+                continue
+            seen.add(chunk["chunk_hash"])
+            unique_chunks.append(chunk)
+        return unique_chunks
+    
+    def _embed_chunks(self, chunks: List[Dict[str, Any]]) -> List[tuple]:
+        """5단계: 청크 배치를 동시에 임베딩 - (청크, 벡터 또는 None, 오류) 목록 반환
+        
+        배치 전체가 실패하면 (예: 연결 오류) 배치의 모든 청크를 실패로 표시하고 다음 배치를 계속 처리한다.
+        """
+        with get_pipeline_metrics().timer("stage.embedding"):
+            try:
+                results = self.embedding_client.get_text_embeddings_or_errors([chunk["text"] for chunk in chunks])
+            except Exception as e:
+                print(f"    ❌ 임베딩 배치 실패 ({len(chunks)}개 청크): {e}")
+                results = [(None, str(e) or type(e).__name__)] * len(chunks)
+        return [(chunk, vector, error) for chunk, (vector, error) in zip(chunks, results)]
+    
+    def _upsert(self, vector: List[float], metadata: Dict[str, Any]) -> bool:
+        """문서 ID 기준으로 추가 또는 같은 위치에서 교체 (교체 여부 반환)"""
+        position = self._doc_positions.get(metadata.get("doc_id"))
+        if position is None:
+            if metadata.get("doc_id"):
+                self._doc_positions[metadata["doc_id"]] = len(self.vectors)
+            self.vectors.append(vector)
+            self.metadata.append(metadata)
+            return False
+        self.vectors[position] = vector
+        self.metadata[position] = metadata
         return True
     
+    def _persist_chunks(self, embedded_chunks: List[tuple]) -> int:
+        """6단계: 임베딩 결과를 문서 ID 기준으로 upsert (실패 청크는 dead-letter 파일에 기록)"""
+        metrics = get_pipeline_metrics()
+        upserted = []
+        for chunk, vector, error in embedded_chunks:
+            metadata = chunk["metadata"]
+            if vector is not None and any(vector):
+                metadata = dict(metadata, created_at=datetime.now().isoformat(),
+                                embedding_model=self.embedding_client.model_id)
+                if self._upsert(vector, metadata):
+                    metrics.increment("chunks.replaced")
+                self.dead_letters.discard(chunk)
+                upserted.append((vector, metadata))
+            else:
+                print(f"    ❌ {metadata.get('filename')} 청크 {metadata.get('chunk_index', 0) + 1} 벡터화 실패: {error}")
+                self.dead_letters.add(chunk, error or "영벡터 반환")
+        metrics.increment("chunks.embedded", len(upserted))
+        metrics.increment("chunks.failed", len(embedded_chunks) - len(upserted))
+        with metrics.timer("stage.persist"):
+            self.dead_letters.save()
+            # 이번 배치 결과만 체크포인트 끝에 추가 (누적 결과 전체를 다시 쓰지 않음)
+            self.checkpoint.record(upserted)
+        return len(upserted)
+    
     def _dataframe_to_text(self, df: pd.DataFrame, filename: str) -> str:
         """DataFrame을 텍스트로 변환 (LlamaIndex 방식과 동일)"""
         text_parts = []
@@ -377,8 +910,10 @@ class HybridVectorManager:
             "total_vectors": len(self.vectors),
             "vector_dimension": len(self.vectors[0]) if self.vectors else 0,
             "metadata_count": len(self.metadata),
+            "pending_embeddings": len(self.dead_letters),
             "vector_file": str(self.vectors_file),
-            "metadata_file": str(self.metadata_file)
+            "metadata_file": str(self.metadata_file),
+            "snapshot_version": (read_pointer(self.vector_dir, self.store_name) or {}).get("version")
         }
 
     def _get_full_article_content(self, article: Dict) -> Optional[str]:
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+FAISS 인덱스 종류 비교 (flat / ivf_flat / ivf_pq / hnsw)
+- 저장된 실제 벡터로 인덱스 종류별 구축 시간, 인덱스 크기, 쿼리 지연 시간 (p50/p99), flat 대비 recall@k 측정
+- 파라미터는 환경 변수 설정 (VECTOR_INDEX_*) 사용, 결과는 <store>_index_benchmark.json 에 저장
+
+사용법: python index_benchmark.py [컬렉션 또는 저장소 이름] [k] [쿼리수]
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+from vector_collections import resolve_collection
+from vector_snapshot import snapshot_directory
+from vector_storage import INDEX_TYPES, METRICS, build_index, build_params, index_spec, load_vector_matrix
+
+
+def _latencies_ms(index: faiss.Index, queries: np.ndarray, k: int) -> np.ndarray:
+    """서버처럼 쿼리를 하나씩 검색했을 때의 쿼리별 지연 시간 (ms)"""
+    latencies = np.empty(len(queries))
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        index.search(queries[i:i + 1], k)
+        latencies[i] = (time.perf_counter() - start) * 1000
+    return latencies
+
+
+def benchmark_index_types(matrix: np.ndarray, metric: str = "cosine", k: int = 10,
+                          n_queries: int = 200, index_types: Optional[List[str]] = None,
+                          seed: int = 0) -> List[Dict[str, Any]]:
+    """인덱스 종류별 구축 시간, 크기, 지연 시간, flat 대비 recall@k
+
+    저장된 벡터 중 일부를 쿼리로 떼어 내고 (실제 쿼리도 같은 임베딩 공간의 벡터) 나머지로
+    인덱스와 flat 정답을 구축한다. 쿼리 자신이 인덱스에 있으면 자기 자신이 항상 1위로 잡혀
+    recall이 부풀려지기 때문.
+    metric은 검색 서버와 같은 이름 ("cosine", "inner_product", "l2").
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if len(matrix) < 2:
+        raise ValueError(f"쿼리를 떼어 내려면 벡터가 2개 이상 필요합니다: {len(matrix)}")
+    rng = np.random.default_rng(seed)
+    held_out = np.zeros(len(matrix), dtype=bool)
+    held_out[rng.choice(len(matrix), size=min(n_queries, len(matrix) - 1), replace=False)] = True
+    queries = matrix[held_out]
+    matrix = matrix[~held_out]
+    n, dimension = matrix.shape
+    k = min(k, n)
+    faiss_metric, normalize = METRICS[metric]
+    if normalize:
+        faiss.normalize_L2(queries)
+
+    _, truth = build_index(matrix, "float32", metric=faiss_metric, normalize=normalize).search(queries, k)
+
+    report = []
+    for index_type in index_types or INDEX_TYPES:
+        spec = index_spec(index_type)
+        start = time.perf_counter()
+        index = build_index(matrix, "float32", metric=faiss_metric, spec=spec, normalize=normalize)
+        build_seconds = time.perf_counter() - start
+
+        _, found = index.search(queries, k)
+        hits = sum(len(set(truth[i]) & set(found[i]) - {-1}) for i in range(len(queries)))
+
+        latencies = _latencies_ms(index, queries, k)
+        params = build_params(spec, n, dimension)
+        report.append({
+            "index_type": index_type,
+            "built_as": params.get("type", "flat"),
+            "params": params,
+            "recall_at_k": hits / (len(queries) * k) if k else 0.0,
+            "k": k,
+            "build_seconds": build_seconds,
+            "index_mb": len(faiss.serialize_index(index)) / 1024 / 1024,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99))
+        })
+    return report
+
+
+if __name__ == "__main__":
+    _, vector_dir, store_name = resolve_collection(sys.argv[1] if len(sys.argv) > 1 else "hybrid")
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    n_queries = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    version, directory = snapshot_directory(vector_dir, store_name)
+    vectors = load_vector_matrix(directory / f"{store_name}_vectors.npy")
+    if vectors is None or len(vectors) < 2:
+        print(f"❌ 벡터 파일을 찾을 수 없습니다: {directory}")
+        sys.exit(1)
+
+    # 검색 서버와 같은 코사인 유사도로 비교
+    print(f"📊 인덱스 종류 비교: {store_name} ({vectors.shape[0]}개 x {vectors.shape[1]}차원, "
+          f"스냅샷 {version or '없음'}, 코사인 recall@{k}, 인덱스에서 뺀 쿼리 {min(n_queries, len(vectors) - 1)}개)")
+    report = benchmark_index_types(vectors, metric="cosine", k=k, n_queries=n_queries)
+    for row in report:
+        built_as = "" if row["built_as"] == row["index_type"] else f" (벡터 수가 적어 {row['built_as']}로 구축)"
+        print(f"  {row['index_type']:>8}: recall@{row['k']} {row['recall_at_k']:.4f}, "
+              f"구축 {row['build_seconds']:.2f}초, 인덱스 {row['index_mb']:.1f}MB, "
+              f"p50 {row['p50_ms']:.3f}ms, p99 {row['p99_ms']:.3f}ms{built_as}")
+
+    report_file = vector_dir / f"{store_name}_index_benchmark.json"
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            "store": store_name,
+            "snapshot_version": version,
+            "total_vectors": int(vectors.shape[0]),
+            "dimension": int(vectors.shape[1]),
+            "created_at": datetime.now().isoformat(),
+            "results": report
+        }, f, ensure_ascii=False, indent=2)
+    print(f"💾 비교 결과 저장: {report_file}")
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+벡터 구축 파이프라인 공용 도구
+- 단계별 작업 목록을 배치로 나누는 헬퍼
+- 전체 작업량 기준 진행률/ETA 출력
+- 장시간 구축 작업용 주기적 체크포인트 저장/재개
+- 임베딩 실패 청크 기록용 dead-letter 파일
+- 청크의 안정적인 문서 ID (출처, 거래일, 청크 해시)
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Any, Dict, Set, Tuple
+
+
+def batched(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """작업 목록을 batch_size 단위로 나누어 반환"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ProgressTracker:
+    """처리량 기반 진행률/ETA 추적기 (스레드 안전)"""
+
+    def __init__(self, label: str, total: Optional[int] = None):
+        self.label = label
+        self.total = total or 0
+        self.total_final = total is not None
+        self.done = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def add_total(self, count: int):
+        """생산자 단계에서 새 작업이 발견될 때 전체 작업량 증가"""
+        with self._lock:
+            self.total += count
+
+    def finalize_total(self):
+        """생산자 단계 종료 - 이후 전체 작업량은 확정값"""
+        with self._lock:
+            self.total_final = True
+
+    def update(self, count: int = 1):
+        """작업 완료 보고 후 진행 상황 출력"""
+        with self._lock:
+            self.done += count
+            done, total, total_final = self.done, self.total, self.total_final
+        elapsed = time.time() - self.started_at
+        rate_per_min = done / elapsed * 60 if elapsed > 0 else 0.0
+        remaining = max(total - done, 0)
+        eta = remaining / (done / elapsed) if done and elapsed > 0 else 0.0
+        percent = (done / total * 100) if total else 0.0
+        total_text = f"{total}" if total_final else f"{total}+"
+        print(f"📈 [{self.label}] {done}/{total_text} ({percent:.1f}%) - "
+              f"{rate_per_min:.1f}개/분, 경과 {self._format_seconds(elapsed)}, "
+              f"남은 시간 {self._format_seconds(eta)}{'' if total_final else ' (추정)'}")
+
+    def summary(self) -> dict:
+        """진행 요약 반환"""
+        elapsed = time.time() - self.started_at
+        return {
+            "label": self.label,
+            "done": self.done,
+            "total": self.total,
+            "elapsed_seconds": elapsed,
+            "per_minute": (self.done / elapsed * 60) if elapsed > 0 else 0.0
+        }
+
+    @staticmethod
+    def _format_seconds(seconds: float) -> str:
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600}시간 {seconds % 3600 // 60}분"
+        if seconds >= 60:
+            return f"{seconds // 60}분 {seconds % 60}초"
+        return f"{seconds}초"
+
+
+def chunk_key(metadata: Dict[str, Any]) -> Tuple[str, int, str]:
+    """재개 판단용 청크 키 (파일명, 기사 번호, 청크 해시)"""
+    return (
+        metadata.get("filename", ""),
+        metadata.get("article_index", -1),
+        metadata.get("chunk_hash", "")
+    )
+
+
+def document_id(source_id: str, trading_date: str, chunk_hash: str) -> str:
+    """안정적인 문서 ID - 같은 출처/거래일의 같은 청크는 어느 실행에서든 같은 ID"""
+    return hashlib.sha1(f"{source_id}|{trading_date}|{chunk_hash}".encode('utf-8')).hexdigest()
+
+
+class BuildCheckpoint:
+    """구축 중인 벡터/메타데이터의 주기적 체크포인트 (append-only 저널)
+    
+    실행을 시작할 때 기준 상태 (기존 저장소 또는 빈 저장소)를 헤더로 기록하고,
+    이후에는 임베딩이 끝난 배치의 (벡터, 메타데이터)만 파일 끝에 추가한다.
+    체크포인트 한 번에 쓰는 양은 그 사이에 임베딩한 청크뿐이므로 긴 구축에서도 쓰기량이 누적 결과에 비례해 늘지 않는다.
+    재개 시 기준 상태 위에 기록 순서대로 다시 적용하며, 저장 도중 중단되어 잘린 마지막 기록은 무시한다.
+    """
+
+    def __init__(self, path: Path, every_chunks: int = 20, every_seconds: float = 300.0):
+        self.path = Path(path)
+        self.every_chunks = max(1, every_chunks)
+        self.every_seconds = every_seconds
+        self._buffer: List[Tuple[List[float], Dict[str, Any]]] = []
+        self._last_saved_at = time.time()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _append(self, record: Dict[str, Any]):
+        with open(self.path, 'ab') as f:
+            pickle.dump(record, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(self, base: str):
+        """새 체크포인트 시작 - base: "store" (기존 저장소 위에 추가) 또는 "empty" (재구축)"""
+        self.clear()
+        self._append({"base": base, "started_at": datetime.now().isoformat()})
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """체크포인트 로드 - {"base", "entries": [(벡터, 메타데이터)], "saved_at"} (없거나 손상된 경우 None)"""
+        if not self.path.exists():
+            return None
+        records = []
+        try:
+            with open(self.path, 'rb') as f:
+                while True:
+                    try:
+                        records.append(pickle.load(f))
+                    except EOFError:
+                        break
+                    except (pickle.UnpicklingError, ValueError, TypeError):
+                        print(f"⚠️ 체크포인트 마지막 기록이 손상되어 제외 ({self.path.name})")
+                        break
+        except Exception as e:
+            print(f"⚠️ 체크포인트 로드 실패 ({self.path.name}): {e}")
+            return None
+        if not records:
+            return None
+        
+        try:
+            header = records[0]
+            entries = [entry for record in records[1:] for entry in record["entries"]]
+            return {"base": header["base"], "entries": entries,
+                    "saved_at": records[-1].get("saved_at", header["started_at"])}
+        except (KeyError, TypeError, AttributeError):
+            print(f"⚠️ 체크포인트 로드 실패 ({self.path.name}): 체크포인트 저널 형식이 아닙니다")
+            return None
+
+    def save(self):
+        """기록 대기 중인 배치를 체크포인트 끝에 추가"""
+        if self._buffer:
+            self._append({"entries": self._buffer, "saved_at": datetime.now().isoformat()})
+            print(f"💾 체크포인트 저장: {len(self._buffer)}개 벡터 추가")
+            self._buffer = []
+        self._last_saved_at = time.time()
+
+    def record(self, entries: List[Tuple[List[float], Dict[str, Any]]]) -> bool:
+        """새로 임베딩한 (벡터, 메타데이터)를 모아 두고 간격에 도달하면 저장 (저장 여부 반환)"""
+        self._buffer.extend(entries)
+        if not self._buffer:
+            return False
+        if len(self._buffer) >= self.every_chunks or time.time() - self._last_saved_at >= self.every_seconds:
+            self.save()
+            return True
+        return False
+
+    def clear(self):
+        """구축 완료 후 체크포인트 삭제"""
+        self._buffer = []
+        if self.path.exists():
+            self.path.unlink()
+
+
+def completed_chunk_keys(metadata: List[Dict[str, Any]]) -> Set[Tuple[str, int, str]]:
+    """이미 임베딩된 청크 키 집합 (청크 해시가 없는 이전 형식 항목은 제외)"""
+    return {chunk_key(item) for item in metadata if item.get("chunk_hash")}
+
+
+class DeadLetterQueue:
+    """임베딩에 실패한 청크 목록 (JSON 파일로 유지, 성공하면 제거)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def _entry_id(metadata: Dict[str, Any]) -> str:
+        if metadata.get("doc_id"):
+            return metadata["doc_id"]
+        filename, article_index, chunk_hash = chunk_key(metadata)
+        return f"{filename}|{article_index}|{chunk_hash}"
+
+    def load(self):
+        """기존 dead-letter 파일 로드"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = {self._entry_id(entry["metadata"]): entry for entry in json.load(f)}
+        except Exception as e:
+            print(f"⚠️ dead-letter 파일 로드 실패 ({self.path.name}): {e}")
+            self._entries = {}
+
+    def add(self, chunk: Dict[str, Any], error: str):
+        """실패 청크 기록 (이미 있으면 시도 횟수와 마지막 오류 갱신)"""
+        entry_id = self._entry_id(chunk["metadata"])
+        entry = self._entries.get(entry_id) or {
+            "text": chunk["text"],
+            "chunk_hash": chunk["chunk_hash"],
+            "metadata": chunk["metadata"],
+            "attempts": 0,
+            "first_failed_at": datetime.now().isoformat()
+        }
+        entry["attempts"] += 1
+        entry["error"] = error
+        entry["last_failed_at"] = datetime.now().isoformat()
+        self._entries[entry_id] = entry
+        self._dirty = True
+
+    def discard(self, chunk: Dict[str, Any]):
+        """임베딩에 성공한 청크 제거"""
+        if self._entries.pop(self._entry_id(chunk["metadata"]), None) is not None:
+            self._dirty = True
+
+    def discard_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """메타데이터가 조건에 맞는 청크 제거 (삭제된 출처의 청크 정리용) - 제거 수 반환"""
+        entry_ids = [entry_id for entry_id, entry in self._entries.items() if predicate(entry["metadata"])]
+        for entry_id in entry_ids:
+            del self._entries[entry_id]
+        if entry_ids:
+            self._dirty = True
+        return len(entry_ids)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """재시도 대상 청크 목록 (파이프라인 청크 형식)"""
+        return [
+            {"text": entry["text"], "chunk_hash": entry["chunk_hash"], "metadata": entry["metadata"]}
+            for entry in self._entries.values()
+        ]
+
+    def save(self):
+        """변경 사항이 있으면 파일에 원자적으로 기록 (비어 있으면 파일 삭제)"""
+        if not self._dirty:
+            return
+        if not self._entries:
+            if self.path.exists():
+                self.path.unlink()
+        else:
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(list(self._entries.values()), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
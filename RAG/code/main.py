@@ -6,9 +6,6 @@
 
 import os
 import sys
-import time
-import subprocess
-import requests
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -73,84 +70,20 @@ class StockMarketRAGSystem:
             print(f"❌ 폴더 생성 중 오류: {e}")
             raise
     
-    def start_faiss_api_server(self) -> bool:
-        """FAISS API 서버 시작"""
+    def load_vector_search(self, collection: Optional[str] = None) -> bool:
+        """벡터 검색 라이브러리 준비 (같은 프로세스에서 검색 - API 서버 실행 불필요, 새 스냅샷이 있으면 교체)"""
         try:
             print("\n" + "=" * 60)
-            print("🔧 FAISS API 서버 시작")
+            print(f"🔧 벡터 검색 준비 ({collection or '기본 컬렉션'})")
             print("=" * 60)
             
-            # 기존 서버 프로세스 종료
-            try:
-                subprocess.run(["pkill", "-f", "faiss_vector_api.py"], 
-                             capture_output=True, timeout=5)
-                time.sleep(2)
-            except:
-                pass
-            
-            # 새 서버 시작
-            server_process = subprocess.Popen([
-                sys.executable, "faiss_vector_api.py"
-            ], cwd=str(Path(__file__).parent))
-            
-            # 서버 시작 대기
-            time.sleep(5)
-            
-            # 서버 상태 확인
-            try:
-                response = requests.get("http://localhost:8000/health", timeout=10)
-                if response.status_code == 200:
-                    print("✅ FAISS API 서버 시작 성공 (포트 8000)")
-                    return True
-                else:
-                    print("❌ FAISS API 서버 응답 오류")
-                    return False
-            except Exception as e:
-                print(f"❌ FAISS API 서버 연결 실패: {e}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ FAISS API 서버 시작 실패: {e}")
-            return False
-    
-    def start_vector_db1_api_server(self) -> bool:
-        """Vector DB1 API 서버 시작"""
-        try:
-            print("\n" + "=" * 60)
-            print("🔧 Vector DB1 API 서버 시작")
-            print("=" * 60)
-            
-            # 기존 서버 프로세스 종료
-            try:
-                subprocess.run(["pkill", "-f", "faiss_vector_db1_api.py"], 
-                             capture_output=True, timeout=5)
-                time.sleep(2)
-            except:
-                pass
-            
-            # 새 서버 시작
-            server_process = subprocess.Popen([
-                sys.executable, "faiss_vector_db1_api.py"
-            ], cwd=str(Path(__file__).parent))
-            
-            # 서버 시작 대기
-            time.sleep(5)
-            
-            # 서버 상태 확인
-            try:
-                response = requests.get("http://localhost:8001/health", timeout=10)
-                if response.status_code == 200:
-                    print("✅ Vector DB1 API 서버 시작 성공 (포트 8001)")
-                    return True
-                else:
-                    print("❌ Vector DB1 API 서버 응답 오류")
-                    return False
-            except Exception as e:
-                print(f"❌ Vector DB1 API 서버 연결 실패: {e}")
-                return False
+            from vector_search import get_vector_search
+            snapshot = get_vector_search().snapshot(collection)
+            print(f"✅ 벡터 검색 준비 완료: 벡터 {len(snapshot.vectors)}개 (스냅샷 {snapshot.version})")
+            return True
                 
         except Exception as e:
-            print(f"❌ Vector DB1 API 서버 시작 실패: {e}")
+            print(f"❌ 벡터 검색 준비 실패: {e}")
             return False
     
     def collect_data(self):
@@ -387,9 +320,9 @@ class StockMarketRAGSystem:
                 print("❌ Vector DB 임베딩 실패")
                 return False
             
-            # 3. FAISS API 서버 시작
-            if not self.start_faiss_api_server():
-                print("❌ FAISS API 서버 시작 실패로 인해 분석을 건너뜁니다.")
+            # 3. 벡터 검색 준비 (분석기는 같은 프로세스에서 직접 검색)
+            if not self.load_vector_search():
+                print("❌ 벡터 검색 준비 실패로 인해 분석을 건너뜁니다.")
                 return False
             
             # 4. Vector DB 기반 분석 (주식 종목 추출을 위해)
@@ -470,11 +403,9 @@ class StockMarketRAGSystem:
                 return True
             
             from hybrid_vector_manager import HybridVectorManager
-            data1_manager = HybridVectorManager(str(self.data_1_dir))
-            # vector_db_1에 저장하도록 수정
-            data1_manager.vector_dir = self.vector_db_1_dir
-            data1_manager.vectors_file = self.vector_db_1_dir / "vector_db_1_vectors.pkl"
-            data1_manager.metadata_file = self.vector_db_1_dir / "vector_db_1_metadata.json"
+            # vector_db_1에 저장 (체크포인트/실패 청크 파일도 vector_db_1에 분리)
+            data1_manager = HybridVectorManager(str(self.data_1_dir), vector_dir=str(self.vector_db_1_dir),
+                                                store_name="vector_db_1")
             success = data1_manager.process_documents()
             
             if success:
@@ -483,33 +414,24 @@ class StockMarketRAGSystem:
                 print("❌ Vector DB1 임베딩 실패")
                 return False
             
-            # 7. Vector DB1 API 서버 시작
-            if not self.start_vector_db1_api_server():
-                print("❌ Vector DB1 API 서버 시작 실패로 인해 분석을 건너뜁니다.")
+            # 7. Vector DB1 (focus_stocks 컬렉션) 새 스냅샷 로드
+            if not self.load_vector_search("focus_stocks"):
+                print("❌ 벡터 검색 준비 실패로 인해 Vector DB1 분석을 건너뜁니다.")
             else:
-                                        # Rate Limit 방지를 위한 지연
-                        print("⏳ API Rate Limit 방지를 위한 90초 지연...")
-                        time.sleep(90)
-                        
-                        # 8. Vector DB1 기반 분석
-                        self.analyze_vector_db1(extracted_stocks)
+                # 8. Vector DB1 기반 분석 (API 요청 한도는 공유 Rate Limiter가 관리)
+                self.analyze_vector_db1(extracted_stocks)
             
             # 9. Vector DB 기반 주식 시장 분석 보고서 생성
             print("\n" + "=" * 60)
             print("📊 Vector DB 기반 주식 시장 분석 보고서")
             print("=" * 60)
             
-            # Rate Limit 방지를 위한 지연
-            print("⏳ API Rate Limit 방지를 위한 90초 지연...")
-            time.sleep(90)
-            
             try:
                 # Vector DB 분석기 클래스 정의
                 class VectorDBAnalyzer:
-                    """vector_db 벡터 기반 분석기 (FAISS API 사용)"""
+                    """vector_db 벡터 기반 분석기 (벡터 검색 라이브러리 사용)"""
                     
                     def __init__(self):
-                        self.api_base_url = "http://localhost:8000"  # 메인 FAISS API 서버
                         
                         # 새로운 CLOVA API 설정 (vector_db_1_analyzer와 동일)
                         self.api_key = os.getenv("NEW_CLOVA_API_KEY", "")
@@ -523,7 +445,6 @@ class StockMarketRAGSystem:
                         self.clova_client = self._create_clova_client()
                         
                         print("🔧 VectorDBAnalyzer 초기화 완료")
-                        print(f"📡 FAISS API 서버: {self.api_base_url}")
                     
                     def _create_clova_client(self):
                         """CLOVA 클라이언트 생성"""
@@ -547,22 +468,26 @@ class StockMarketRAGSystem:
                                 print(f"   Request ID: {self._request_id}")
                                 print(f"   API 키: {self._api_key[:20]}...")
 
-                                import http.client
-                                import json
-                                conn = http.client.HTTPSConnection(self._host)
-                                conn.request('POST', self._model_endpoint, json.dumps(completion_request), headers)
-                                response = conn.getresponse()
+                                # 공용 keep-alive 전송 계층으로 요청 (연결 재사용)
+                                from clova_transport import get_clova_transport
+                                http_status, result = get_clova_transport(self._host).post_json(
+                                    self._model_endpoint, completion_request, headers)
                                 
                                 print(f"📡 CLOVA API 응답:")
-                                print(f"   상태 코드: {response.status}")
+                                print(f"   상태 코드: {http_status}")
                                 
-                                result = json.loads(response.read().decode(encoding='utf-8'))
-                                conn.close()
                                 return result
 
                             def execute(self, completion_request):
+                                # 공유 Rate Limiter로 Chat API 요청 한도 관리
+                                from rate_limiter import get_rate_limiter, is_throttled_response
+                                rate_limiter = get_rate_limiter("chat")
+                                rate_limiter.acquire()
                                 res = self._send_request(completion_request)
+                                if is_throttled_response(None, res.get('status', {}).get('code')):
+                                    rate_limiter.report_throttled()
                                 if res['status']['code'] == '20000':
+                                    rate_limiter.report_success()
                                     # 새로운 모델은 message.content 형식으로 응답
                                     if 'result' in res and 'message' in res['result'] and 'content' in res['result']['message']:
                                         return res['result']['message']['content']
@@ -582,42 +507,24 @@ class StockMarketRAGSystem:
                             model_endpoint=self.model_endpoint
                         )
                     
-                    def check_faiss_api_server(self) -> bool:
-                        """FAISS API 서버 상태 확인"""
+                    def check_vector_search(self) -> bool:
+                        """벡터 검색 준비 확인"""
                         try:
-                            response = requests.get(f"{self.api_base_url}/health", timeout=5)
-                            if response.status_code == 200:
-                                data = response.json()
-                                print(f"✅ FAISS API 서버 연결 성공")
-                                print(f"   벡터 로드: {data.get('total_vectors', 0)}개")
-                                print(f"   메타데이터: {data.get('total_metadata', 0)}개")
-                                return True
-                            else:
-                                print(f"❌ FAISS API 서버 응답 오류: {response.status_code}")
-                                return False
+                            from vector_search import get_vector_search
+                            snapshot = get_vector_search().snapshot()
                         except Exception as e:
-                            print(f"❌ FAISS API 서버 연결 실패: {e}")
+                            print(f"❌ 벡터 검색 로드 실패: {e}")
                             return False
+                        print(f"✅ 벡터 검색 준비 완료")
+                        print(f"   벡터 로드: {len(snapshot.vectors)}개")
+                        print(f"   메타데이터: {snapshot.metadata_count}개")
+                        return True
                     
                     def search_vectors(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
-                        """FAISS API를 통한 벡터 검색"""
+                        """벡터 검색 라이브러리로 같은 프로세스 안에서 검색"""
                         try:
-                            response = requests.post(
-                                f"{self.api_base_url}/search",
-                                json={"query": query, "top_k": top_k},
-                                timeout=60
-                            )
-                            
-                            if response.status_code == 200:
-                                data = response.json()
-                                return data.get('results', [])
-                            else:
-                                print(f"❌ 검색 요청 실패: {response.status_code}")
-                                return []
-                                
-                        except requests.exceptions.Timeout:
-                            print(f"❌ 검색 타임아웃 (60초)")
-                            return []
+                            from vector_search import get_vector_search
+                            return get_vector_search().search(query, top_k)
                         except Exception as e:
                             print(f"❌ 검색 중 오류: {e}")
                             return []
@@ -728,8 +635,8 @@ class StockMarketRAGSystem:
                         print("🔍 Vector DB 기반 어제 하루 주식 시장 분석")
                         print("=" * 60)
                         
-                        # 1. FAISS API 서버 상태 확인
-                        if not self.check_faiss_api_server():
+                        # 1. 벡터 검색 준비 확인
+                        if not self.check_vector_search():
                             return False
                         
                         # 2. 분석 실행
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+벡터 메타데이터 저장소 (SQLite 기반)
+- 벡터 id (FAISS id = 벡터 행 번호)를 키로 청크 메타데이터 저장
+- type, filename, stock_name, trading_date, created_at, source_id, doc_id 보조 인덱스
+- 검색 결과용 id 일괄 조회, 유지보수용 조건/범위 조회
+- 전체 메타데이터를 메모리에 올리지 않고 필요한 행만 읽음
+- 저장 세대 표시 (같은 세대로 기록한 벡터 파일과 짝을 맞추는 데 사용)
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 별도 컬럼으로 저장해 인덱스를 거는 메타데이터 키
+INDEXED_FIELDS = ("doc_id", "source_id", "type", "filename", "stock_name", "trading_date", "created_at")
+
+# SQLite 파라미터 개수 제한 안에서 한 번에 조회할 id 수
+_LOOKUP_BLOCK = 500
+
+
+class MetadataStore:
+    """벡터 id → 청크 메타데이터 저장소"""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        with self._lock:
+            # 벡터 빌드 중에도 API 서버가 이전 스냅샷을 읽을 수 있도록 WAL 사용
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f"{field} TEXT" for field in INDEXED_FIELDS)
+            self._conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    vector_id INTEGER PRIMARY KEY,
+                    {columns},
+                    metadata TEXT NOT NULL
+                )
+                """
+            )
+            for field in INDEXED_FIELDS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_chunks_{field} ON chunks({field})")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.commit()
+
+    @staticmethod
+    def _row(vector_id: int, metadata: Dict[str, Any]) -> tuple:
+        values = [metadata.get(field) for field in INDEXED_FIELDS]
+        return (vector_id, *[None if value in (None, "") else str(value) for value in values],
+                json.dumps(metadata, ensure_ascii=False))
+
+    def replace_all(self, metadata: Iterable[Dict[str, Any]], generation: Optional[str] = None):
+        """전체 메타데이터를 벡터 순서대로 교체 (한 트랜잭션 - 읽는 쪽은 이전/새 상태 중 하나만 봄)
+
+        generation을 주면 같은 트랜잭션에서 저장 세대도 기록한다.
+        """
+        placeholders = ", ".join("?" * (len(INDEXED_FIELDS) + 2))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.executemany(
+                f"INSERT INTO chunks (vector_id, {', '.join(INDEXED_FIELDS)}, metadata) VALUES ({placeholders})",
+                (self._row(vector_id, meta) for vector_id, meta in enumerate(metadata))
+            )
+            if generation is not None:
+                self._conn.execute("INSERT OR REPLACE INTO store_info (key, value) VALUES ('generation', ?)",
+                                   (generation,))
+
+    def generation(self) -> Optional[str]:
+        """마지막으로 기록한 저장 세대 (세대 없이 저장한 이전 형식이면 None)"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM store_info WHERE key = 'generation'").fetchone()
+        return row[0] if row else None
+
+    def import_json(self, json_path: Path) -> int:
+        """이전 형식 메타데이터 JSON 파일을 가져와 저장 (가져온 항목 수 반환)"""
+        with open(json_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        self.replace_all(metadata)
+        return len(metadata)
+
+    def count(self, **filters) -> int:
+        """조건에 맞는 항목 수 (조건 형식은 query와 같음)"""
+        where, params = self._where(filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM chunks{where}", params).fetchone()[0]
+
+    def get(self, vector_id: int) -> Optional[Dict[str, Any]]:
+        """벡터 id 하나의 메타데이터 (없으면 None)"""
+        return self.get_many([vector_id])[0]
+
+    def get_many(self, vector_ids: Iterable[int]) -> List[Optional[Dict[str, Any]]]:
+        """검색 결과 id 목록의 메타데이터를 입력 순서대로 일괄 조회 (없는 id는 None)"""
+        vector_ids = [int(vector_id) for vector_id in vector_ids]
+        found = {}
+        with self._lock:
+            for start in range(0, len(vector_ids), _LOOKUP_BLOCK):
+                block = vector_ids[start:start + _LOOKUP_BLOCK]
+                rows = self._conn.execute(
+                    f"SELECT vector_id, metadata FROM chunks WHERE vector_id IN ({', '.join('?' * len(block))})",
+                    block
+                )
+                found.update((vector_id, json.loads(data)) for vector_id, data in rows)
+        return [found.get(vector_id) for vector_id in vector_ids]
+
+    def query(self, limit: Optional[int] = None, **filters) -> List[Tuple[int, Dict[str, Any]]]:
+        """조건/범위 조회 - (벡터 id, 메타데이터) 목록을 id 순서로 반환
+
+        조건:
+        - 인덱스 필드 값 일치: type="news", filename="...", stock_name="삼성전자", source_id="..." 등
+        - 범위: trading_date_from / trading_date_to, created_at_from / created_at_to (ISO 문자열, 양 끝 포함)
+        """
+        where, params = self._where(filters)
+        sql = f"SELECT vector_id, metadata FROM chunks{where} ORDER BY vector_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(vector_id, json.loads(data)) for vector_id, data in rows]
+
+    def vector_ids(self, **filters) -> List[int]:
+        """조건에 맞는 벡터 id 목록 (조건 형식은 query와 같음)"""
+        where, params = self._where(filters)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(f"SELECT vector_id FROM chunks{where} ORDER BY vector_id", params)]
+
+    def id_range(self, **filters) -> Optional[Tuple[int, int]]:
+        """조건에 맞는 벡터 id의 [최소, 최대 + 1) 구간 (없으면 None) - 정렬된 저장소의 날짜 범위 검색용"""
+        where, params = self._where(filters)
+        with self._lock:
+            low, high = self._conn.execute(f"SELECT MIN(vector_id), MAX(vector_id) FROM chunks{where}", params).fetchone()
+        return None if low is None else (low, high + 1)
+
+    def backup(self, path: Path):
+        """현재 내용을 새 DB 파일로 복사 (SQLite 온라인 백업 - 복사 중에도 일관된 상태)"""
+        path = Path(path)
+        target = sqlite3.connect(str(path))
+        try:
+            with self._lock:
+                self._conn.backup(target)
+        finally:
+            target.close()
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        """전체 메타데이터를 벡터 순서대로 로드 (벡터 구축 프로세스용)"""
+        return [metadata for _, metadata in self.query()]
+
+    def _where(self, filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for key, value in filters.items():
+            if value is None:
+                continue
+            field, _, bound = key.rpartition("_")
+            if bound in ("from", "to") and field in INDEXED_FIELDS:
+                clauses.append(f"{field} {'>=' if bound == 'from' else '<='} ?")
+            elif key in INDEXED_FIELDS:
+                clauses.append(f"{key} = ?")
+            else:
+                raise ValueError(f"지원하지 않는 메타데이터 조건: {key}")
+            params.append(str(value))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_metadata_store(vector_dir: Path, store_name: str) -> MetadataStore:
+    """{store_name}_metadata.db 열기 (비어 있고 이전 형식 {store_name}_metadata.json이 있으면 가져옴)"""
+    vector_dir = Path(vector_dir)
+    store = MetadataStore(vector_dir / f"{store_name}_metadata.db")
+    legacy_file = vector_dir / f"{store_name}_metadata.json"
+    if legacy_file.exists() and store.count() == 0:
+        count = store.import_json(legacy_file)
+        print(f"ℹ️ 이전 형식 메타데이터 가져오기: {legacy_file.name} → {store.db_path.name} ({count}개)")
+    return store
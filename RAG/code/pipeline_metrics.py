@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+벡터 구축 파이프라인 계측
+- API 호출별 지연 시간 히스토그램, 상태 코드별 응답 수, 요청당 글자 수
+- 분류별 누적 시간 (Rate Limiter 대기, 재시도 대기, 단계별 처리 시간)
+- 실행 단위 JSON 보고서 (벡터 DB 옆에 저장)
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# 지연 시간 히스토그램 구간 상한 (초) - 마지막 구간은 60초 초과
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+SUCCESS_STATUS = "20000"
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class PipelineMetrics:
+    """한 번의 파이프라인 실행 동안 수집하는 계측값 (스레드 안전)"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._timings: Dict[str, float] = {}
+        self._counters: Dict[str, int] = {}
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self._info: Dict[str, Any] = {}
+
+    def add_time(self, category: str, seconds: float):
+        """분류별 누적 시간 추가 (예: "embedding.rate_limit_sleep")"""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._timings[category] = self._timings.get(category, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, category: str):
+        """블록 실행 시간을 분류별 누적 시간에 추가"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_time(category, time.time() - start)
+
+    def increment(self, name: str, count: int = 1):
+        """카운터 증가 (예: "chunks.embedded")"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + count
+
+    def counter(self, name: str) -> int:
+        """카운터 현재 값"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def set_info(self, key: str, value: Any):
+        """보고서에 그대로 포함할 값 기록"""
+        with self._lock:
+            self._info[key] = value
+
+    def record_call(self, name: str, latency: float, status: Optional[str], chars: int = 0):
+        """API 호출 1회 기록 (status: CLOVA 상태 코드, HTTP 상태 또는 예외 이름)"""
+        status = str(status) if status else "unknown"
+        with self._lock:
+            call = self._calls.setdefault(name, {
+                "latencies": [], "chars": [], "status_counts": {}, "errors": 0
+            })
+            call["latencies"].append(latency)
+            call["chars"].append(chars)
+            call["status_counts"][status] = call["status_counts"].get(status, 0) + 1
+            if status != SUCCESS_STATUS:
+                call["errors"] += 1
+
+    def _summarize_call(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        latencies = sorted(call["latencies"])
+        bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        for value in latencies:
+            bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        histogram = {f"<={upper:g}s": count for upper, count in zip(LATENCY_BUCKETS, bucket_counts)}
+        histogram[f">{LATENCY_BUCKETS[-1]:g}s"] = bucket_counts[-1]
+
+        count = len(latencies)
+        total_chars = sum(call["chars"])
+        return {
+            "count": count,
+            "errors": call["errors"],
+            "status_counts": dict(call["status_counts"]),
+            "network_seconds": sum(latencies),
+            "latency": {
+                "avg": sum(latencies) / count if count else 0.0,
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "max": latencies[-1] if latencies else 0.0,
+                "histogram": histogram
+            },
+            "chars_per_request": {
+                "total": total_chars,
+                "avg": total_chars / count if count else 0.0,
+                "max": max(call["chars"]) if call["chars"] else 0
+            }
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """수집한 계측값을 보고서 형태로 반환"""
+        wall_seconds = time.time() - self.started_at
+        with self._lock:
+            timings = dict(self._timings)
+            counters = dict(self._counters)
+            calls = {name: self._summarize_call(call) for name, call in self._calls.items()}
+            info = dict(self._info)
+
+        embedded = counters.get("chunks.embedded", 0)
+        sleep_seconds = sum(seconds for category, seconds in timings.items() if category.endswith("sleep"))
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "wall_seconds": wall_seconds,
+            "throughput": {
+                "chunks_embedded": embedded,
+                "chunks_per_minute": embedded / wall_seconds * 60 if wall_seconds > 0 else 0.0
+            },
+            "time_breakdown": {
+                "sleep_seconds": sleep_seconds,
+                "network_seconds": {name: call["network_seconds"] for name, call in calls.items()},
+                "categories": timings
+            },
+            "calls": calls,
+            "counters": counters,
+            **info
+        }
+
+    def write_report(self, path: Path) -> Path:
+        """보고서를 JSON 파일로 원자적으로 저장"""
+        path = Path(path)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+_current_metrics = PipelineMetrics()
+_current_lock = threading.Lock()
+
+def get_pipeline_metrics() -> PipelineMetrics:
+    """현재 실행의 계측 객체 반환 (API 클라이언트들이 공유)"""
+    return _current_metrics
+
+def reset_pipeline_metrics() -> PipelineMetrics:
+    """새 실행을 위해 계측 객체 초기화"""
+    global _current_metrics
+    with _current_lock:
+        _current_metrics = PipelineMetrics()
+        return _current_metrics
@@ -320,6 +320,9 @@ class VectorDBAnalyzer:
     def _create_clova_client(self):
         """CLOVA 클라이언트 생성"""
         class CompletionExecutor:
+            # 요청 한도 초과(429) 시 재시도 횟수 (대기는 공유 Rate Limiter가 줄인 속도로 결정)
+            max_retries = 3
+            
             def __init__(self, host, api_key, request_id, model_endpoint=None):
                 self.host = host
                 self.api_key = api_key
@@ -328,29 +331,37 @@ class VectorDBAnalyzer:
             
             def _send_request(self, completion_request):
                 """API 요청 전송"""
-                import http.client
-                import json
-                
-                request_message = json.dumps(completion_request)
+                from clova_transport import get_clova_transport
                 
-                conn = http.client.HTTPSConnection(self.host)
                 headers = {
                     'Content-Type': 'application/json',
                     'X-NCP-CLOVASTUDIO-API-KEY': self.api_key,
                     'X-NCP-APIGW-API-KEY': self.api_key
                 }
                 
-                conn.request('POST', self.model_endpoint, request_message, headers)
-                response = conn.getresponse()
-                result = json.loads(response.read().decode(encoding='utf-8'))
-                conn.close()
-                return result
+                # 공용 keep-alive 전송 계층으로 요청 (연결 재사용)
+                http_status, result = get_clova_transport(self.host).post_json(
+                    self.model_endpoint, completion_request, headers)
+                return http_status, result
             
             def execute(self, completion_request):
-                """실행"""
+                """실행 (요청 한도 초과 시 속도를 낮춰 재시도)"""
                 try:
-                    res = self._send_request(completion_request)
-                    return res
+                    # 공유 Rate Limiter로 Chat API 요청 한도 관리 (429 시 속도 절반, 성공 시 점진 회복)
+                    from rate_limiter import get_rate_limiter, is_throttled_response
+                    rate_limiter = get_rate_limiter("chat")
+                    for attempt in range(self.max_retries + 1):
+                        rate_limiter.acquire()
+                        http_status, res = self._send_request(completion_request)
+                        if is_throttled_response(http_status, res.get('status', {}).get('code')):
+                            rate_limiter.report_throttled()
+                            print(f"Chat API 요청 한도 초과 - 재시도 {attempt + 1}/{self.max_retries}")
+                            continue
+                        if http_status == 200:
+                            rate_limiter.report_success()
+                        return res
+                    print("Chat API 요청 한도 초과 - 재시도 횟수 소진")
+                    return None
                 except Exception as e:
                     print(f'Exception: {e}')
                     return None
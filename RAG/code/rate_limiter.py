@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+적응형 토큰 버킷 Rate Limiter
+- 분당 요청 수(RPM) 예산을 토큰 버킷으로 관리
+- 429 / 한도 초과 응답 시 속도를 절반으로 줄이고, 성공 시 점진적으로 회복
+- 상태 파일 + 파일 락으로 같은 호스트의 모든 프로세스가 하나의 예산을 공유
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 공유 없이 프로세스 내부 락만 사용
+    fcntl = None
+
+from config import get_rate_limit_state_dir, get_rate_limit_rpm, get_rate_limit_min_rpm
+
+
+def is_throttled_response(http_status: Optional[int], status_code: Optional[str]) -> bool:
+    """429 또는 CLOVA 한도 초과(429xx) 응답인지 확인"""
+    if http_status == 429:
+        return True
+    return str(status_code or "").startswith("429")
+
+
+class RateLimiter:
+    """프로세스 간 공유되는 적응형 토큰 버킷"""
+
+    # 성공 1회당 증가하는 RPM (additive increase)
+    RECOVERY_STEP_RPM = 1.0
+    # 한도 초과 시 감소 비율 (multiplicative decrease)
+    BACKOFF_FACTOR = 0.5
+
+    def __init__(self, name: str, max_rpm: float, min_rpm: float = 1.0, burst: float = 1.0, state_dir=None):
+        self.name = name
+        self.max_rpm = float(max_rpm)
+        self.min_rpm = float(min(min_rpm, max_rpm))
+        self.burst = float(burst)
+
+        self.state_dir = Path(state_dir) if state_dir else get_rate_limit_state_dir()
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.state_file = self.state_dir / f"{name}.json"
+        self.lock_file = self.state_dir / f"{name}.lock"
+
+        self._thread_lock = threading.Lock()
+        self._stats = {"acquired": 0, "waited_seconds": 0.0, "throttled": 0}
+
+    # ------------------------------------------------------------------
+    # 공유 상태 입출력
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _locked(self):
+        """파일 락 컨텍스트 (프로세스 간 + 스레드 간 직렬화)"""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(str(self.lock_file), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def _read_state(self, now: float) -> Dict[str, float]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            state["rate_rpm"] = min(max(float(state["rate_rpm"]), self.min_rpm), self.max_rpm)
+            return state
+        except Exception:
+            return {"tokens": self.burst, "updated_at": now, "rate_rpm": self.max_rpm}
+
+    def _write_state(self, state: Dict[str, float]):
+        tmp_file = self.state_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def _refill(self, state: Dict[str, float], now: float):
+        elapsed = max(0.0, now - state["updated_at"])
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * state["rate_rpm"] / 60.0)
+        state["updated_at"] = now
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    def reserve(self) -> float:
+        """토큰 1개를 예약하고 대기해야 할 시간(초)을 반환 (음수 토큰 = 대기열)"""
+        with self._locked():
+            now = time.time()
+            state = self._read_state(now)
+            self._refill(state, now)
+            state["tokens"] -= 1.0
+            wait = 0.0
+            if state["tokens"] < 0:
+                wait = -state["tokens"] * 60.0 / state["rate_rpm"]
+            self._write_state(state)
+            self._stats["acquired"] += 1
+            self._stats["waited_seconds"] += wait
+        return wait
+
+    def acquire(self) -> float:
+        """요청 전 호출: 예산이 생길 때까지 대기하고 대기 시간(초)을 반환"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def report_success(self):
+        """성공 응답 보고: 속도를 최대치까지 점진적으로 회복"""
+        with self._locked():
+            now = time.time()
+            state = self._read_state(now)
+            self._refill(state, now)
+            state["rate_rpm"] = min(self.max_rpm, state["rate_rpm"] + self.RECOVERY_STEP_RPM)
+            self._write_state(state)
+
+    def report_throttled(self):
+        """한도 초과 응답 보고: 속도를 줄이고 버킷을 비움"""
+        with self._locked():
+            now = time.time()
+            state = self._read_state(now)
+            self._refill(state, now)
+            state["rate_rpm"] = max(self.min_rpm, state["rate_rpm"] * self.BACKOFF_FACTOR)
+            state["tokens"] = min(state["tokens"], 0.0)
+            self._write_state(state)
+            self._stats["throttled"] += 1
+            new_rate = state["rate_rpm"]
+
+        print(f"🐢 [{self.name}] 요청 한도 초과 감지 - 속도 조절: {new_rate:.1f} RPM")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """현재 속도와 대기 통계 반환"""
+        with self._locked():
+            now = time.time()
+            state = self._read_state(now)
+            self._refill(state, now)
+            stats = dict(self._stats)
+        stats.update({
+            "name": self.name,
+            "current_rpm": state["rate_rpm"],
+            "max_rpm": self.max_rpm,
+            "tokens": state["tokens"]
+        })
+        return stats
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """이름별 공유 RateLimiter 반환 (예: "embedding", "chat", "segmentation")"""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(
+                name=name,
+                max_rpm=get_rate_limit_rpm(name),
+                min_rpm=get_rate_limit_min_rpm(name)
+            )
+        return _limiters[name]
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+CLOVA 임베딩 비동기 경로 테스트 스크립트
+- 네트워크 없이 가짜 비동기 전송 계층으로 동시 요청 수 제한, 입력 순서 유지,
+  실패 항목 처리, 요청 한도 초과 재시도 확인
+- 여러 스레드가 동시에 배치를 실행해도 동시 요청 수 합계가 제한되고 루프별 클라이언트가 모두 닫히는지 확인
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+
+import clova_transport
+from clova_embedding import ClovaEmbeddingAPI
+from clova_transport import ClovaTransport
+from rate_limiter import RateLimiter
+
+def _fake_value(text):
+    """텍스트마다 다른 가짜 임베딩 값 (결과 순서 확인용)"""
+    return float(sum(map(ord, text)))
+
+class FakeAsyncTransport:
+    """apost_json 대역 - 텍스트별로 지연 시간을 다르게 주고 동시 요청 수를 기록"""
+
+    def __init__(self, fail_texts=(), throttle_once=()):
+        self.fail_texts = set(fail_texts)
+        self.throttle_once = set(throttle_once)
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+
+    async def apost_json(self, path, payload, headers, timeout=None):
+        text = payload["text"]
+        self.calls.append(text)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            # 뒤쪽 텍스트가 먼저 끝나도록 지연 (응답 순서와 입력 순서가 달라짐)
+            await asyncio.sleep(0.02 * (len(text) % 4))
+        finally:
+            self.active -= 1
+        if text in self.throttle_once:
+            self.throttle_once.discard(text)
+            return 429, {"status": {"code": "42901", "message": "Too many requests"}}
+        if text in self.fail_texts:
+            return 400, {"status": {"code": "40001", "message": "Invalid parameter"}}
+        return 200, {"status": {"code": "20000"}, "result": {"embedding": [_fake_value(text)] * 1024}}
+
+    async def aclose(self):
+        pass
+
+class StubAsyncResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode('utf-8')
+
+class StubAsyncClient:
+    """httpx.AsyncClient 대역 - 생성/종료와 전체 스레드의 동시 요청 수를 기록"""
+    created = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def __init__(self, **kwargs):
+        self.closed = False
+        StubAsyncClient.created.append(self)
+
+    async def post(self, path, json=None, headers=None, timeout=None):
+        with StubAsyncClient.lock:
+            StubAsyncClient.active += 1
+            StubAsyncClient.max_active = max(StubAsyncClient.max_active, StubAsyncClient.active)
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            with StubAsyncClient.lock:
+                StubAsyncClient.active -= 1
+        return StubAsyncResponse(200, {"status": {"code": "20000"},
+                                       "result": {"embedding": [_fake_value(json["text"])] * 1024}})
+
+    async def aclose(self):
+        self.closed = True
+
+def _client(transport, max_concurrency, state_dir):
+    """영구 캐시 없이 가짜 전송 계층과 임시 Rate Limiter를 쓰는 클라이언트"""
+    previous = os.environ.get("EMBEDDING_CACHE_ENABLED")
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    try:
+        client = ClovaEmbeddingAPI()
+    finally:
+        if previous is None:
+            del os.environ["EMBEDDING_CACHE_ENABLED"]
+        else:
+            os.environ["EMBEDDING_CACHE_ENABLED"] = previous
+    executor = client._embedding_executor
+    executor._transport = transport
+    executor._max_concurrency = max_concurrency
+    executor._rate_limiter = RateLimiter("embedding", max_rpm=600000, burst=100, state_dir=state_dir)
+    return client
+
+def test_async_embedding_concurrency():
+    """동시 요청 수가 세마포어 한도를 넘지 않고 결과가 입력 순서대로 나오는지 테스트"""
+    texts = [f"뉴스{i}" + "가" * (i % 4) for i in range(12)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        transport = FakeAsyncTransport()
+        client = _client(transport, 3, tmp_dir)
+        results = client.get_text_embeddings_or_errors(texts)
+
+        assert transport.max_active == 3, transport.max_active
+        assert sorted(transport.calls) == sorted(texts)
+        assert [vector[0] for vector, _ in results] == [_fake_value(text) for text in texts]
+        assert all(error is None for _, error in results)
+
+    print("✅ 비동기 임베딩 동시성/순서 테스트 통과")
+
+def test_async_embedding_failures():
+    """실패한 항목만 (None, 오류)로 표시되고, 요청 한도 초과는 재시도해 성공하는지 테스트"""
+    texts = ["삼성전자", "잘못된 입력", "하이브", "거래대금"]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        transport = FakeAsyncTransport(fail_texts=["잘못된 입력"], throttle_once=["하이브"])
+        client = _client(transport, 2, tmp_dir)
+        results = client.get_text_embeddings_or_errors(texts)
+
+        assert [vector is not None for vector, _ in results] == [True, False, True, True]
+        assert "40001" in results[1][1]
+        assert results[2][0][0] == _fake_value("하이브")
+        # 실패 항목은 재시도하지 않고, 한도 초과 항목만 한 번 더 요청
+        assert transport.calls.count("잘못된 입력") == 1 and transport.calls.count("하이브") == 2
+        assert client._embedding_executor._rate_limiter.get_stats()["throttled"] == 1
+
+        # 영벡터 대체 경로도 같은 순서
+        vectors = asyncio.run(client.aget_text_embeddings(texts))
+        assert vectors[1] == [0.0] * 1024 and vectors[3][0] == _fake_value("거래대금")
+
+    print("✅ 비동기 임베딩 실패 항목 테스트 통과")
+
+def test_threaded_batches():
+    """두 스레드가 동시에 배치를 실행해도 동시 요청 수 합계가 제한되고, 루프별 클라이언트가 모두 닫히는지 테스트"""
+    original = clova_transport.httpx.AsyncClient
+    clova_transport.httpx.AsyncClient = StubAsyncClient
+    StubAsyncClient.created, StubAsyncClient.max_active = [], 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            transport = ClovaTransport("clova.test")
+            client = _client(transport, 3, tmp_dir)
+            batches = [[f"스레드{t}-뉴스{i}" for i in range(8)] for t in range(2)]
+            results = [None, None]
+            start = threading.Barrier(2)
+
+            def run(t):
+                start.wait()
+                results[t] = client.get_text_embeddings_or_errors(batches[t])
+
+            threads = [threading.Thread(target=run, args=(t,)) for t in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            for texts, batch_results in zip(batches, results):
+                assert [vector[0] for vector, _ in batch_results] == [_fake_value(text) for text in texts]
+            # 스레드(이벤트 루프)마다 클라이언트를 따로 만들고, 각 배치가 끝날 때 자기 루프의 클라이언트를 닫음
+            assert len(StubAsyncClient.created) == 2
+            assert all(stub.closed for stub in StubAsyncClient.created)
+            assert transport.get_stats()["async_clients"] == 0
+            # 두 루프를 합친 동시 요청 수도 max_concurrency 이하
+            assert StubAsyncClient.max_active == 3, StubAsyncClient.max_active
+            assert client._embedding_executor._get_concurrency_limit().active == 0
+    finally:
+        clova_transport.httpx.AsyncClient = original
+
+    print("✅ 여러 스레드 동시 배치 테스트 통과")
+
+if __name__ == "__main__":
+    test_async_embedding_concurrency()
+    test_async_embedding_failures()
+    test_threaded_batches()
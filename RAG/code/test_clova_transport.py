@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+CLOVA 전송 계층 테스트 스크립트
+- 네트워크 없이 가짜 HTTPS 연결로 keep-alive 연결 재사용, 끊긴 연결 재시도, 타임아웃 설정 확인
+"""
+
+import http.client
+import json
+
+import clova_transport
+from clova_transport import ClovaTransport
+
+class StubSocket:
+    def __init__(self):
+        self.timeouts = []
+
+    def settimeout(self, timeout):
+        self.timeouts.append(timeout)
+
+class StubResponse:
+    def __init__(self, status, payload):
+        self.status = status
+        self.will_close = False
+        self._body = json.dumps(payload).encode('utf-8')
+
+    def read(self):
+        return self._body
+
+class StubConnection:
+    """http.client.HTTPSConnection 대역 (stale이면 서버가 연결을 끊은 것처럼 동작)"""
+    created = []
+
+    def __init__(self, host, timeout=None):
+        self.host = host
+        self.timeout = timeout
+        self.sock = None
+        self.stale = False
+        self.closed = False
+        self.requests = []
+        StubConnection.created.append(self)
+
+    def connect(self):
+        self.sock = StubSocket()
+
+    def request(self, method, path, body, headers):
+        if self.stale:
+            raise http.client.RemoteDisconnected("Remote end closed connection without response")
+        self.requests.append((method, path, json.loads(body)))
+
+    def getresponse(self):
+        return StubResponse(200, {"status": {"code": "20000"}, "path": self.requests[-1][1]})
+
+    def close(self):
+        self.closed = True
+
+def _with_stub_connections(test):
+    """HTTPSConnection을 가짜 연결로 바꿔 실행"""
+    original = clova_transport.http.client.HTTPSConnection
+    StubConnection.created = []
+    clova_transport.http.client.HTTPSConnection = StubConnection
+    try:
+        test()
+    finally:
+        clova_transport.http.client.HTTPSConnection = original
+
+def test_connection_reuse():
+    """같은 호스트로 반복 요청하면 연결 하나를 재사용하는지 테스트"""
+    def run():
+        transport = ClovaTransport("clova.test", connect_timeout=3.0, read_timeout=30.0)
+        for i in range(3):
+            status, result = transport.post_json(f"/v1/{i}", {"text": str(i)}, {})
+            assert status == 200 and result["path"] == f"/v1/{i}"
+
+        assert len(StubConnection.created) == 1
+        conn = StubConnection.created[0]
+        assert conn.host == "clova.test" and len(conn.requests) == 3 and not conn.closed
+        stats = transport.get_stats()
+        assert stats["connections_created"] == 1 and stats["connections_reused"] == 2
+        assert stats["status_counts"] == {"200": 3}
+
+    _with_stub_connections(run)
+    print("✅ keep-alive 연결 재사용 테스트 통과")
+
+def test_stale_connection_retry():
+    """서버가 끊은 재사용 연결은 닫고 새 연결로 한 번만 재시도하는지 테스트"""
+    def run():
+        transport = ClovaTransport("clova.test")
+        transport.post_json("/v1/first", {}, {})
+        stale = StubConnection.created[0]
+        stale.stale = True
+
+        status, result = transport.post_json("/v1/second", {}, {})
+        assert status == 200 and result["path"] == "/v1/second"
+        assert stale.closed and len(StubConnection.created) == 2
+        assert StubConnection.created[1].requests[0][1] == "/v1/second"
+
+        # 새로 만든 연결이 실패하면 재시도하지 않고 오류 전달
+        StubConnection.created[1].stale = True
+        original_connect = StubConnection.connect
+
+        def connect_stale(conn):
+            original_connect(conn)
+            conn.stale = True
+
+        StubConnection.connect = connect_stale
+        try:
+            transport.post_json("/v1/third", {}, {})
+            assert False, "재시도한 연결도 끊기면 오류"
+        except http.client.RemoteDisconnected:
+            pass
+        finally:
+            StubConnection.connect = original_connect
+        assert len(StubConnection.created) == 3 and transport.get_stats()["errors"] == 1
+
+    _with_stub_connections(run)
+    print("✅ 끊긴 연결 재시도 테스트 통과")
+
+def test_timeouts():
+    """연결 타임아웃은 연결 생성에, 읽기 타임아웃 (요청별 값 우선)은 소켓에 적용되는지 테스트"""
+    def run():
+        transport = ClovaTransport("clova.test", connect_timeout=2.5, read_timeout=45.0)
+        transport.post_json("/v1/default", {}, {})
+        transport.post_json("/v1/custom", {}, {}, timeout=7.0)
+
+        conn = StubConnection.created[0]
+        assert conn.timeout == 2.5
+        # 연결 직후 기본 읽기 타임아웃, 이후 요청마다 요청별 타임아웃 (없으면 기본값)
+        assert conn.sock.timeouts == [45.0, 45.0, 7.0]
+
+    _with_stub_connections(run)
+    print("✅ 전송 타임아웃 테스트 통과")
+
+if __name__ == "__main__":
+    test_connection_reuse()
+    test_stale_connection_retry()
+    test_timeouts()
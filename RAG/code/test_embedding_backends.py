@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+로컬 임베딩/세그멘테이션 백엔드 테스트 스크립트
+- API 키 없이 오프라인 백엔드 동작만 확인
+"""
+
+import numpy as np
+
+from embedding_backends import LocalHashEmbedding, LocalSegmentationClient, create_embedding_client
+
+def test_local_hash_embedding():
+    """결정성, 차원, 정규화, 유사도 순서 테스트"""
+    embedding = LocalHashEmbedding(dim=256)
+
+    vector = embedding.get_text_embedding("삼성전자 주가 상승")
+    assert len(vector) == 256
+    assert vector == embedding.get_query_embedding("삼성전자  주가 상승")
+    assert abs(np.linalg.norm(vector) - 1.0) < 1e-5
+
+    similar, different = embedding.get_text_embeddings(["삼성전자 주가가 상승했다", "하이브 세무조사 착수"])
+    assert np.dot(vector, similar) > np.dot(vector, different)
+
+    # 로컬 백엔드는 실패가 없으므로 오류는 항상 None
+    assert all(error is None for _, error in embedding.get_text_embeddings_or_errors(["", "텍스트"]))
+    assert any(embedding.get_text_embedding(""))
+
+    assert create_embedding_client("local").model_id == "local-hash-ngram-1024"
+    print("✅ 로컬 해시 임베딩 테스트 통과")
+
+def test_local_segmentation():
+    """청크 길이 제한 테스트"""
+    client = LocalSegmentationClient()
+    text = "\n".join(["제목: 테스트 기사"] + ["본문 문장입니다. " * 40] * 3)
+
+    chunks = client.segment_text(text, max_length=200)
+    assert chunks
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert client.segment_text("   ") is None
+    print(f"✅ 로컬 세그멘테이션 테스트 통과 ({len(chunks)}개 청크)")
+
+if __name__ == "__main__":
+    test_local_hash_embedding()
+    test_local_segmentation()
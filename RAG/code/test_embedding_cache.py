@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+임베딩 캐시 테스트 스크립트
+- API 호출 없이 로컬 SQLite 캐시와 질문 임베딩 메모리 캐시 동작만 확인
+"""
+
+import tempfile
+from pathlib import Path
+
+from embedding_cache import EmbeddingCache, QueryEmbeddingCache
+
+def test_embedding_cache():
+    """캐시 저장/조회/정리 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = EmbeddingCache(Path(tmp_dir) / "cache.db", model="test-model", max_entries=3)
+
+        # 미적중
+        assert cache.get("삼성전자 주가") is None
+
+        # 저장 후 적중 (공백 차이는 같은 키로 취급)
+        cache.put("삼성전자  주가 ", [0.25, 0.5, 0.75])
+        assert cache.get("삼성전자 주가") == [0.25, 0.5, 0.75]
+
+        # 모델이 다르면 다른 키
+        other = EmbeddingCache(Path(tmp_dir) / "cache.db", model="other-model")
+        assert other.get("삼성전자 주가") is None
+        other.close()
+
+        # 크기 기준 정리
+        for i in range(5):
+            cache.put(f"텍스트 {i}", [float(i)])
+        cache.evict()
+
+        stats = cache.get_stats()
+        print(f"캐시 통계: {stats}")
+        assert stats["entries"] == 3
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        cache.close()
+
+    print("✅ 임베딩 캐시 테스트 통과")
+
+def test_query_embedding_cache():
+    """질문 임베딩 메모리 캐시의 LRU 정리와 TTL 만료 테스트"""
+    now = [0.0]
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+
+    cache.put("삼성전자 주가", [1.0])
+    cache.put("하이브", [2.0])
+    assert cache.get(" 삼성전자  주가") == [1.0]
+
+    # 가득 차면 가장 오래 사용하지 않은 항목 (하이브) 삭제
+    cache.put("거래대금", [3.0])
+    assert cache.get("하이브") is None and cache.get("삼성전자 주가") == [1.0]
+
+    # 유효 시간이 지나면 만료
+    now[0] = 11.0
+    assert cache.get("거래대금") is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+    assert stats["evictions"] == 1 and stats["expired"] == 1 and stats["entries"] == 1
+
+    print("✅ 질문 임베딩 메모리 캐시 테스트 통과")
+
+if __name__ == "__main__":
+    test_embedding_cache()
+    test_query_embedding_cache()
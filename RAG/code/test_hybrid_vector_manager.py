@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+하이브리드 벡터 매니저 테스트 스크립트
+- 로컬 임베딩/세그멘테이션 백엔드 (EMBEDDING_BACKEND=local)로 API 키 없이 벡터 구축 전체 흐름 실행
+- 문서 ID 기준 upsert: 변경 없는 청크 건너뛰기, 모델 변경 시 다시 임베딩, 다시 처리한 출처의 이전 청크 삭제, 출처별 삭제
+- 단계별/동시 실행 파이프라인: 모든 청크가 순서대로 한 번씩 저장되고, 실패한 배치는 dead-letter로 보내고 계속 진행
+- 중단된 구축을 체크포인트에서 재개
+- 벡터 파일과 메타데이터 DB를 한 세대로 저장 (중단된 저장 정리, 짝이 맞지 않는 파일은 로드 거부)
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from embedding_backends import LocalHashEmbedding
+from hybrid_vector_manager import HybridVectorManager
+from pipeline_metrics import get_pipeline_metrics
+from vector_storage import load_vector_matrix, save_vector_matrix
+
+# 테스트용 설정 (재개/재시도 대기 없이 작은 차원으로 실행)
+TEST_ENV = {
+    "EMBEDDING_BACKEND": "local",
+    "SEGMENTATION_BACKEND": "local",
+    "LOCAL_EMBEDDING_DIM": "64",
+    "PIPELINE_RESUME": "false",
+    "PIPELINE_RETRY_ROUNDS": "0",
+    "VECTOR_RETENTION_DAYS": "0",
+    "VECTOR_STORAGE_FORMAT": "float32"
+}
+
+# 문단 하나가 청크 하나가 되도록 max_length보다 짧고, 두 문단을 합치면 넘는 길이
+ARTICLE_A = ["삼성전자 2분기 실적 발표 이후 반도체 주가가 크게 올랐다",
+             "외국인 투자자의 순매수가 이어지며 코스피 지수도 상승했다"]
+ARTICLE_B = ["하이브 세무조사 소식에 엔터테인먼트 업종 전반이 약세를 보였다",
+             "증권가는 단기 변동성이 커질 수 있다며 신중한 접근을 권했다"]
+
+@contextmanager
+def _env(values):
+    """환경 변수를 잠시 바꾸고 원래 값으로 복원"""
+    previous = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+class StaticDocumentManager(HybridVectorManager):
+    """파일 대신 준비한 문서 목록을 로드하는 매니저"""
+    documents = []
+
+    def _load_documents(self):
+        return [dict(doc, metadata=dict(doc["metadata"])) for doc in self.documents]
+
+class RenamedEmbedding(LocalHashEmbedding):
+    """같은 벡터를 만들지만 모델 식별자가 다른 임베딩 (모델 교체 확인용)"""
+
+    @property
+    def model_id(self) -> str:
+        return f"{super().model_id}-v2"
+
+class StubSegmentation:
+    """'|' 기준으로 나누는 세그멘테이션"""
+
+    def segment_text(self, text, max_length=512, overlap=50):
+        return text.split("|")
+
+class StubEmbedding:
+    """FAIL이 들어간 배치는 통째로 예외, BAD 청크는 항목별 실패를 돌려주는 임베딩"""
+
+    model_id = "stub-embedding"
+
+    def __init__(self, interrupt_on=None):
+        self.batches = []
+        self.interrupt_on = interrupt_on
+
+    def get_text_embeddings_or_errors(self, texts):
+        if self.interrupt_on in texts:
+            raise KeyboardInterrupt
+        self.batches.append(list(texts))
+        if any("FAIL" in text for text in texts):
+            raise ConnectionError("임베딩 API 연결 실패")
+        return [(None, "잘못된 입력") if "BAD" in text else ([1.0, float(len(text)), float(sum(map(ord, text)) % 97)], None)
+                for text in texts]
+
+    def get_cache_stats(self):
+        return None
+
+def _article(url, paragraphs, trading_date="2025-08-01"):
+    return {
+        "text": "\n".join(paragraphs),
+        "max_length": 40,
+        "metadata": {"filename": "news.json", "type": "news", "title": url,
+                     "source_id": f"url:{url}", "trading_date": trading_date}
+    }
+
+def _manager(root: Path, documents, embedding_client=None) -> StaticDocumentManager:
+    """저장된 벡터를 다시 읽는 새 매니저 (실행 사이에 프로세스가 바뀐 것과 같음)"""
+    manager = StaticDocumentManager(data_dir=str(root / "data"), vector_dir=str(root / "vector"), store_name="test")
+    manager.documents = documents
+    if embedding_client is not None:
+        manager.embedding_client = embedding_client
+    return manager
+
+def _texts(manager, source_id=None):
+    return [manager.text_store.read(meta) for meta in manager.metadata
+            if source_id is None or meta["source_id"] == source_id]
+
+def _close(manager):
+    manager.metadata_store.close()
+    manager.text_store.close()
+
+def test_document_upsert():
+    """변경 없는 청크는 건너뛰고, 모델이 바뀌면 다시 임베딩하고, 바뀐 출처의 이전 청크와 삭제한 출처를 정리하는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir, _env(TEST_ENV):
+        root = Path(tmp_dir)
+        articles = [_article("a", ARTICLE_A), _article("b", ARTICLE_B)]
+
+        manager = _manager(root, articles)
+        assert manager.process_documents()
+        assert get_pipeline_metrics().counter("chunks.embedded") == 4
+        assert _texts(manager) == ARTICLE_A + ARTICLE_B
+        doc_ids = [meta["doc_id"] for meta in manager.metadata]
+        _close(manager)
+
+        # 같은 문서를 다시 처리하면 임베딩 없이 그대로 유지
+        manager = _manager(root, articles)
+        assert len(manager.vectors) == 4
+        assert manager.process_documents()
+        metrics = get_pipeline_metrics()
+        assert metrics.counter("chunks.embedded") == 0 and metrics.counter("chunks.unchanged") == 4
+        assert [meta["doc_id"] for meta in manager.metadata] == doc_ids
+        _close(manager)
+
+        # 임베딩 모델이 바뀌면 같은 문서 ID를 다시 임베딩해 제자리에서 교체
+        new_model = RenamedEmbedding(dim=64)
+        manager = _manager(root, articles, new_model)
+        assert manager.process_documents()
+        metrics = get_pipeline_metrics()
+        assert metrics.counter("chunks.embedded") == 4 and metrics.counter("chunks.replaced") == 4
+        assert [meta["doc_id"] for meta in manager.metadata] == doc_ids
+        assert {meta["embedding_model"] for meta in manager.metadata} == {new_model.model_id}
+        _close(manager)
+
+        # 다시 처리한 출처에서 내용이 바뀐 청크만 임베딩하고, 더 이상 나오지 않는 이전 청크는 삭제
+        updated_a = [ARTICLE_A[0], "외국인 투자자가 순매도로 돌아서며 코스피 지수는 하락했다"]
+        manager = _manager(root, [_article("a", updated_a), _article("b", ARTICLE_B)], new_model)
+        assert manager.process_documents()
+        metrics = get_pipeline_metrics()
+        assert metrics.counter("chunks.embedded") == 1 and metrics.counter("chunks.superseded") == 1
+        assert _texts(manager, "url:a") == updated_a and len(manager.vectors) == 4
+        _close(manager)
+
+        # 출처별 삭제는 저장까지 반영 (이번 실행에서 처리하지 않은 출처도 삭제 가능)
+        manager = _manager(root, [], new_model)
+        assert manager.delete_by_source("url:b") == 2
+        assert manager.delete_by_source("url:unknown") == 0
+        _close(manager)
+
+        manager = _manager(root, [], new_model)
+        assert len(manager.vectors) == 2 and _texts(manager) == updated_a
+        assert {meta["source_id"] for meta in manager.metadata} == {"url:a"}
+        _close(manager)
+
+    print("✅ 문서 ID 기준 upsert 테스트 통과")
+
+def _stub_documents(chunk_texts):
+    return [{"text": "|".join(texts), "max_length": 512,
+             "metadata": {"filename": f"d{i}.json", "type": "news", "source_id": f"url:d{i}", "trading_date": ""}}
+            for i, texts in enumerate(chunk_texts)]
+
+def _run_stub_pipeline(root: Path, concurrent: bool):
+    """문서 3개 x 청크 3개를 배치 크기 2로 처리 (d1-c1은 배치 전체 실패, d2-c0은 항목 실패)"""
+    chunk_texts = [[f"d{i}-c{j}" for j in range(3)] for i in range(3)]
+    chunk_texts[1][1] += " FAIL"
+    chunk_texts[2][0] += " BAD"
+    documents = _stub_documents(chunk_texts)
+
+    manager = _manager(root, documents, StubEmbedding())
+    manager.segmentation_client = StubSegmentation()
+    assert manager.process_documents(concurrent=concurrent)
+    all_texts = [text for texts in chunk_texts for text in texts]
+    return manager, all_texts
+
+def test_pipeline_batches():
+    """단계별/동시 실행 모두 청크가 입력 순서대로 한 번씩 저장되고, 실패 배치는 dead-letter로 가는지 테스트"""
+    env = dict(TEST_ENV, PIPELINE_BATCH_SIZE="2", PIPELINE_RETRY_ROUNDS="1", PIPELINE_RETRY_BACKOFF_SECONDS="0")
+    for concurrent in (False, True):
+        with tempfile.TemporaryDirectory() as tmp_dir, _env(env):
+            manager, all_texts = _run_stub_pipeline(Path(tmp_dir), concurrent)
+            stored = _texts(manager)
+            failed = [chunk["text"] for chunk in manager.dead_letters.pending()]
+
+            # 저장된 청크 + 실패 청크 = 전체 청크 (중복, 누락 없이), 저장 순서는 입력 순서
+            assert sorted(stored + failed) == sorted(all_texts) and len(set(stored)) == len(stored)
+            assert stored == [text for text in all_texts if text in stored]
+            assert "d1-c1 FAIL" in failed and "d2-c0 BAD" in failed
+            # 실패 배치 뒤의 문서도 계속 처리
+            assert "d2-c2" in stored and len(manager.vectors) == len(stored)
+            assert manager.dead_letters.path.exists()
+
+            batches = manager.embedding_client.batches
+            assert all(len(batch) <= 2 for batch in batches)
+            if not concurrent:
+                # 단계별 실행은 전체 청크를 순서대로 2개씩 임베딩 (재시도는 실패 청크만)
+                assert batches[:5] == [all_texts[i:i + 2] for i in range(0, len(all_texts), 2)]
+                assert failed == ["d1-c1 FAIL", "d1-c2", "d2-c0 BAD"]
+            # 재시도 라운드는 실패 청크만 다시 임베딩
+            retried = batches[-((len(failed) + 1) // 2):]
+            assert sorted(text for batch in retried for text in batch) == sorted(failed)
+            _close(manager)
+
+    print("✅ 단계별/동시 실행 파이프라인 테스트 통과")
+
+def test_resume_from_checkpoint():
+    """중단된 구축을 재개하면 체크포인트에 기록된 배치는 다시 임베딩하지 않고 이어서 처리하는지 테스트"""
+    env = dict(TEST_ENV, PIPELINE_BATCH_SIZE="2", PIPELINE_CHECKPOINT_EVERY="1", PIPELINE_RESUME="true")
+    chunk_texts = [[f"d{i}-c{j}" for j in range(3)] for i in range(3)]
+    all_texts = [text for texts in chunk_texts for text in texts]
+    with tempfile.TemporaryDirectory() as tmp_dir, _env(env):
+        root = Path(tmp_dir)
+        manager = _manager(root, _stub_documents(chunk_texts), StubEmbedding(interrupt_on="d2-c0"))
+        manager.segmentation_client = StubSegmentation()
+        try:
+            manager.process_documents()
+            assert False, "d2-c0 배치에서 중단"
+        except KeyboardInterrupt:
+            pass
+        assert manager.checkpoint.exists() and not manager.vectors_file.exists()
+        _close(manager)
+
+        manager = _manager(root, _stub_documents(chunk_texts), StubEmbedding())
+        manager.segmentation_client = StubSegmentation()
+        assert manager.process_documents()
+        assert manager.embedding_client.batches == [["d2-c0", "d2-c1"], ["d2-c2"]]
+        assert _texts(manager) == all_texts and not manager.checkpoint.exists()
+        _close(manager)
+
+    print("✅ 체크포인트 재개 테스트 통과")
+
+def test_save_failure():
+    """벡터 저장에 실패하면 구축을 실패로 반환하고, 체크포인트를 남겨 다음 실행에서 다시 임베딩하지 않는지 테스트"""
+    env = dict(TEST_ENV, PIPELINE_BATCH_SIZE="2", PIPELINE_RESUME="true")
+    chunk_texts = [[f"d{i}-c{j}" for j in range(2)] for i in range(2)]
+    with tempfile.TemporaryDirectory() as tmp_dir, _env(env):
+        root = Path(tmp_dir)
+        manager = _manager(root, _stub_documents(chunk_texts), StubEmbedding())
+        manager.segmentation_client = StubSegmentation()
+        manager._save_vectors = lambda: False
+        assert manager.process_documents() is False
+        assert manager.checkpoint.exists() and not manager.vectors_file.exists()
+        _close(manager)
+
+        manager = _manager(root, _stub_documents(chunk_texts), StubEmbedding())
+        manager.segmentation_client = StubSegmentation()
+        assert manager.process_documents()
+        assert manager.embedding_client.batches == []
+        assert len(manager.vectors) == 4 and not manager.checkpoint.exists()
+        _close(manager)
+
+    print("✅ 벡터 저장 실패 테스트 통과")
+
+def test_vector_generation():
+    """저장 도중 중단되면 커밋된 세대로 맞추고, 벡터 수와 메타데이터 수가 다른 짝은 로드하지 않는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir, _env(TEST_ENV):
+        root = Path(tmp_dir)
+        articles = [_article("a", ARTICLE_A), _article("b", ARTICLE_B)]
+        manager = _manager(root, articles)
+        assert manager.process_documents()
+        generation = manager.metadata_store.generation()
+        assert generation and not list(manager.vector_dir.glob("*.pending"))
+        vectors_file, metadata = manager.vectors_file, manager.metadata
+        saved = np.array(load_vector_matrix(vectors_file))
+        _close(manager)
+
+        # 메타데이터 커밋 전에 중단 (다른 세대의 임시 파일) - 임시 파일만 삭제
+        orphan = vectors_file.with_name(f"{vectors_file.name}.99990101_000000_000000.pending")
+        save_vector_matrix(orphan, saved[:1])
+        manager = _manager(root, articles)
+        assert not orphan.exists() and len(manager.vectors) == 4
+        assert manager.metadata_store.generation() == generation
+
+        # 메타데이터 커밋 후 벡터 파일 교체 전에 중단 - 커밋된 세대의 파일로 교체
+        committed = manager._pending_vectors_file("99990102_000000_000000")
+        save_vector_matrix(committed, saved[::-1])
+        manager.metadata_store.replace_all(metadata[::-1], generation="99990102_000000_000000")
+        _close(manager)
+        manager = _manager(root, articles)
+        assert not committed.exists()
+        assert np.array_equal(np.array(manager.vectors), saved[::-1]) and _texts(manager) == (ARTICLE_A + ARTICLE_B)[::-1]
+        _close(manager)
+
+        # 벡터 수와 메타데이터 수가 다르면 짝이 맞지 않으므로 로드하지 않음
+        save_vector_matrix(vectors_file, saved[:3])
+        manager = _manager(root, articles)
+        assert manager.vectors == [] and manager.metadata == []
+        _close(manager)
+
+    print("✅ 벡터/메타데이터 세대 저장 테스트 통과")
+
+if __name__ == "__main__":
+    test_document_upsert()
+    test_pipeline_batches()
+    test_resume_from_checkpoint()
+    test_save_failure()
+    test_vector_generation()
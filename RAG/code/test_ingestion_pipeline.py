@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+벡터 구축 파이프라인 도구 테스트 스크립트
+- API 호출 없이 배치 분할, 체크포인트, dead-letter, 문서 ID 동작만 확인
+"""
+
+import pickle
+import tempfile
+from pathlib import Path
+
+from ingestion_pipeline import BuildCheckpoint, DeadLetterQueue, batched, completed_chunk_keys, document_id
+
+def _chunk(filename: str, article_index: int, chunk_hash: str) -> dict:
+    return {
+        "text": f"{filename} {article_index} {chunk_hash}",
+        "chunk_hash": chunk_hash,
+        "metadata": {"filename": filename, "article_index": article_index, "chunk_hash": chunk_hash}
+    }
+
+def test_batched():
+    """배치 분할 테스트"""
+    assert [len(batch) for batch in batched(range(7), 3)] == [3, 3, 1]
+    print("✅ 배치 분할 테스트 통과")
+
+def test_checkpoint():
+    """체크포인트 저널 저장/로드/재개 키 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "checkpoint.pkl"
+        checkpoint = BuildCheckpoint(path, every_chunks=2, every_seconds=3600)
+        assert checkpoint.load() is None
+
+        checkpoint.start("store")
+        first = _chunk("news.json", 0, "a")["metadata"]
+        assert not checkpoint.record([([0.1], first)])
+
+        second = _chunk("news.json", 1, "b")["metadata"]
+        assert checkpoint.record([([0.2], second)])
+
+        state = checkpoint.load()
+        assert state["base"] == "store"
+        assert [vector for vector, _ in state["entries"]] == [[0.1], [0.2]]
+        assert completed_chunk_keys([meta for _, meta in state["entries"]]) == {("news.json", 0, "a"), ("news.json", 1, "b")}
+
+        # 체크포인트마다 새로 임베딩한 배치만 파일 끝에 추가
+        size = path.stat().st_size
+        third = _chunk("news.json", 2, "c")["metadata"]
+        assert checkpoint.record([([0.3], third), ([0.4], _chunk("news.json", 3, "d")["metadata"])])
+        assert path.stat().st_size - size < size
+        assert len(checkpoint.load()["entries"]) == 4
+
+        # 저장 도중 중단되어 잘린 마지막 기록은 무시
+        with open(path, 'ab') as f:
+            f.write(b"\x80\x04\x95")
+        assert len(checkpoint.load()["entries"]) == 4
+
+        checkpoint.clear()
+        assert not checkpoint.exists()
+
+        # 저널 형식이 아닌 파일 (헤더 없이 전체 결과를 담은 pickle 등)은 잘못된 체크포인트
+        with open(path, 'wb') as f:
+            pickle.dump({"vectors": [[0.1]], "metadata": [first], "saved_at": "2025-08-01T00:00:00"}, f)
+        assert checkpoint.load() is None
+
+    print("✅ 체크포인트 테스트 통과")
+
+def test_dead_letter_queue():
+    """실패 청크 기록/재로드/제거 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "dead_letter.json"
+        queue = DeadLetterQueue(path)
+        chunk = _chunk("news.json", 3, "c")
+
+        queue.add(chunk, "API 응답 오류")
+        queue.add(chunk, "재시도 횟수 소진")
+        queue.save()
+
+        reloaded = DeadLetterQueue(path)
+        assert len(reloaded) == 1
+        assert reloaded.pending()[0]["text"] == chunk["text"]
+
+        reloaded.discard(chunk)
+        reloaded.save()
+        assert len(reloaded) == 0
+        assert not path.exists()
+
+    print("✅ dead-letter 테스트 통과")
+
+def test_document_id():
+    """문서 ID 안정성 및 출처별 dead-letter 정리 테스트"""
+    doc_id = document_id("url:https://news.example.com/1", "2025-08-01", "a")
+    assert doc_id == document_id("url:https://news.example.com/1", "2025-08-01", "a")
+    assert doc_id != document_id("url:https://news.example.com/1", "2025-08-02", "a")
+    assert doc_id != document_id("url:https://news.example.com/2", "2025-08-01", "a")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = DeadLetterQueue(Path(tmp_dir) / "dead_letter.json")
+        for index, source_id in enumerate(["stock:005930", "stock:005930", "stock:000660"]):
+            chunk = _chunk("stock.csv", index, str(index))
+            chunk["metadata"].update(source_id=source_id, doc_id=document_id(source_id, "", str(index)))
+            queue.add(chunk, "API 응답 오류")
+
+        assert queue.discard_where(lambda meta: meta["source_id"] == "stock:005930") == 2
+        assert [chunk["metadata"]["source_id"] for chunk in queue.pending()] == ["stock:000660"]
+
+    print("✅ 문서 ID 테스트 통과")
+
+if __name__ == "__main__":
+    test_batched()
+    test_checkpoint()
+    test_dead_letter_queue()
+    test_document_id()
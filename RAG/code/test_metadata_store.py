@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+메타데이터 저장소 테스트 스크립트
+- SQLite 저장/일괄 조회/조건 조회, 이전 형식 JSON 가져오기 확인
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from metadata_store import open_metadata_store
+
+def _metadata():
+    return [
+        {"doc_id": "a", "type": "csv", "filename": "krx_daily_trading_20250731.csv",
+         "trading_date": "2025-07-31", "created_at": "2025-07-31T18:00:00", "text_content": "KRX 7/31"},
+        {"doc_id": "b", "type": "csv", "filename": "삼성전자_005930.csv", "stock_name": "삼성전자",
+         "trading_date": "2025-08-01", "created_at": "2025-08-01T18:00:00", "text_content": "삼성전자"},
+        {"doc_id": "c", "type": "news", "filename": "naver_news_recent_30.json",
+         "trading_date": "2025-08-01", "created_at": "2025-08-01T18:05:00", "text_content": "뉴스"},
+    ]
+
+def test_metadata_store():
+    """id 일괄 조회 및 조건/범위 조회 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = open_metadata_store(Path(tmp_dir), "test")
+        store.replace_all(_metadata())
+
+        assert store.count() == 3
+        metas = store.get_many([2, 99, 0])
+        assert metas[0]["text_content"] == "뉴스" and metas[1] is None and metas[2]["doc_id"] == "a"
+
+        assert [vector_id for vector_id, _ in store.query(type="csv")] == [0, 1]
+        assert store.count(stock_name="삼성전자") == 1
+        assert store.count(trading_date_from="2025-08-01") == 2
+        assert store.count(created_at_to="2025-08-01T18:00:00") == 2
+        assert len(store.query(limit=1)) == 1
+
+        # 전체 교체 후에는 새 내용만 남음
+        store.replace_all(_metadata()[2:])
+        assert store.load_all() == _metadata()[2:]
+
+    print("✅ 메타데이터 저장소 테스트 통과")
+
+def test_import_legacy_json():
+    """이전 형식 메타데이터 JSON 가져오기 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with open(Path(tmp_dir) / "test_metadata.json", 'w', encoding='utf-8') as f:
+            json.dump(_metadata(), f, ensure_ascii=False)
+
+        store = open_metadata_store(Path(tmp_dir), "test")
+        assert store.load_all() == _metadata()
+
+    print("✅ 이전 형식 메타데이터 가져오기 테스트 통과")
+
+if __name__ == "__main__":
+    test_metadata_store()
+    test_import_legacy_json()
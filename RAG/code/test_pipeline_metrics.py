@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+파이프라인 계측 테스트 스크립트
+- API 호출 없이 지연 시간 히스토그램, 대기 시간, JSON 보고서 확인
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from pipeline_metrics import PipelineMetrics
+
+def test_pipeline_metrics_report():
+    """호출 기록/시간 분류/보고서 저장 테스트"""
+    metrics = PipelineMetrics()
+    metrics.record_call("embedding", 0.2, "20000", chars=100)
+    metrics.record_call("embedding", 3.0, "42901", chars=300)
+    metrics.record_call("embedding", 0.04, "ConnectError", chars=50)
+    metrics.add_time("embedding.rate_limit_sleep", 5.0)
+    metrics.add_time("retry.backoff_sleep", 1.0)
+    metrics.increment("chunks.embedded", 2)
+    with metrics.timer("stage.embedding"):
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = metrics.write_report(Path(tmp_dir) / "run_report.json")
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+
+    embedding = report["calls"]["embedding"]
+    assert embedding["count"] == 3
+    assert embedding["errors"] == 2
+    assert embedding["status_counts"] == {"20000": 1, "42901": 1, "ConnectError": 1}
+    assert embedding["latency"]["histogram"]["<=0.05s"] == 1
+    assert embedding["latency"]["histogram"]["<=0.25s"] == 1
+    assert embedding["latency"]["histogram"]["<=5s"] == 1
+    assert embedding["chars_per_request"]["max"] == 300
+    assert report["time_breakdown"]["sleep_seconds"] == 6.0
+    assert report["throughput"]["chunks_embedded"] == 2
+    assert "stage.embedding" in report["time_breakdown"]["categories"]
+
+    print("✅ 파이프라인 계측 테스트 통과")
+
+if __name__ == "__main__":
+    test_pipeline_metrics_report()
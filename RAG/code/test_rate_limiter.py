@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+적응형 Rate Limiter 테스트 스크립트
+- 토큰 버킷 속도 조절, 상태 파일을 통한 인스턴스 간 예산 공유, 한도 초과 시 감속과 성공 시 회복 확인
+"""
+
+import tempfile
+
+from rate_limiter import RateLimiter, is_throttled_response
+
+def test_token_bucket_pacing():
+    """버스트를 넘는 요청은 분당 속도에 맞춰 대기 시간이 늘어나는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 600 RPM = 0.1초당 토큰 1개
+        limiter = RateLimiter("test", max_rpm=600, burst=1, state_dir=tmp_dir)
+        waits = [limiter.reserve() for _ in range(4)]
+        assert waits[0] == 0.0
+        for i, wait in enumerate(waits[1:], start=1):
+            assert abs(wait - 0.1 * i) < 0.02, waits
+
+        # acquire()는 예약한 시간만큼 실제로 대기
+        assert limiter.acquire() > 0.35
+        assert limiter.get_stats()["acquired"] == 5
+
+    print("✅ 토큰 버킷 속도 조절 테스트 통과")
+
+def test_shared_state():
+    """같은 이름의 두 인스턴스 (다른 프로세스 역할)가 하나의 예산을 나눠 쓰는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        first = RateLimiter("shared", max_rpm=600, burst=1, state_dir=tmp_dir)
+        second = RateLimiter("shared", max_rpm=600, burst=1, state_dir=tmp_dir)
+        assert first.reserve() == 0.0
+        assert abs(second.reserve() - 0.1) < 0.02
+        assert abs(first.reserve() - 0.2) < 0.02
+
+        # 감속도 공유됨
+        second.report_throttled()
+        assert first.get_stats()["current_rpm"] == 300
+
+        # 다른 이름은 별도 예산
+        assert RateLimiter("other", max_rpm=600, burst=1, state_dir=tmp_dir).reserve() == 0.0
+
+    print("✅ Rate Limiter 상태 공유 테스트 통과")
+
+def test_adaptive_rate():
+    """한도 초과 시 속도가 절반이 되고 (최소값 유지), 성공하면 최대치까지 점진적으로 회복되는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        limiter = RateLimiter("adaptive", max_rpm=8, min_rpm=2, state_dir=tmp_dir)
+        limiter.report_throttled()
+        assert limiter.get_stats()["current_rpm"] == 4
+        # 한도 초과 직후에는 버킷이 비어 다음 요청이 대기
+        assert limiter.reserve() > 0
+        limiter.report_throttled()
+        limiter.report_throttled()
+        assert limiter.get_stats()["current_rpm"] == 2
+
+        for expected in (3, 4, 5, 6, 7, 8, 8):
+            limiter.report_success()
+            assert limiter.get_stats()["current_rpm"] == expected
+        assert limiter.get_stats()["throttled"] == 3
+
+    assert is_throttled_response(429, None) and is_throttled_response(200, "42901")
+    assert not is_throttled_response(200, "20000") and not is_throttled_response(None, None)
+
+    print("✅ 적응형 속도 조절 테스트 통과")
+
+if __name__ == "__main__":
+    test_token_bucket_pacing()
+    test_shared_state()
+    test_adaptive_rate()
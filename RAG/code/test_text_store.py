@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+청크 텍스트 blob 저장소 테스트 스크립트
+- blob 파일 이어 쓰기, mmap 읽기, 압축 후 이전 파일 정리 확인
+- 이어 쓰는 도중 여러 스레드가 읽어도 (재매핑, close 포함) 닫힌 mmap을 읽지 않는지 확인
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import text_store
+from text_store import TextBlobStore
+
+def test_externalize_and_read():
+    """텍스트를 blob 파일로 옮긴 뒤 위치로 읽기 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = TextBlobStore(Path(tmp_dir), "test")
+        metadata = [{"doc_id": "a", "text_content": "삼성전자 종가 71,000"}, {"doc_id": "b", "text_content": ""}]
+
+        assert store.externalize(metadata) == 2
+        assert all("text_content" not in meta for meta in metadata)
+        assert store.read(metadata[0]) == "삼성전자 종가 71,000"
+        assert store.read(metadata[1]) == ""
+
+        # 매핑 이후 이어 쓴 텍스트도 다시 매핑해서 읽음
+        metadata.append({"doc_id": "c", "text_content": "하이브 세무조사"})
+        store.externalize(metadata)
+        assert store.with_text(metadata[2])["text_content"] == "하이브 세무조사"
+
+        # 이전 형식 (text_content 포함) 항목은 그대로 반환
+        assert store.read({"text_content": "인라인"}) == "인라인"
+        store.close()
+
+    print("✅ 텍스트 blob 저장/읽기 테스트 통과")
+
+def test_compact():
+    """압축 후 새 세대 파일만 남는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = TextBlobStore(Path(tmp_dir), "test")
+        metadata = [{"doc_id": str(i), "text_content": f"청크 {i} " * 20} for i in range(10)]
+        store.externalize(metadata)
+
+        live = metadata[:2]
+        original_min_bytes = text_store.COMPACT_MIN_BYTES
+        text_store.COMPACT_MIN_BYTES = 0
+        try:
+            assert store.needs_compaction(live)
+            path = store.compact(live)
+        finally:
+            text_store.COMPACT_MIN_BYTES = original_min_bytes
+
+        assert path.name == "test_texts.1.blob"
+        assert store.remove_unused(live) == 1
+        assert [store.read(meta) for meta in live] == [f"청크 {i} " * 20 for i in range(2)]
+        assert store.total_bytes() == sum(meta["text_bytes"] for meta in live)
+        store.close()
+
+    print("✅ 텍스트 blob 압축 테스트 통과")
+
+def test_concurrent_read_while_appending():
+    """이어 쓰기로 재매핑되거나 close()되는 중에도 다른 스레드의 읽기가 실패하지 않는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = TextBlobStore(Path(tmp_dir), "test")
+        first = [{"doc_id": "0", "text_content": "첫 청크"}]
+        store.externalize(first)
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            try:
+                while not stop.is_set():
+                    assert store.read(first[0]) == "첫 청크"
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        # 스레드 전환을 자주 일으켜 mmap을 얻은 뒤 잘라 읽기 전에 다른 스레드가 끼어들도록 함
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        for thread in threads:
+            thread.start()
+        try:
+            # 새 청크를 이어 쓰고 바로 읽으면 더 긴 범위로 다시 매핑 (이전 mmap은 닫힘)
+            for i in range(300):
+                meta = {"doc_id": str(i + 1), "text_content": f"청크 {i}"}
+                store.externalize([meta])
+                assert store.read(meta) == f"청크 {i}"
+                if i % 50 == 0:
+                    store.close()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            sys.setswitchinterval(switch_interval)
+        store.close()
+        assert not errors, errors
+
+    print("✅ 이어 쓰기 중 동시 읽기 테스트 통과")
+
+if __name__ == "__main__":
+    test_externalize_and_read()
+    test_compact()
+    test_concurrent_read_while_appending()
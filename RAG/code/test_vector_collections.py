@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+벡터 컬렉션 테스트 스크립트
+- 컬렉션 설정 (VECTOR_COLLECTIONS), 컬렉션별 스냅샷 로드와 검색, 아직 구축되지 않은 컬렉션 표시 확인
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from conftest import publish_test_store
+from vector_collections import VectorCollections, resolve_collection
+
+def test_collections():
+    """한 VectorCollections가 컬렉션별 인덱스로 검색하는지 테스트"""
+    rng = np.random.default_rng(9)
+    previous = os.environ.get("VECTOR_COLLECTIONS")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        os.environ["VECTOR_COLLECTIONS"] = (f"market={root / 'a'}:hybrid,focus={root / 'b'}:vector_db_1,"
+                                            f"empty={root / 'c'}:empty")
+        try:
+            assert resolve_collection("vector_db_1") == ("focus", root / "b", "vector_db_1")
+            collections = VectorCollections()
+            assert collections.names() == ["market", "focus", "empty"] and collections.default == "market"
+
+            publish_test_store(root / "a", rng.normal(size=(4, 8)), [f"시장{i}" for i in range(4)], store_name="hybrid")
+            publish_test_store(root / "b", rng.normal(size=(3, 8)), [f"종목{i}" for i in range(3)], store_name="vector_db_1")
+            results = collections.reload()
+            assert results["market"]["reloaded"] and results["focus"]["reloaded"]
+            assert results["empty"]["missing"] and not results["empty"]["reloaded"]
+
+            # 같은 쿼리라도 컬렉션마다 자기 인덱스와 메타데이터로 검색
+            market = collections.current()
+            [[(_, vector_id, meta)]] = market.search(np.asarray(market.vectors[2:3]), 1)
+            assert vector_id == 2 and meta["text_content"] == "시장2"
+            focus = collections.current("focus")
+            [[(score, vector_id, meta)]] = focus.search(np.asarray(focus.vectors[1:2]), 1)
+            assert vector_id == 1 and abs(score - 1.0) < 1e-5 and meta["text_content"] == "종목1"
+
+            info = collections.info()
+            assert info["focus"]["snapshot"]["total_vectors"] == 3 and not info["empty"]["loaded"]
+            try:
+                collections.current("unknown")
+                assert False, "없는 컬렉션은 KeyError"
+            except KeyError:
+                pass
+
+            for snapshot in (market, focus):
+                snapshot.metadata_store.close()
+                snapshot.text_store.close()
+        finally:
+            if previous is None:
+                os.environ.pop("VECTOR_COLLECTIONS", None)
+            else:
+                os.environ["VECTOR_COLLECTIONS"] = previous
+
+    print("✅ 벡터 컬렉션 테스트 통과")
+
+if __name__ == "__main__":
+    test_collections()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+벡터 검색 라이브러리 테스트 스크립트
+- API 서버 없이 같은 프로세스에서 질문 텍스트 검색, 배치 검색, 컬렉션 선택, 새 스냅샷 교체 확인
+- API 서버용 검색 실행기 (이벤트 루프 밖 실행, 동시 검색 수 제한, 제한 시간) 확인
+"""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from embedding_backends import LocalHashEmbedding
+from embedding_cache import QueryEmbeddingCache
+from conftest import publish_test_store
+from vector_collections import VectorCollections
+from vector_search import SearchBusyError, SearchExecutor, SearchTimeoutError, VectorSearch
+
+TEXTS = ["삼성전자 주가 상승", "하이브 세무조사 이슈", "거래대금 상위 종목", "코스닥 지수 하락"]
+
+class CountingEmbedding:
+    """임베딩 API 호출 수를 세는 클라이언트"""
+
+    def __init__(self, client):
+        self.client = client
+        self.embedded = []
+
+    def get_text_embeddings_or_errors(self, texts):
+        self.embedded.extend(texts)
+        return self.client.get_text_embeddings_or_errors(texts)
+
+    def get_cache_stats(self):
+        return None
+
+def test_vector_search():
+    """질문 텍스트로 검색하면 같은 텍스트의 청크가 유사도 1로 먼저 나오는지 테스트"""
+    embedding_client = LocalHashEmbedding(dim=64)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_dir = Path(tmp_dir)
+        publish_test_store(vector_dir, embedding_client.get_text_embeddings(TEXTS), TEXTS, type="news")
+
+        search = VectorSearch(VectorCollections(locations={"test": (vector_dir, "test")}), embedding_client)
+        assert search.load() == ["test"]
+
+        results = search.search("하이브 세무조사 이슈", top_k=2)
+        assert len(results) == 2 and results[0]["text_content"] == TEXTS[1]
+        assert abs(results[0]["similarity"] - 1.0) < 1e-5 and results[0]["type"] == "news"
+
+        # 배치 검색: 질문별 결과가 질문 순서대로, 단건 검색과 같은 결과
+        batch = search.search_batch([TEXTS[3], TEXTS[0], "하이브 세무조사 이슈"], top_k=2)
+        assert [entry["query"] for entry in batch] == [TEXTS[3], TEXTS[0], "하이브 세무조사 이슈"]
+        assert [entry["results"][0]["index"] for entry in batch] == [3, 0, 1]
+        assert batch[2]["results"] == results and all("error" not in entry for entry in batch)
+        assert search.search_batch([], top_k=2) == []
+
+        # 미리 계산한 쿼리 벡터로 검색하면 같은 결과, 차원이 다르면 ValueError
+        assert search.search_vector(embedding_client.get_text_embeddings(["하이브 세무조사 이슈"])[0], top_k=2) == results
+        try:
+            search.search_vector([0.1] * 32, top_k=2)
+            assert False, "차원이 다른 쿼리 벡터는 ValueError"
+        except ValueError:
+            pass
+        # 결과 수가 1 미만이면 FAISS 검색 전에 ValueError
+        for top_k in (0, -3):
+            try:
+                search.search_vector(embedding_client.get_text_embeddings(["하이브"])[0], top_k=top_k)
+                assert False, "top_k가 1 미만이면 ValueError"
+            except ValueError:
+                pass
+
+        # 없는 컬렉션은 임베딩 전에 KeyError
+        try:
+            search.search("삼성전자", collection="unknown")
+            assert False, "없는 컬렉션은 KeyError"
+        except KeyError:
+            pass
+
+        # 새 스냅샷이 생기면 refresh()로 교체
+        first = search.snapshot()
+        texts = TEXTS + ["반도체 업황 개선"]
+        publish_test_store(vector_dir, embedding_client.get_text_embeddings(texts), texts, type="news")
+        assert search.refresh()["test"]["reloaded"]
+        assert search.search("반도체 업황 개선", top_k=1)[0]["index"] == 4
+
+        for snapshot in (first, search.snapshot()):
+            snapshot.metadata_store.close()
+            snapshot.text_store.close()
+
+    print("✅ 벡터 검색 라이브러리 테스트 통과")
+
+def test_query_embedding_cache():
+    """반복 질문은 임베딩 API를 다시 호출하지 않는지 테스트"""
+    embedding_client = CountingEmbedding(LocalHashEmbedding(dim=64))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_dir = Path(tmp_dir)
+        publish_test_store(vector_dir, embedding_client.client.get_text_embeddings(TEXTS), TEXTS, type="news")
+        search = VectorSearch(VectorCollections(locations={"test": (vector_dir, "test")}), embedding_client,
+                              QueryEmbeddingCache(max_entries=8, ttl_seconds=60))
+        search.load()
+
+        first = search.search(TEXTS[0], top_k=2)
+        assert search.search(TEXTS[0], top_k=2) == first
+        # 배치 안의 중복 질문과 이미 캐시된 질문은 한 번만 임베딩
+        search.search_batch([TEXTS[0], TEXTS[1], TEXTS[1]], top_k=2)
+        assert embedding_client.embedded == [TEXTS[0], TEXTS[1]]
+
+        stats = search.cache_stats()["query_cache"]
+        assert stats["hits"] == 2 and stats["misses"] == 3 and stats["entries"] == 2
+
+        snapshot = search.snapshot()
+        snapshot.metadata_store.close()
+        snapshot.text_store.close()
+
+    print("✅ 질문 임베딩 캐시 검색 테스트 통과")
+
+def test_search_executor():
+    """블로킹 검색이 이벤트 루프를 막지 않고, 동시 검색 수와 제한 시간을 지키는지 테스트"""
+    executor = SearchExecutor(max_concurrency=2, timeout=0.3)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        # 두 검색은 동시에 실행되고 그동안 이벤트 루프는 계속 동작
+        results = await asyncio.gather(executor.run(time.sleep, 0.1), executor.run(lambda: "ok"))
+        assert results == [None, "ok"] and ticks >= 5
+
+        # 자리가 모두 찬 동안 들어온 요청은 제한 시간 안에 시작하지 못하면 SearchBusyError
+        slow = [asyncio.ensure_future(executor.run(time.sleep, 0.5)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        try:
+            await executor.run(lambda: "late")
+            assert False, "SearchBusyError"
+        except SearchBusyError as e:
+            assert e.status_code == 503
+        for task in slow:
+            try:
+                await task
+                assert False, "SearchTimeoutError"
+            except SearchTimeoutError as e:
+                assert e.status_code == 504
+
+        # 제한 시간이 지나도 실행 중인 작업이 끝나야 자리가 반환됨
+        assert executor.get_stats()["active"] == 2
+        await asyncio.sleep(0.3)
+        assert executor.get_stats()["active"] == 0 and await executor.run(lambda: 1) == 1
+        ticking.cancel()
+
+    asyncio.run(scenario())
+    stats = executor.get_stats()
+    assert stats["busy"] == 1 and stats["timeouts"] == 2 and stats["completed"] == 5
+    executor.shutdown()
+
+    print("✅ 검색 실행기 테스트 통과")
+
+if __name__ == "__main__":
+    test_vector_search()
+    test_query_embedding_cache()
+    test_search_executor()
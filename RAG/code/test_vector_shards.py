@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+거래일 샤드 테스트 스크립트
+- 샤드 구간 계산 (월 단위 병합), 매니페스트, 샤드별 검색 결과 병합과 날짜 범위 검색 확인
+"""
+
+import tempfile
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from metadata_store import open_metadata_store
+from vector_shards import ShardedIndex, load_manifest, plan_shards, remove_stale_shard_indexes, write_manifest
+from vector_storage import index_files, save_vector_matrix
+
+TRADING_DATES = ["", "2025-06-02", "2025-06-03", "2025-07-30", "2025-07-30", "2025-07-31", "2025-08-01"]
+
+def test_plan_shards():
+    """거래일별 샤드와 오래된 거래일의 월 단위 병합 테스트"""
+    shards = plan_shards(TRADING_DATES, compact_after_days=30)
+    assert [(shard["key"], shard["start"], shard["end"]) for shard in shards] == [
+        ("undated", 0, 1), ("2025-06", 1, 3), ("2025-07-30", 3, 5), ("2025-07-31", 5, 6), ("2025-08-01", 6, 7)
+    ]
+    assert shards[1]["date_from"] == "2025-06-02" and shards[1]["date_to"] == "2025-06-03"
+
+    # 병합하지 않으면 거래일마다 샤드
+    assert len(plan_shards(TRADING_DATES)) == 6
+    assert plan_shards([]) == []
+
+    print("✅ 샤드 구간 계산 테스트 통과")
+
+def test_sharded_search():
+    """샤드별 검색 결과 병합, 날짜 범위 검색, 매니페스트 테스트"""
+    vectors = np.random.default_rng(3).normal(size=(len(TRADING_DATES), 8)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stem = Path(tmp_dir) / "test_vectors"
+        save_vector_matrix(stem.with_suffix(".npy"), vectors)
+        store = open_metadata_store(Path(tmp_dir), "test")
+        store.replace_all({"doc_id": str(i), "trading_date": trading_date}
+                          for i, trading_date in enumerate(TRADING_DATES))
+
+        shards = plan_shards(TRADING_DATES, compact_after_days=30)
+        manifest = Path(tmp_dir) / "test_shards.json"
+        write_manifest(manifest, shards, 30)
+        assert load_manifest(manifest, len(vectors) + 1) is None
+        shards = load_manifest(manifest, len(vectors))
+
+        index = ShardedIndex(stem, "float32", faiss.METRIC_L2, shards=shards, metadata_store=store)
+        assert index.ntotal == len(vectors) and index.d == 8
+        assert all(index_files(stem, shard["key"])[0].exists() for shard in shards)
+
+        # 전체 검색은 단일 인덱스와 같은 결과
+        flat = faiss.IndexFlatL2(8)
+        flat.add(vectors)
+        _, expected = flat.search(vectors[:2], 4)
+        _, ids = index.search(vectors[:2], 4)
+        assert np.array_equal(ids, expected)
+
+        # 월 단위 샤드의 일부만 겹치는 범위는 해당 행만 검색, 부족한 자리는 -1
+        _, ids = index.search(vectors[6:7], 4, date_from="2025-06-03", date_to="2025-07-30")
+        assert sorted(ids[0][:3]) == [2, 3, 4] and ids[0][3] == -1
+        _, ids = index.search(vectors[:1], 2, date_from="2025-09-01")
+        assert (ids == -1).all()
+
+        # 매니페스트가 없는 (정렬 전) 저장소도 날짜 범위 검색 가능
+        unsharded = ShardedIndex(stem, "float32", faiss.METRIC_L2, metadata_store=store)
+        _, ids = unsharded.search(vectors[:1], 3, date_from="2025-07-31")
+        assert sorted(ids[0][:2]) == [5, 6] and ids[0][2] == -1
+
+        assert remove_stale_shard_indexes(stem, shards[2:]) == 4
+        store.close()
+
+    print("✅ 샤드 검색 테스트 통과")
+
+if __name__ == "__main__":
+    test_plan_shards()
+    test_sharded_search()
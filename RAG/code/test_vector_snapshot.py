@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+벡터 스냅샷 테스트 스크립트
+- 스냅샷 생성과 current 포인터 교체, 서버 쪽 스냅샷 교체, 오래된 버전 정리 확인
+- 이어 쓰이는 blob 파일은 스냅샷 시점 길이까지만 읽고, 교체된 스냅샷은 진행 중인 검색이 끝나면 닫는지 확인
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from conftest import publish_test_store
+from vector_snapshot import SnapshotHolder, read_pointer, snapshot_root
+
+def test_publish_and_reload():
+    """새 스냅샷이 나오면 서버 쪽 참조만 교체되고 이전 스냅샷은 그대로인지 테스트"""
+    rng = np.random.default_rng(5)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_dir = Path(tmp_dir)
+        holder = SnapshotHolder(vector_dir, "test")
+
+        first_version = publish_test_store(vector_dir, rng.normal(size=(3, 4)).astype(np.float32), ["가", "나", "다"])
+        assert read_pointer(vector_dir, "test")["version"] == first_version
+        assert holder.reload()["reloaded"]
+        first = holder.current
+        assert first.version == first_version and first.index.ntotal == 3
+        assert holder.reload() == {"reloaded": False, "version": first_version}
+
+        # 다시 저장해도 이전 스냅샷 파일 (하드 링크)은 바뀌지 않음
+        second_version = publish_test_store(vector_dir, rng.normal(size=(5, 4)).astype(np.float32), ["라"] * 5)
+        assert len(first.vectors) == 3
+        assert first.text_store.read(first.metadata_store.get(2)) == "다"
+        # 같은 blob 파일에 이어 쓴 영역은 이전 스냅샷에서 읽지 않음 (기록한 길이까지만)
+        blob_name = first.metadata_store.get(2)["text_file"]
+        assert first.text_store.lengths == {blob_name: len("가나다".encode('utf-8'))}
+        assert (first.directory / blob_name).stat().st_size > first.text_store.lengths[blob_name]
+        appended = {"text_file": blob_name, "text_offset": first.text_store.lengths[blob_name], "text_bytes": 3}
+        assert first.text_store.read(appended) == ""
+
+        result = holder.reload()
+        assert result["reloaded"] and result["previous_version"] == first_version
+        # 진행 중인 검색이 없으면 교체된 스냅샷은 바로 닫힘
+        assert first.closed
+        second = holder.current
+        assert second.version == second_version and second.index.ntotal == 5
+        # 코사인 유사도 검색: 벡터 크기와 관계없이 자기 자신의 점수는 1
+        [[(score, vector_id, meta)]] = second.search(np.asarray(second.vectors[4:5]) * 3, 1)
+        assert vector_id == 4 and abs(score - 1.0) < 1e-5 and meta["text_content"] == "라"
+
+        # keep=2: 세 번째 스냅샷을 만들면 첫 번째 버전 삭제
+        # 검색 도중 교체되면 이전 스냅샷은 검색이 끝날 때까지 열려 있음
+        with holder.use() as held:
+            assert held is second
+            publish_test_store(vector_dir, rng.normal(size=(2, 4)).astype(np.float32), ["마", "바"])
+            versions = sorted(path.name for path in snapshot_root(vector_dir, "test").iterdir())
+            assert len(versions) == 2 and first_version not in versions
+            assert holder.reload()["reloaded"] and holder.current is not second
+            assert not second.closed
+            [[(_, _, meta)]] = held.search(np.asarray(held.vectors[:1]), 1)
+            assert meta["text_content"] == "라"
+        assert second.closed and not holder.current.closed
+
+        holder.current.close()
+
+    print("✅ 벡터 스냅샷 교체 테스트 통과")
+
+if __name__ == "__main__":
+    test_publish_and_reload()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+벡터 저장 형식 테스트 스크립트
+- float16 / int8 양자화 저장, 로드, FAISS 인덱스 구축, 재현율 비교 확인
+"""
+
+import pickle
+import tempfile
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from vector_storage import (
+    compare_recall, build_index, has_quantized, quantize_int8, load_quantized, save_quantized,
+    load_vector_matrix, save_vector_matrix, index_files, load_or_build_index, index_spec, search_parameters
+)
+
+def _random_vectors(n: int = 500, dimension: int = 64) -> np.ndarray:
+    vectors = np.random.default_rng(7).normal(size=(n, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def test_vector_matrix_round_trip():
+    """연속 행렬 .npy 저장/mmap 로드, 이전 형식 pickle 읽기 테스트"""
+    vectors = _random_vectors(10, 8)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "test_vectors.npy"
+        assert load_vector_matrix(path) is None
+
+        # 이전 형식 (Python 리스트 pickle)
+        with open(path.with_suffix(".pkl"), 'wb') as f:
+            pickle.dump(vectors.tolist(), f)
+        assert np.allclose(load_vector_matrix(path), vectors)
+
+        save_vector_matrix(path, list(vectors))
+        matrix = load_vector_matrix(path)
+        assert isinstance(matrix, np.memmap)
+        assert matrix.dtype == np.float32 and matrix.shape == (10, 8)
+        assert np.array_equal(matrix, vectors)
+
+        # mmap으로 열린 상태에서 덮어쓰기
+        save_vector_matrix(path, list(matrix) + [vectors[0]])
+        assert load_vector_matrix(path).shape == (11, 8)
+
+    print("✅ 벡터 행렬 저장/로드 테스트 통과")
+
+def test_persisted_index():
+    """인덱스 저장 후 재사용, 벡터 파일이 바뀌면 다시 구축하는지 확인"""
+    vectors = _random_vectors(50, 16)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stem = Path(tmp_dir) / "test_vectors"
+        assert load_or_build_index(stem) is None
+
+        save_vector_matrix(stem.with_suffix(".npy"), vectors)
+        index = load_or_build_index(stem)
+        index_path, info_path = index_files(stem)
+        assert index.ntotal == 50 and index_path.exists() and info_path.exists()
+
+        # 같은 내용이면 저장된 파일을 그대로 사용
+        mtime = index_path.stat().st_mtime_ns
+        _, indices = load_or_build_index(stem).search(vectors[:5], 1)
+        assert (indices[:, 0] == np.arange(5)).all()
+        assert index_path.stat().st_mtime_ns == mtime
+
+        # 벡터가 바뀌면 다시 구축
+        save_vector_matrix(stem.with_suffix(".npy"), vectors[:30])
+        assert load_or_build_index(stem).ntotal == 30
+
+        # 거리 방식이 바뀌어도 다시 구축
+        assert load_or_build_index(stem, metric=faiss.METRIC_L2).metric_type == faiss.METRIC_L2
+
+    print("✅ 인덱스 저장/재사용 테스트 통과")
+
+def test_quantized_round_trip():
+    """형식별 저장/로드 후 자기 자신이 최상위로 검색되는지 확인"""
+    vectors = _random_vectors()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stem = Path(tmp_dir) / "test_vectors"
+        for fmt in ("float16", "int8"):
+            save_quantized(stem, vectors, fmt)
+            assert has_quantized(stem, fmt)
+
+            codes, scales = load_quantized(stem, fmt)
+            index = build_index(codes, fmt, scales=scales, normalize=True)
+            assert index.ntotal == len(vectors)
+            # 저장된 코드를 재양자화 없이 인덱스 코드 배열에 그대로 적재
+            assert (faiss.vector_to_array(index.codes) == codes.view(np.uint8).reshape(-1)).all()
+
+            _, indices = index.search(vectors[:20], 1)
+            assert (indices[:, 0] == np.arange(20)).all()
+
+        # int8 코드는 정규화한 벡터라 코사인이 아닌 거리 방식으로는 구축하지 않음
+        try:
+            build_index(codes, "int8", scales=scales, metric=faiss.METRIC_L2)
+            assert False, "int8은 코사인 검색 전용"
+        except ValueError:
+            pass
+
+        # 다른 형식으로 저장하면 이전 형식 파일은 삭제
+        assert not has_quantized(stem, "float16")
+
+    print("✅ 양자화 저장/로드 테스트 통과")
+
+def test_compare_recall():
+    """float32 기준 재현율 비교 보고서 확인"""
+    report = {row["format"]: row for row in compare_recall(_random_vectors(), k=10, n_queries=50)}
+    assert report["float32"]["recall_at_k"] == 1.0
+    assert report["float16"]["recall_at_k"] > 0.95
+    assert report["int8"]["recall_at_k"] > 0.85
+    assert report["int8"]["bytes_per_vector"] < report["float16"]["bytes_per_vector"]
+    print(f"✅ 재현율 비교 테스트 통과: { {fmt: round(row['recall_at_k'], 3) for fmt, row in report.items()} }")
+
+def test_normalized_index():
+    """정규화 구축 시 형식/인덱스 종류와 관계없이 점수가 코사인 유사도인지 확인"""
+    vectors = _random_vectors(1200, 32) * np.random.default_rng(2).uniform(0.5, 5, size=(1200, 1)).astype(np.float32)
+    queries = np.ascontiguousarray(vectors[:5] / np.linalg.norm(vectors[:5], axis=1, keepdims=True))
+    for fmt in ("float32", "float16", "int8"):
+        codes, scales = quantize_int8(vectors) if fmt == "int8" else (vectors.astype(np.float16 if fmt == "float16" else np.float32), None)
+        for spec in (None, index_spec("hnsw")):
+            scores, indices = build_index(codes, fmt, scales=scales, spec=spec, normalize=True).search(queries, 1)
+            assert (indices[:, 0] == np.arange(5)).all()
+            assert np.allclose(scores[:, 0], 1.0, atol=0.02)
+
+    print("✅ 코사인 정규화 인덱스 테스트 통과")
+
+def test_index_types():
+    """인덱스 종류별 구축/저장/재사용, 날짜 샤드용 id 선택 검색, 작은 인덱스의 flat 구축 확인"""
+    vectors = _random_vectors(1500, 32)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stem = Path(tmp_dir) / "test_vectors"
+        save_vector_matrix(stem.with_suffix(".npy"), vectors)
+        expected = {"ivf_flat": "IndexIVFFlat", "ivf_pq": "IndexIVFPQ", "hnsw": "IndexHNSWFlat"}
+        for index_type, class_name in expected.items():
+            spec = index_spec(index_type, nlist=16, nprobe=16, pq_m=8)
+            index = load_or_build_index(stem, spec=spec)
+            assert type(index).__name__ == class_name and index.ntotal == 1500
+
+            # 저장된 인덱스를 다시 쓰고, 검색 시점 파라미터만 바꾸면 다시 구축하지 않음
+            mtime = index_files(stem)[0].stat().st_mtime_ns
+            index = load_or_build_index(stem, spec=dict(spec, nprobe=4, ef_search=32))
+            assert index_files(stem)[0].stat().st_mtime_ns == mtime
+
+            params = search_parameters(index, faiss.IDSelectorRange(100, 200))
+            _, indices = index.search(vectors[150:151], 5, params=params)
+            assert all(100 <= i < 200 for i in indices[0] if i != -1)
+
+        # 벡터가 적은 샤드는 flat
+        index = load_or_build_index(stem, rows=(0, 200), shard="small", spec=index_spec("hnsw"))
+        assert type(index).__name__ == "IndexFlat"
+
+    print("✅ 인덱스 종류 테스트 통과")
+
+if __name__ == "__main__":
+    test_vector_matrix_round_trip()
+    test_persisted_index()
+    test_quantized_round_trip()
+    test_compare_recall()
+    test_normalized_index()
+    test_index_types()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+청크 텍스트 blob 저장소
+- 청크 텍스트를 append-only blob 파일에 UTF-8로 이어 쓰고, 메타데이터에는 위치만 저장
+  (text_file, text_offset, text_bytes)
+- 검색 결과로 반환되는 청크만 mmap으로 읽으므로 API 서버가 전체 텍스트를 메모리에 올리지 않음
+- 삭제/교체로 쓰이지 않는 영역이 많아지면 새 세대 파일로 압축 (기존 파일은 덮어쓰지 않음)
+- 스냅샷은 blob 파일을 하드 링크하고 그 시점 길이를 기록 (이후 이어 쓴 영역은 읽지 않음)
+
+파일 이름 규칙: <store>_texts.<세대>.blob (예: hybrid_texts.0.blob)
+"""
+
+import mmap
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# 압축 조건: 전체 blob 크기가 사용 중인 텍스트 크기의 이 배수를 넘고 최소 크기 이상일 때
+COMPACT_RATIO = 2.0
+COMPACT_MIN_BYTES = 16 * 1024 * 1024
+
+
+class TextBlobStore:
+    """청크 텍스트 blob 파일 읽기/쓰기"""
+
+    def __init__(self, directory: Path, store_name: str, lengths: Optional[Dict[str, int]] = None):
+        self.directory = Path(directory)
+        self.store_name = store_name
+        # 파일별로 읽을 수 있는 길이 (스냅샷 시점 길이, None이면 파일 전체)
+        self.lengths = lengths
+        self._pattern = re.compile(rf"^{re.escape(store_name)}_texts\.(\d+)\.blob$")
+        self._lock = threading.Lock()
+        self._maps: Dict[str, Tuple[int, mmap.mmap]] = {}
+
+    # ------------------------------------------------------------------
+    # 파일 관리
+    # ------------------------------------------------------------------
+    def _blob_files(self) -> Dict[int, Path]:
+        """세대 번호 → blob 파일"""
+        files = {}
+        if self.directory.exists():
+            for path in self.directory.iterdir():
+                match = self._pattern.match(path.name)
+                if match:
+                    files[int(match.group(1))] = path
+        return files
+
+    def current_file(self) -> Path:
+        """새 텍스트를 이어 쓸 blob 파일 (가장 최근 세대)"""
+        files = self._blob_files()
+        generation = max(files) if files else 0
+        return self.directory / f"{self.store_name}_texts.{generation}.blob"
+
+    def total_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self._blob_files().values())
+
+    # ------------------------------------------------------------------
+    # 쓰기 (벡터 구축 프로세스)
+    # ------------------------------------------------------------------
+    def externalize(self, metadata: List[Dict[str, Any]]) -> int:
+        """text_content를 가진 항목의 텍스트를 blob 파일에 추가하고 위치로 교체 (옮긴 항목 수 반환)"""
+        pending = [meta for meta in metadata if "text_content" in meta]
+        if not pending:
+            return 0
+
+        path = self.current_file()
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            for meta in pending:
+                data = (meta.pop("text_content") or "").encode('utf-8')
+                f.write(data)
+                meta.update(text_file=path.name, text_offset=offset, text_bytes=len(data))
+                offset += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(pending)
+
+    def needs_compaction(self, metadata: List[Dict[str, Any]]) -> bool:
+        """쓰이지 않는 영역이 많으면 True"""
+        total = self.total_bytes()
+        live = sum(meta.get("text_bytes", 0) for meta in metadata)
+        return total >= COMPACT_MIN_BYTES and total > live * COMPACT_RATIO
+
+    def compact(self, metadata: List[Dict[str, Any]]) -> Path:
+        """사용 중인 텍스트만 새 세대 파일에 복사하고 메타데이터 위치 갱신
+
+        이전 파일은 메타데이터 저장이 끝난 뒤 remove_unused로 삭제한다
+        (그 전까지 이전 메타데이터를 읽는 서버는 이전 파일을 그대로 읽음).
+        """
+        files = self._blob_files()
+        path = self.directory / f"{self.store_name}_texts.{max(files) + 1 if files else 0}.blob"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            offset = 0
+            for meta in metadata:
+                if "text_file" not in meta:
+                    continue
+                data = self.read(meta).encode('utf-8')
+                f.write(data)
+                meta.update(text_file=path.name, text_offset=offset, text_bytes=len(data))
+                offset += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    def remove_unused(self, metadata: List[Dict[str, Any]]) -> int:
+        """어떤 메타데이터도 가리키지 않는 이전 세대 blob 파일 삭제 (삭제한 파일 수 반환)"""
+        used = {meta.get("text_file") for meta in metadata}
+        current = self.current_file().name
+        removed = 0
+        for path in self._blob_files().values():
+            if path.name not in used and path.name != current:
+                with self._lock:
+                    entry = self._maps.pop(path.name, None)
+                if entry:
+                    entry[1].close()
+                path.unlink()
+                removed += 1
+        return removed
+
+    # ------------------------------------------------------------------
+    # 읽기 (API 서버)
+    # ------------------------------------------------------------------
+    def _read_range(self, name: str, offset: int, length: int) -> Optional[bytes]:
+        """blob 파일의 [offset, offset + length) 바이트 (파일이 없거나 범위를 벗어나면 None)
+
+        mmap을 재사용하고, 파일이 이어 쓰여 요청 범위가 매핑 밖이면 다시 매핑한다 (lengths가 있으면 그 길이까지만).
+        다른 스레드의 재매핑이나 close()가 사용 중인 mmap을 닫지 않도록 잘라 읽기까지 잠금 안에서 처리한다.
+        """
+        end = offset + length
+        with self._lock:
+            entry = self._maps.get(name)
+            if entry and entry[0] >= end:
+                return entry[1][offset:end]
+            if entry:
+                entry[1].close()
+                del self._maps[name]
+
+            path = self.directory / name
+            if not path.exists() or end == 0:
+                return None
+            size = path.stat().st_size
+            if self.lengths is not None:
+                size = min(size, self.lengths.get(name, 0))
+            if size < end:
+                return None
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            self._maps[name] = (len(mapped), mapped)
+            return mapped[offset:end]
+
+    def read(self, meta: Dict[str, Any]) -> str:
+        """메타데이터 항목의 청크 텍스트 (이전 형식처럼 text_content가 있으면 그대로 반환)"""
+        if "text_content" in meta:
+            return meta["text_content"] or ""
+        if "text_file" not in meta or not meta.get("text_bytes"):
+            return ""
+        data = self._read_range(meta["text_file"], meta["text_offset"], meta["text_bytes"])
+        return data.decode('utf-8') if data is not None else ""
+
+    def with_text(self, meta: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """text_content를 채운 메타데이터 사본 (검색 결과용)"""
+        if meta is None:
+            return None
+        return dict(meta, text_content=self.read(meta))
+
+    def close(self):
+        with self._lock:
+            for _, mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+벡터 컬렉션 (이름 있는 벡터 저장소 묶음)
+- 컬렉션마다 자기 벡터 디렉토리, 스냅샷, 샤드 인덱스를 가짐 (예: market_daily = vector_db/hybrid,
+  focus_stocks = vector_db_1/vector_db_1 - 기존 디렉토리와 파일 이름 그대로)
+- API 서버 한 프로세스가 모든 컬렉션을 로드하고 임베딩 클라이언트, FAISS, 워밍업을 공유
+- 검색 요청의 collection 값으로 컬렉션 선택 (없으면 첫 번째 컬렉션)
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import get_vector_collections
+from vector_snapshot import SearchSnapshot, SnapshotHolder, read_pointer
+
+
+def resolve_collection(name: str) -> Tuple[str, Path, str]:
+    """컬렉션 이름 또는 저장소 이름 (hybrid, vector_db_1)으로 (컬렉션 이름, 벡터 디렉토리, 저장소 이름) 조회"""
+    collections = get_vector_collections()
+    if name in collections:
+        return (name,) + collections[name]
+    for collection, (vector_dir, store_name) in collections.items():
+        if store_name == name:
+            return collection, vector_dir, store_name
+    raise KeyError(f"알 수 없는 벡터 컬렉션: {name} (사용 가능: {', '.join(collections)})")
+
+
+class VectorCollections:
+    """컬렉션 이름별 SnapshotHolder (컬렉션마다 독립적으로 스냅샷 교체)"""
+
+    def __init__(self, names: Optional[List[str]] = None, metric: str = "cosine",
+                 locations: Optional[Dict[str, Tuple[Path, str]]] = None):
+        """names: 설정 (VECTOR_COLLECTIONS) 중 사용할 컬렉션 (없으면 전체)
+        locations: 설정 대신 사용할 {이름: (벡터 디렉토리, 저장소 이름)}
+        """
+        if locations is None:
+            locations = {}
+            for name in names or get_vector_collections():
+                collection, vector_dir, store_name = resolve_collection(name)
+                locations[collection] = (vector_dir, store_name)
+        if not locations:
+            raise ValueError("VECTOR_COLLECTIONS에 컬렉션이 없습니다")
+        self.holders: Dict[str, SnapshotHolder] = {
+            name: SnapshotHolder(vector_dir, store_name, metric) for name, (vector_dir, store_name) in locations.items()
+        }
+        self.default = next(iter(self.holders))
+
+    def names(self) -> List[str]:
+        return list(self.holders)
+
+    def holder(self, name: Optional[str] = None) -> SnapshotHolder:
+        """컬렉션의 SnapshotHolder (name이 없으면 기본 컬렉션, 없는 이름이면 KeyError)"""
+        name = name or self.default
+        if name not in self.holders:
+            raise KeyError(f"알 수 없는 벡터 컬렉션: {name} (사용 가능: {', '.join(self.holders)})")
+        return self.holders[name]
+
+    def current(self, name: Optional[str] = None) -> Optional[SearchSnapshot]:
+        """컬렉션의 현재 스냅샷 (검색은 요청마다 한 번만 읽어 같은 버전을 사용)"""
+        return self.holder(name).current
+
+    def use(self, name: Optional[str] = None):
+        """컬렉션의 현재 스냅샷을 검색 동안 잡아 두는 컨텍스트 (SnapshotHolder.use)"""
+        return self.holder(name).use()
+
+    def reload(self, name: Optional[str] = None, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """컬렉션 하나 (name이 없으면 전체)를 새 스냅샷으로 교체, {컬렉션: 결과}
+
+        아직 한 번도 구축되지 않은 컬렉션 (스냅샷 포인터 없음)은 결과에 missing=True를 표시한다.
+        force가 아니면 이런 컬렉션은 로드를 시도하지 않는다 (포인터가 없는 이전 방식 저장소는 force로 로드).
+        """
+        names = [name] if name else self.names()
+        results = {}
+        for collection in names:
+            holder = self.holder(collection)
+            missing = holder.current is None and read_pointer(holder.vector_dir, holder.store_name) is None
+            if missing and not force:
+                results[collection] = {"reloaded": False, "version": None, "missing": True}
+                continue
+            try:
+                results[collection] = holder.reload(force=force)
+            except Exception as e:
+                results[collection] = {"reloaded": False, "error": str(e)}
+            if missing and holder.current is None:
+                results[collection]["missing"] = True
+        return results
+
+    def watch(self, interval: float):
+        for holder in self.holders.values():
+            holder.watch(interval)
+
+    def stop(self):
+        for holder in self.holders.values():
+            holder.stop()
+
+    def info(self) -> Dict[str, Dict[str, Any]]:
+        """컬렉션별 로드 상태와 스냅샷 정보"""
+        result = {}
+        for name, holder in self.holders.items():
+            snapshot = holder.current
+            result[name] = {
+                "vector_dir": str(holder.vector_dir),
+                "store_name": holder.store_name,
+                "loaded": snapshot is not None,
+                "snapshot": snapshot.info() if snapshot else None,
+                "shards": snapshot.index.shard_info() if snapshot else []
+            }
+        return result
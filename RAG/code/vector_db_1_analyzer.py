@@ -1,19 +1,21 @@
 #!/usr/bin/env python3
 """
 vector_db_1 벡터 기반 주식 분석 보고서 생성 시스템
-- FAISS API를 통해 vector_db_1의 벡터 검색
+- 벡터 검색 라이브러리로 vector_db_1 (focus_stocks 컬렉션) 벡터 검색 (API 서버 불필요)
 - CLOVA 모델에게 4000자 보고서 요청
 """
 
-import http.client
 import json
-import requests
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+from clova_transport import get_clova_transport
+from rate_limiter import get_rate_limiter, is_throttled_response
+from vector_search import get_vector_search
+
 # 환경변수 로드
 current_dir = Path(__file__).parent
 env_path = current_dir / ".env"
@@ -40,23 +42,25 @@ class CompletionExecutor:
         print(f"   API 키: {self._api_key[:20]}...")
         print(f"   요청 데이터: {completion_request}")
 
-        conn = http.client.HTTPSConnection(self._host)
-        conn.request('POST', self._model_endpoint, json.dumps(completion_request), headers)
-        response = conn.getresponse()
+        # 공용 keep-alive 전송 계층으로 요청 (연결 재사용)
+        http_status, result = get_clova_transport(self._host).post_json(
+            self._model_endpoint, completion_request, headers)
         
         print(f"📡 CLOVA API 응답:")
-        print(f"   상태 코드: {response.status}")
-        print(f"   응답 헤더: {response.getheaders()}")
-        
-        result = json.loads(response.read().decode(encoding='utf-8'))
+        print(f"   상태 코드: {http_status}")
         print(f"   응답 내용: {result}")
         
-        conn.close()
         return result
 
     def execute(self, completion_request):
+        # 공유 Rate Limiter로 Chat API 요청 한도 관리
+        rate_limiter = get_rate_limiter("chat")
+        rate_limiter.acquire()
         res = self._send_request(completion_request)
+        if is_throttled_response(None, res.get('status', {}).get('code')):
+            rate_limiter.report_throttled()
         if res['status']['code'] == '20000':
+            rate_limiter.report_success()
             # 새로운 모델은 message.content 형식으로 응답
             if 'result' in res and 'message' in res['result'] and 'content' in res['result']['message']:
                 return res['result']['message']['content']
@@ -70,10 +74,10 @@ class CompletionExecutor:
             return 'Error'
 
 class VectorDB1Analyzer:
-    """vector_db_1 벡터 기반 분석기 (FAISS API 사용)"""
+    """vector_db_1 벡터 기반 분석기 (벡터 검색 라이브러리로 같은 프로세스 안에서 검색, API 서버 불필요)"""
     
     def __init__(self):
-        self.api_base_url = "http://localhost:8001"  # Vector DB1 FAISS API 서버
+        self.collection = "focus_stocks"  # vector_db_1 컬렉션 (같은 프로세스에서 벡터 검색 라이브러리로 검색)
         
         # 새로운 CLOVA API 설정
         self.api_key = os.getenv("NEW_CLOVA_API_KEY", "")
@@ -89,48 +93,40 @@ class VectorDB1Analyzer:
         )
         
         print("🔧 VectorDB1Analyzer 초기화 완료")
-        print(f"📡 FAISS API 서버: {self.api_base_url}")
+        print(f"📡 벡터 컬렉션: {self.collection}")
     
-    def check_faiss_api_server(self) -> bool:
-        """FAISS API 서버 상태 확인"""
+    def check_vector_search(self) -> bool:
+        """벡터 검색 준비 확인 (새 벡터 스냅샷이 있으면 교체)"""
         try:
-            response = requests.get(f"{self.api_base_url}/health", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"✅ FAISS API 서버 연결 성공")
-                print(f"   벡터 로드: {data.get('total_vectors', 0)}개")
-                print(f"   메타데이터: {data.get('total_metadata', 0)}개")
-                return True
-            else:
-                print(f"❌ FAISS API 서버 응답 오류: {response.status_code}")
-                return False
+            snapshot = get_vector_search().snapshot(self.collection)
         except Exception as e:
-            print(f"❌ FAISS API 서버 연결 실패: {e}")
+            print(f"❌ 벡터 검색 로드 실패: {e}")
             return False
+        print(f"✅ 벡터 검색 준비 완료 ({self.collection})")
+        print(f"   벡터 로드: {len(snapshot.vectors)}개")
+        print(f"   메타데이터: {snapshot.metadata_count}개")
+        return True
     
     def search_vectors(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
-        """FAISS API를 통한 벡터 검색"""
+        """벡터 검색 라이브러리로 같은 프로세스 안에서 검색"""
         try:
-            response = requests.post(
-                f"{self.api_base_url}/search",
-                json={"query": query, "top_k": top_k},
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('results', [])
-            else:
-                print(f"❌ 검색 요청 실패: {response.status_code}")
-                return []
-                
-        except requests.exceptions.Timeout:
-            print(f"❌ 검색 타임아웃 (60초)")
-            return []
+            return get_vector_search().search(query, top_k, collection=self.collection)
         except Exception as e:
             print(f"❌ 검색 중 오류: {e}")
             return []
     
+    def search_vectors_batch(self, queries: List[str], top_k: int = 10) -> List[List[Dict[str, Any]]]:
+        """여러 질문을 배치 검색 한 번으로 처리 (동시 임베딩 + FAISS 행렬 검색), 질문별 결과 목록"""
+        try:
+            batch = get_vector_search().search_batch(queries, top_k, collection=self.collection)
+        except Exception as e:
+            print(f"❌ 배치 검색 중 오류: {e}")
+            return [[] for _ in queries]
+        for entry in batch:
+            if entry.get("error"):
+                print(f"⚠️ 검색 실패 ({entry['query']}): {entry['error']}")
+        return [entry["results"] for entry in batch]
+    
     def analyze_vectors(self) -> str:
         """벡터 데이터를 분석하여 보고서 생성"""
         print("🔍 vector_db_1 벡터 데이터 분석 중...")
@@ -232,9 +228,18 @@ class VectorDB1Analyzer:
         # 검색 쿼리 설정 (추출된 종목명 포함)
         search_query = f"주목해야 할 종목 주가 동향 뉴스 이슈 {', '.join(extracted_stocks)}"
         
-        # FAISS 벡터 검색 수행
-        print(f"🔍 검색 쿼리: {search_query}")
-        search_results = self.search_vectors(search_query, top_k=15)  # 더 많은 결과 검색
+        # 통합 쿼리와 종목별 쿼리를 배치 검색 한 번으로 수행
+        stock_queries = [f"{stock} 주가 동향 뉴스 이슈" for stock in extracted_stocks]
+        print(f"🔍 검색 쿼리: {search_query} (+ 종목별 쿼리 {len(stock_queries)}개)")
+        combined_results, *stock_results = self.search_vectors_batch([search_query] + stock_queries, top_k=15)
+        
+        # 통합 쿼리 결과에 종목별 상위 결과를 추가 (중복 제외 - 일부 종목에 결과가 치우치지 않도록)
+        search_results = list(combined_results)
+        seen = {result['index'] for result in search_results}
+        for results in stock_results:
+            for result in [result for result in results if result['index'] not in seen][:3]:
+                seen.add(result['index'])
+                search_results.append(result)
         
         if not search_results:
             print("❌ 검색 결과가 없습니다.")
@@ -346,8 +351,8 @@ class VectorDB1Analyzer:
         print("🔍 Vector DB1 기반 오늘 이슈가 있을 것으로 예상되는 주목 종목 분석")
         print("=" * 60)
         
-        # 1. FAISS API 서버 상태 확인
-        if not self.check_faiss_api_server():
+        # 1. 벡터 검색 준비 확인
+        if not self.check_vector_search():
             return False
         
         # 2. 분석 실행 (추출된 종목명 전달)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+벡터 검색 라이브러리
+- 분석기는 같은 프로세스 안에서 직접 검색 (API 서버 실행, 헬스 체크 대기, localhost HTTP 요청 없음)
+- FastAPI 서버 (faiss_vector_api 등)는 이 라이브러리를 감싼 얇은 래퍼
+- 컬렉션별 스냅샷 (VectorCollections)과 임베딩 클라이언트 하나를 공유
+- 여러 질문은 search_batch 한 번으로 처리 (요청 한도 안에서 동시 임베딩, FAISS 행렬 검색 한 번)
+- 질문 임베딩은 메모리 LRU 캐시 (TTL)에 보관 - 매번 같은 질문은 임베딩 API 호출 없이 바로 검색
+- API 서버는 SearchExecutor로 검색을 이벤트 루프 밖 스레드 풀에서 실행 (동시 검색 수 제한, 요청별 제한 시간)
+
+사용 예:
+    from vector_search import get_vector_search
+    results = get_vector_search().search("삼성전자 주가", top_k=5, collection="focus_stocks")
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config import (get_query_embedding_cache_size, get_query_embedding_cache_ttl_seconds,
+                    get_search_max_concurrency, get_search_timeout_seconds)
+from embedding_backends import create_embedding_client
+from embedding_cache import QueryEmbeddingCache
+from vector_collections import VectorCollections
+from vector_snapshot import SearchSnapshot
+
+
+class VectorSearch:
+    """질문 텍스트 또는 쿼리 벡터로 컬렉션을 검색 (코사인 유사도, 점수가 높은 순)"""
+
+    def __init__(self, collections: Optional[VectorCollections] = None, embedding_client=None,
+                 query_cache: Optional[QueryEmbeddingCache] = None):
+        self.collections = collections or VectorCollections()
+        self._embedding_client = embedding_client
+        self._embedding_lock = threading.Lock()
+        if query_cache is None and get_query_embedding_cache_size() > 0:
+            query_cache = QueryEmbeddingCache(get_query_embedding_cache_size(), get_query_embedding_cache_ttl_seconds())
+        self.query_cache = query_cache
+
+    @property
+    def embedding_client(self):
+        """임베딩 클라이언트 (처음 쿼리를 임베딩할 때 생성)"""
+        if self._embedding_client is None:
+            with self._embedding_lock:
+                if self._embedding_client is None:
+                    self._embedding_client = create_embedding_client()
+        return self._embedding_client
+
+    def load(self) -> List[str]:
+        """모든 컬렉션의 current 스냅샷 로드, 로드된 컬렉션 이름 목록
+
+        아직 구축되지 않은 컬렉션은 벡터 구축이 스냅샷을 만든 뒤 refresh()에서 로드된다.
+        """
+        loaded = []
+        for name, result in self.collections.reload(force=True).items():
+            if result["reloaded"]:
+                loaded.append(name)
+                print(f"✅ {name}: 벡터 {result['total_vectors']}개 (스냅샷 {result['version']})")
+            else:
+                print(f"⚠️ {name}: 스냅샷 없음 또는 로드 실패")
+        return loaded
+
+    def refresh(self, collection: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """새 스냅샷 버전이 있는 컬렉션만 교체 (collection이 없으면 전체)"""
+        return self.collections.reload(collection)
+
+    def snapshot(self, collection: Optional[str] = None) -> SearchSnapshot:
+        """컬렉션의 현재 스냅샷 (없는 컬렉션이면 KeyError, 로드되지 않았으면 Exception)"""
+        snapshot = self.collections.current(collection)
+        if snapshot is None:
+            raise Exception(f"FAISS 인덱스가 구축되지 않았습니다. ({collection or self.collections.default})")
+        return snapshot
+
+    @contextmanager
+    def using(self, collection: Optional[str] = None) -> Iterator[SearchSnapshot]:
+        """검색 동안 컬렉션의 현재 스냅샷을 잡아 둠 (교체되어도 검색이 끝날 때까지 닫히지 않음)"""
+        with self.collections.use(collection) as snapshot:
+            if snapshot is None:
+                raise Exception(f"FAISS 인덱스가 구축되지 않았습니다. ({collection or self.collections.default})")
+            yield snapshot
+
+    def embed(self, query: str) -> List[float]:
+        """질문을 쿼리 벡터로 변환 (임베딩 실패 시 Exception)"""
+        vector, error = self.embed_many([query])[0]
+        if vector is None:
+            raise Exception(f"질문 임베딩 실패: {error}")
+        return vector
+
+    def embed_many(self, queries: List[str]) -> List[Tuple[Optional[List[float]], Optional[str]]]:
+        """여러 질문을 쿼리 벡터로 변환, 질문별 (벡터, 오류)
+
+        캐시에 없는 질문만 동시에 임베딩하고 (공유 Rate Limiter 적용) 성공한 결과를 캐시에 저장한다.
+        """
+        results: List[Tuple[Optional[List[float]], Optional[str]]] = [(None, None)] * len(queries)
+        missing: Dict[str, List[int]] = {}
+        for i, query in enumerate(queries):
+            cached = self.query_cache.get(query) if self.query_cache is not None else None
+            if cached is not None:
+                results[i] = (cached, None)
+            else:
+                missing.setdefault(query, []).append(i)
+
+        if missing:
+            texts = list(missing)
+            for text, (vector, error) in zip(texts, self.embedding_client.get_text_embeddings_or_errors(texts)):
+                if vector is not None and self.query_cache is not None:
+                    self.query_cache.put(text, vector)
+                for i in missing[text]:
+                    results[i] = (vector, error)
+        return results
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """질문 임베딩 메모리 캐시와 임베딩 클라이언트 영구 캐시 통계"""
+        client = self._embedding_client
+        return {
+            "query_cache": self.query_cache.get_stats() if self.query_cache is not None else None,
+            "persistent_cache": client.get_cache_stats() if client is not None else None
+        }
+
+    def search(self, query: str, top_k: int = 5, date_from: Optional[str] = None,
+               date_to: Optional[str] = None, collection: Optional[str] = None) -> List[Dict[str, Any]]:
+        """질문과 유사한 청크 검색 (date_from/date_to가 있으면 해당 거래일 샤드만 검색)"""
+        # 임베딩 전에 컬렉션을 확인해 없는 컬렉션이면 API 호출 없이 실패
+        self.snapshot(collection)
+        return self.search_vector(self.embed(query), top_k, date_from, date_to, collection)
+
+    def search_vector(self, query_vector, top_k: int = 5, date_from: Optional[str] = None,
+                      date_to: Optional[str] = None, collection: Optional[str] = None) -> List[Dict[str, Any]]:
+        """쿼리 벡터와 유사한 청크 검색"""
+        hits = self.search_hits([query_vector], top_k, date_from, date_to, collection)[0]
+        return [search_result(*hit) for hit in hits]
+
+    def search_batch(self, queries: List[str], top_k: int = 5, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None, collection: Optional[str] = None) -> List[Dict[str, Any]]:
+        """여러 질문을 한 번에 검색, 질문별 {"query", "results", "total_found"} (임베딩 실패 시 "error")
+
+        질문은 요청 한도 안에서 동시에 임베딩하고, 임베딩된 질문 전체를 FAISS 행렬 검색 한 번으로 처리한다.
+        """
+        self.snapshot(collection)
+        embedded = self.embed_many(queries) if queries else []
+        rows = [i for i, (vector, _) in enumerate(embedded) if vector is not None]
+        hits = self.search_hits([embedded[i][0] for i in rows], top_k, date_from, date_to,
+                                collection) if rows else []
+        hits_by_query = dict(zip(rows, hits))
+
+        batch = []
+        for i, query in enumerate(queries):
+            results = [search_result(*hit) for hit in hits_by_query.get(i, [])]
+            entry = {"query": query, "results": results, "total_found": len(results)}
+            if i not in hits_by_query:
+                entry["error"] = embedded[i][1] or "임베딩 실패"
+            batch.append(entry)
+        return batch
+
+    def search_hits(self, query_vectors, top_k: int = 5, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                    collection: Optional[str] = None) -> List[List[Tuple[float, int, Dict[str, Any]]]]:
+        """쿼리 벡터별 [(유사도, 벡터 id, 메타데이터)] (검색 도중 스냅샷이 교체되어도 같은 버전 사용)
+
+        미리 계산한 쿼리 벡터의 차원이 인덱스와 다르거나 top_k가 1 미만이면 ValueError.
+        """
+        if top_k <= 0:
+            raise ValueError(f"top_k는 1 이상이어야 합니다: {top_k}")
+        with self.using(collection) as snapshot:
+            queries = np.asarray(query_vectors, dtype=np.float32)
+            if queries.ndim != 2 or queries.shape[1] != snapshot.index.d:
+                raise ValueError(f"쿼리 벡터 차원이 인덱스와 다릅니다: {queries.shape[-1] if queries.ndim else 0} "
+                                 f"(인덱스 {snapshot.index.d}차원)")
+            return snapshot.search(queries, top_k, date_from=date_from, date_to=date_to)
+
+
+class SearchBusyError(Exception):
+    """동시 검색 수가 가득 차 제한 시간 안에 시작하지 못함"""
+    status_code = 503
+
+
+class SearchTimeoutError(Exception):
+    """검색이 제한 시간 안에 끝나지 않음"""
+    status_code = 504
+
+
+class SearchExecutor:
+    """API 서버용 검색 실행기 (블로킹 임베딩/FAISS 호출을 이벤트 루프 밖의 제한된 스레드 풀에서 실행)
+
+    동시에 실행하는 검색은 max_concurrency개까지이고, 나머지는 자리가 날 때까지 기다린다.
+    대기와 실행을 합쳐 timeout초가 지나면 요청은 실패하지만, 이미 시작한 작업은 끝날 때까지 자리를 차지한다
+    (스레드는 중단할 수 없으므로 실행 중인 검색 수가 max_concurrency를 넘지 않도록).
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_concurrency = max_concurrency or get_search_max_concurrency()
+        self.timeout = timeout if timeout is not None else get_search_timeout_seconds()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="vector-search")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stats = {"active": 0, "waiting": 0, "completed": 0, "busy": 0, "timeouts": 0}
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """fn(*args)를 스레드 풀에서 실행하고 결과 반환 (SearchBusyError / SearchTimeoutError)"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        self._stats["waiting"] += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._stats["busy"] += 1
+            raise SearchBusyError(f"동시 검색 {self.max_concurrency}개가 모두 처리 중입니다 ({self.timeout:.0f}초 대기)")
+        finally:
+            self._stats["waiting"] -= 1
+
+        self._stats["active"] += 1
+        future = loop.run_in_executor(self._pool, fn, *args)
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise SearchTimeoutError(f"검색 제한 시간 초과 ({self.timeout:.0f}초)")
+
+    def _release(self, _future):
+        self._stats["active"] -= 1
+        self._stats["completed"] += 1
+        self._slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats, max_concurrency=self.max_concurrency, timeout_seconds=self.timeout)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+def search_result(similarity: float, vector_id: int, meta: Dict[str, Any]) -> Dict[str, Any]:
+    """검색 결과 한 건 (API 응답과 분석기가 쓰는 형식)"""
+    return {
+        "index": vector_id,
+        "similarity": similarity,
+        "type": meta.get("type", "unknown"),
+        "filename": meta.get("filename", ""),
+        "title": meta.get("title", ""),
+        "text_content": meta["text_content"],
+        "text_length": meta.get("text_length", 0),
+        "created_at": meta.get("created_at", "")
+    }
+
+
+_shared: Optional[VectorSearch] = None
+_shared_lock = threading.Lock()
+
+
+def get_vector_search() -> VectorSearch:
+    """프로세스 공용 VectorSearch (처음 호출할 때 모든 컬렉션 로드, 이후에는 새 스냅샷 버전이 있으면 교체)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            print("🔍 벡터 검색 로드 중...")
+            _shared = VectorSearch()
+            _shared.load()
+        else:
+            _shared.refresh()
+        return _shared
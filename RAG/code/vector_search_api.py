@@ -1,31 +1,28 @@
 #!/usr/bin/env python3
 """
 벡터 검색 API 서버
-- FAISS를 사용한 벡터 검색
+- FAISS를 사용한 벡터 검색 (다른 검색 서버와 같은 벡터 검색 라이브러리, 코사인 유사도 인덱스)
 - FastAPI로 REST API 제공
 - CLOVA Studio에서 호출 가능
 """
 
-import os
 import sys
-import json
-import pickle
-import numpy as np
 from pathlib import Path
 from typing import List, Dict, Any
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
 
 # 현재 디렉토리를 Python 경로에 추가
 current_dir = Path(__file__).parent
 sys.path.append(str(current_dir))
 
-from clova_embedding import ClovaEmbeddingAPI
+from vector_collections import VectorCollections
+from vector_search import SearchBusyError, SearchExecutor, SearchTimeoutError, VectorSearch
 
 class SearchRequest(BaseModel):
     query: str
-    top_k: int = 5
+    top_k: int = Field(5, gt=0)  # 반환할 결과 수 (0 이하면 422)
 
 class SearchResponse(BaseModel):
     results: List[Dict[str, Any]]
@@ -35,10 +32,11 @@ class VectorSearchAPI:
     def __init__(self):
         self.app = FastAPI(title="Vector Search API", description="CLOVA Studio용 벡터 검색 API")
         self.vector_db_path = current_dir.parent / "vector_db_hybrid"
-        self.vectors = []
-        self.metadata = []
+        self.search = VectorSearch(VectorCollections(locations={"hybrid": (self.vector_db_path, "hybrid")}))
+        self.snapshots = self.search.collections.holder()
+        # 임베딩/FAISS 검색은 이벤트 루프 밖 스레드 풀에서 실행 (동시 검색 수 제한 + 요청별 제한 시간)
+        self.executor = SearchExecutor()
         self.embedding_client = None
-        self.faiss_index = None
         
         # API 엔드포인트 등록
         self.setup_routes()
@@ -54,46 +52,29 @@ class VectorSearchAPI:
         async def search_vectors(request: SearchRequest):
             """벡터 검색 API"""
             try:
-                results = self.search_similar_vectors(request.query, request.top_k)
+                results = await self.executor.run(self.search_similar_vectors, request.query, request.top_k)
                 return SearchResponse(results=results, total_found=len(results))
+            except (SearchBusyError, SearchTimeoutError) as e:
+                raise HTTPException(status_code=e.status_code, detail=str(e))
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
         
         @self.app.get("/health")
         async def health_check():
             """헬스 체크"""
-            return {"status": "healthy", "vectors_loaded": len(self.vectors)}
+            snapshot = self.snapshots.current
+            return {"status": "healthy", "vectors_loaded": len(snapshot.vectors) if snapshot else 0,
+                    "embedding_cache": self.search.cache_stats(), "search_executor": self.executor.get_stats()}
     
     def load_vectors(self):
-        """저장된 벡터와 메타데이터 로드"""
+        """저장된 벡터 스냅샷 로드 (벡터, 메타데이터, 코사인 유사도 FAISS 인덱스)"""
         print("🔍 벡터 데이터 로드 중...")
-        
-        # 벡터 파일 로드
-        vectors_file = self.vector_db_path / "hybrid_vectors.pkl"
-        if vectors_file.exists():
-            with open(vectors_file, 'rb') as f:
-                self.vectors = pickle.load(f)
-            print(f"✅ 벡터 로드 완료: {len(self.vectors)}개")
-        else:
-            print("❌ 벡터 파일을 찾을 수 없습니다!")
-            return False
-        
-        # 메타데이터 파일 로드
-        metadata_file = self.vector_db_path / "hybrid_metadata.json"
-        if metadata_file.exists():
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                self.metadata = json.load(f)
-            print(f"✅ 메타데이터 로드 완료: {len(self.metadata)}개")
-        else:
-            print("❌ 메타데이터 파일을 찾을 수 없습니다!")
-            return False
-        
-        return True
+        return self.snapshots.reload(force=True)["reloaded"]
     
     def initialize_embedding_client(self):
         """임베딩 클라이언트 초기화"""
         try:
-            self.embedding_client = ClovaEmbeddingAPI()
+            self.embedding_client = self.search.embedding_client
             print("✅ 임베딩 클라이언트 초기화 완료")
             return True
         except Exception as e:
@@ -102,51 +83,8 @@ class VectorSearchAPI:
     
     def search_similar_vectors(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """질문과 유사한 벡터 검색"""
-        if not self.embedding_client:
-            raise Exception("임베딩 클라이언트가 초기화되지 않았습니다.")
-        
-        # 질문을 벡터로 변환
-        query_vector = self.embedding_client.get_text_embedding(query)
-        
-        # 간단한 코사인 유사도 계산 (FAISS 없이)
-        similarities = []
-        for i, vector in enumerate(self.vectors):
-            similarity = self.cosine_similarity(query_vector, vector)
-            similarities.append((i, similarity))
-        
-        # 유사도 순으로 정렬
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        # 상위 k개 결과 반환
-        results = []
-        for idx, similarity in similarities[:top_k]:
-            meta = self.metadata[idx]
-            results.append({
-                "index": idx,
-                "similarity": float(similarity),
-                "type": meta.get("type", "unknown"),
-                "filename": meta.get("filename", ""),
-                "title": meta.get("title", ""),
-                "text_content": meta.get("text_content", ""),
-                "text_length": meta.get("text_length", 0),
-                "created_at": meta.get("created_at", "")
-            })
-        
-        return results
-    
-    def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """코사인 유사도 계산"""
-        vec1 = np.array(vec1)
-        vec2 = np.array(vec2)
-        
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        
-        return dot_product / (norm1 * norm2)
+        # 코사인 유사도 검색 (구축 시 정규화한 FAISS 인덱스 - 다른 검색 서버와 같은 점수)
+        return self.search.search(query, top_k)
     
     def run_server(self, host: str = "0.0.0.0", port: int = 8000):
         """API 서버 실행"""
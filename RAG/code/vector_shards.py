@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+거래일 기준 벡터 샤드
+- 벡터 행렬을 거래일 순으로 정렬해 저장하고, 같은 거래일의 연속 행 구간을 하나의 샤드로 관리
+  (<store>_shards.json 매니페스트 - 벡터를 샤드별로 중복 저장하지 않음)
+- 오래된 거래일 샤드는 월 단위 샤드로 병합 (compaction), 보존 기간이 지난 거래일은 삭제 (retention)
+- 날짜 범위 검색 시 해당 범위와 겹치는 샤드만 검색하고 결과를 병합
+
+사용법 (보존/병합 명령): python vector_shards.py [컬렉션 또는 저장소 이름] [보존일수] [병합기준일수]
+"""
+
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from vector_storage import index_files, load_or_build_index, search_parameters
+
+UNDATED_SHARD = "undated"
+
+
+def shard_sort_key(metadata: Dict[str, Any]) -> str:
+    """행 정렬 기준 (거래일, 없으면 가장 앞)"""
+    return metadata.get("trading_date") or ""
+
+
+def date_cutoff(latest: str, days: int) -> Optional[str]:
+    """가장 최근 거래일 기준 days일 전 날짜 (계산할 수 없으면 None)"""
+    if not latest or days <= 0:
+        return None
+    try:
+        return (date.fromisoformat(latest) - timedelta(days=days)).isoformat()
+    except ValueError:
+        return None
+
+
+def plan_shards(trading_dates: List[str], compact_after_days: int = 0) -> List[Dict[str, Any]]:
+    """거래일 순으로 정렬된 행들의 샤드 목록 (연속 행 구간)
+
+    가장 최근 거래일보다 compact_after_days일 이상 오래된 거래일은 월 단위 샤드(YYYY-MM)로 병합한다.
+    """
+    cutoff = date_cutoff(max(trading_dates, default=""), compact_after_days)
+
+    def key(trading_date: str) -> str:
+        if not trading_date:
+            return UNDATED_SHARD
+        if cutoff and trading_date < cutoff:
+            return trading_date[:7]
+        return trading_date
+
+    shards = []
+    for row, trading_date in enumerate(trading_dates):
+        shard_key = key(trading_date)
+        if shards and shards[-1]["key"] == shard_key:
+            shards[-1]["end"] = row + 1
+            shards[-1]["date_to"] = trading_date
+        else:
+            shards.append({"key": shard_key, "start": row, "end": row + 1,
+                           "date_from": trading_date, "date_to": trading_date})
+    return shards
+
+
+def manifest_path(vector_dir: Path, store_name: str) -> Path:
+    return Path(vector_dir) / f"{store_name}_shards.json"
+
+
+def write_manifest(path: Path, shards: List[Dict[str, Any]], compact_after_days: int):
+    """샤드 매니페스트를 원자적으로 저장"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "total_vectors": shards[-1]["end"] if shards else 0,
+            "compact_after_days": compact_after_days,
+            "updated_at": datetime.now().isoformat(),
+            "shards": shards
+        }, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path: Path, total_vectors: int) -> Optional[List[Dict[str, Any]]]:
+    """샤드 목록 로드 (없거나 벡터 수가 다르면 None - 샤드 없이 전체 검색)"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 샤드 매니페스트 로드 실패 ({path.name}): {e}")
+        return None
+    if manifest.get("total_vectors") != total_vectors:
+        print(f"⚠️ 샤드 매니페스트의 벡터 수가 달라 사용하지 않습니다 ({path.name})")
+        return None
+    return manifest["shards"]
+
+
+def remove_stale_shard_indexes(stem: Path, shards: List[Dict[str, Any]]) -> int:
+    """매니페스트에 없는 샤드의 저장된 인덱스 파일 삭제"""
+    stem = Path(stem)
+    keep = {path.name for shard in shards for path in index_files(stem, shard["key"])}
+    removed = 0
+    for path in stem.parent.glob(f"{stem.name}.shard-*.faiss*"):
+        if path.name not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+class ShardedIndex:
+    """날짜 샤드별 FAISS 인덱스 묶음 (FAISS 인덱스처럼 search / ntotal / d 제공, id는 전체 행 번호)"""
+
+    def __init__(self, stem: Path, fmt: str, metric: int,
+                 shards: Optional[List[Dict[str, Any]]] = None, metadata_store=None,
+                 spec: Optional[Dict[str, Any]] = None, normalize: bool = False):
+        self.metric = metric
+        self.normalize = normalize
+        self.metadata_store = metadata_store
+        # 매니페스트가 있으면 행이 거래일 순으로 정렬되어 있어 날짜 범위가 하나의 행 구간이 됨
+        self.sorted_by_date = shards is not None
+        self.shards: List[Tuple[Dict[str, Any], faiss.Index]] = []
+
+        if shards is None:
+            index = load_or_build_index(stem, fmt, metric=metric, spec=spec, normalize=normalize)
+            if index is not None:
+                self.shards.append(({"key": None, "start": 0, "end": index.ntotal,
+                                     "date_from": "", "date_to": ""}, index))
+            return
+
+        for shard in shards:
+            index = load_or_build_index(stem, fmt, metric=metric, rows=(shard["start"], shard["end"]),
+                                        shard=shard["key"], spec=spec, normalize=normalize)
+            if index is None or index.ntotal != shard["end"] - shard["start"]:
+                raise ValueError(f"샤드 인덱스 구축 실패: {shard['key']}")
+            self.shards.append((shard, index))
+
+    @property
+    def ntotal(self) -> int:
+        return sum(index.ntotal for _, index in self.shards)
+
+    @property
+    def d(self) -> int:
+        return self.shards[0][1].d if self.shards else 0
+
+    def shard_info(self) -> List[Dict[str, Any]]:
+        return [dict(shard, count=index.ntotal) for shard, index in self.shards]
+
+    def search(self, queries: np.ndarray, k: int, date_from: Optional[str] = None,
+               date_to: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """겹치는 샤드만 검색하고 결과 병합 (FAISS와 같이 부족한 자리는 id -1)"""
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if self.normalize:
+            # 인덱스는 구축 시 정규화되어 있으므로 쿼리만 정규화하면 내적 = 코사인 유사도
+            queries = queries.copy()
+            faiss.normalize_L2(queries)
+        targets = self._select_shards(date_from, date_to)
+
+        candidates = [[] for _ in range(len(queries))]
+        for shard, index, selector in targets:
+            params = search_parameters(index, selector) if selector is not None else None
+            distances, ids = index.search(queries, min(k, index.ntotal), params=params)
+            for row in range(len(queries)):
+                candidates[row].extend((float(distance), int(local_id) + shard["start"])
+                                       for distance, local_id in zip(distances[row], ids[row]) if local_id != -1)
+
+        largest_first = self.metric == faiss.METRIC_INNER_PRODUCT
+        result_distances = np.full((len(queries), k), -np.inf if largest_first else np.inf, dtype=np.float32)
+        result_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for row, found in enumerate(candidates):
+            found.sort(key=lambda item: item[0], reverse=largest_first)
+            for column, (distance, vector_id) in enumerate(found[:k]):
+                result_distances[row, column] = distance
+                result_ids[row, column] = vector_id
+        return result_distances, result_ids
+
+    def _select_shards(self, date_from: Optional[str], date_to: Optional[str]) -> List[tuple]:
+        """검색할 (샤드, 인덱스, id 선택자) 목록"""
+        if not date_from and not date_to:
+            return [(shard, index, None) for shard, index in self.shards]
+        if self.metadata_store is None:
+            raise ValueError("날짜 범위 검색에는 메타데이터 저장소가 필요합니다")
+
+        filters = {"trading_date_from": date_from, "trading_date_to": date_to}
+        if not self.sorted_by_date:
+            # 정렬 전 (샤드 매니페스트가 없는) 저장소: 해당 날짜 id만 골라서 전체 인덱스 검색
+            ids = np.array(self.metadata_store.vector_ids(**filters), dtype=np.int64)
+            return [(shard, index, faiss.IDSelectorBatch(ids))
+                    for shard, index in self.shards if len(ids)]
+
+        rows = self.metadata_store.id_range(**filters)
+        if rows is None:
+            return []
+        targets = []
+        for shard, index in self.shards:
+            low, high = max(rows[0], shard["start"]), min(rows[1], shard["end"])
+            if low >= high:
+                continue
+            if low == shard["start"] and high == shard["end"]:
+                targets.append((shard, index, None))
+            else:
+                # 월 단위로 병합된 샤드의 일부만 겹치면 해당 행 구간만 검색
+                targets.append((shard, index, faiss.IDSelectorRange(low - shard["start"], high - shard["start"])))
+        return targets
+
+
+if __name__ == "__main__":
+    # 보존 기간 적용 및 샤드 재병합 후 저장
+    from hybrid_vector_manager import HybridVectorManager
+    from vector_collections import resolve_collection
+
+    _, vector_dir, store_name = resolve_collection(sys.argv[1] if len(sys.argv) > 1 else "hybrid")
+    retention_days = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    compact_after_days = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    manager = HybridVectorManager(vector_dir=str(vector_dir), store_name=store_name)
+    result = manager.maintain_shards(retention_days=retention_days, compact_after_days=compact_after_days)
+    print(f"📊 샤드 정리 결과: {json.dumps(result, ensure_ascii=False)}")
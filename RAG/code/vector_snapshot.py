@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+벡터 스냅샷 (버전별 디렉토리 + current 포인터)
+- 벡터 구축 프로세스: 저장이 끝나면 서버가 읽는 파일을 <store>_snapshots/<버전>/ 에 모으고
+  <store>_current.json 포인터를 원자적으로 교체 (벡터/양자화/blob 파일은 하드 링크, 메타데이터 DB는 백업 복사)
+  - blob 파일은 구축 프로세스가 계속 이어 쓰므로 스냅샷 시점 길이를 <store>_text_lengths.json에 기록하고 그 길이까지만 읽음
+- API 서버: 포인터의 버전이 바뀌면 (주기적 확인 또는 /admin/reload) 새 스냅샷을 로드한 뒤 참조 한 번으로 교체
+  - 진행 중인 검색은 시작할 때 잡은 이전 스냅샷으로 끝까지 처리하므로 서버를 재시작하지 않고 요청도 실패하지 않음
+  - 이전 스냅샷의 메타데이터 DB와 blob mmap은 진행 중인 검색이 모두 끝나면 닫음
+- 포인터가 없는 (이전 방식) 저장소는 벡터 디렉토리를 직접 읽음
+- 검색 서버는 모두 같은 방식 (기본 코사인 - 구축 시 정규화한 내적 인덱스)으로 검색하므로 같은 쿼리의 점수와 순위가 같음
+"""
+
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config import get_vector_storage_format
+from metadata_store import open_metadata_store
+from text_store import TextBlobStore
+from vector_shards import ShardedIndex, load_manifest, manifest_path
+from vector_storage import METRICS, has_quantized, index_spec, load_vector_matrix
+
+
+def snapshot_root(vector_dir: Path, store_name: str) -> Path:
+    return Path(vector_dir) / f"{store_name}_snapshots"
+
+
+def pointer_path(vector_dir: Path, store_name: str) -> Path:
+    return Path(vector_dir) / f"{store_name}_current.json"
+
+
+def read_pointer(vector_dir: Path, store_name: str) -> Optional[Dict[str, Any]]:
+    """current 포인터 내용 (없거나 읽을 수 없으면 None)"""
+    path = pointer_path(vector_dir, store_name)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_directory(vector_dir: Path, store_name: str) -> Tuple[Optional[str], Path]:
+    """서버가 읽을 (버전, 디렉토리) - 포인터가 없으면 (None, 벡터 디렉토리)"""
+    pointer = read_pointer(vector_dir, store_name)
+    if pointer and (snapshot_root(vector_dir, store_name) / pointer["version"]).is_dir():
+        return pointer["version"], snapshot_root(vector_dir, store_name) / pointer["version"]
+    return None, Path(vector_dir)
+
+
+def _snapshot_sources(vector_dir: Path, store_name: str) -> List[Path]:
+    """스냅샷에 넣을 파일 (벡터 행렬, 양자화 파일, 샤드 매니페스트, 청크 텍스트 blob)"""
+    patterns = (f"{store_name}_vectors*.npy", f"{store_name}_shards.json", f"{store_name}_texts.*.blob")
+    return sorted(path for pattern in patterns for path in Path(vector_dir).glob(pattern))
+
+
+def text_lengths_path(directory: Path, store_name: str) -> Path:
+    return Path(directory) / f"{store_name}_text_lengths.json"
+
+
+def read_text_lengths(directory: Path, store_name: str) -> Optional[Dict[str, int]]:
+    """스냅샷 시점의 blob 파일별 길이 (길이를 기록하지 않은 이전 스냅샷이면 None)"""
+    path = text_lengths_path(directory, store_name)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _link_or_copy(source: Path, target: Path):
+    """하드 링크 (구축 프로세스는 blob 외의 파일을 덮어쓰지 않고 교체하므로 스냅샷 내용이 바뀌지 않음), 안 되면 복사"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def publish_snapshot(vector_dir: Path, store_name: str, metadata_store, total_vectors: int,
+                     keep: int = 3) -> str:
+    """현재 벡터 디렉토리 내용으로 새 스냅샷을 만들고 current 포인터를 교체 (새 버전 반환)"""
+    vector_dir = Path(vector_dir)
+    root = snapshot_root(vector_dir, store_name)
+    root.mkdir(parents=True, exist_ok=True)
+    previous_version, previous_dir = snapshot_directory(vector_dir, store_name)
+
+    version = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    tmp_dir = root / f"{version}.{os.getpid()}.tmp"
+    tmp_dir.mkdir()
+    text_lengths = {}
+    for source in _snapshot_sources(vector_dir, store_name):
+        _link_or_copy(source, tmp_dir / source.name)
+        if source.suffix == ".blob":
+            # 하드 링크한 blob은 이후 구축에서 이어 쓰이므로 지금 길이까지만 이 스냅샷의 내용
+            text_lengths[source.name] = (tmp_dir / source.name).stat().st_size
+    with open(text_lengths_path(tmp_dir, store_name), 'w', encoding='utf-8') as f:
+        json.dump(text_lengths, f, ensure_ascii=False, indent=2)
+    metadata_store.backup(tmp_dir / f"{store_name}_metadata.db")
+
+    # 이전 스냅샷의 저장된 FAISS 인덱스도 가져옴 (내용 해시가 같은 샤드만 그대로 쓰이고 나머지는 다시 구축)
+    if previous_version is not None:
+        for source in previous_dir.glob(f"{store_name}_vectors*.faiss*"):
+            _link_or_copy(source, tmp_dir / source.name)
+
+    os.rename(tmp_dir, root / version)
+
+    path = pointer_path(vector_dir, store_name)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "version": version,
+            "previous_version": previous_version,
+            "total_vectors": total_vectors,
+            "created_at": datetime.now().isoformat()
+        }, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    remove_old_snapshots(vector_dir, store_name, keep)
+    return version
+
+
+def remove_old_snapshots(vector_dir: Path, store_name: str, keep: int) -> int:
+    """최근 keep개 버전만 남기고 삭제 (이전 버전을 열어 둔 서버는 파일이 삭제되어도 mmap으로 계속 읽음)"""
+    root = snapshot_root(vector_dir, store_name)
+    if not root.exists():
+        return 0
+    current, _ = snapshot_directory(vector_dir, store_name)
+    versions = sorted(path for path in root.iterdir() if path.is_dir() and not path.name.endswith(".tmp"))
+    removed = 0
+    for path in versions[:-keep] if keep > 0 else versions:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class SearchSnapshot:
+    """API 서버가 검색에 쓰는 한 버전의 벡터, 메타데이터, 청크 텍스트, FAISS 인덱스 묶음"""
+
+    def __init__(self, version: Optional[str], directory: Path, vectors, metadata_store,
+                 text_store: TextBlobStore, index: ShardedIndex, storage_format: str, index_type: str = "flat",
+                 metric: str = "cosine"):
+        self.version = version
+        self.directory = directory
+        self.vectors = vectors
+        self.metadata_store = metadata_store
+        self.metadata_count = metadata_store.count()
+        self.text_store = text_store
+        self.index = index
+        self.storage_format = storage_format
+        self.index_type = index_type
+        self.metric = metric
+        self.loaded_at = datetime.now().isoformat()
+        # 진행 중인 검색 수 (교체된 스냅샷은 마지막 검색이 끝나면 닫음)
+        self._users = 0
+        self._retired = False
+        self.closed = False
+        self._users_lock = threading.Lock()
+
+    def acquire(self):
+        with self._users_lock:
+            self._users += 1
+
+    def release(self):
+        with self._users_lock:
+            self._users -= 1
+            close = self._retired and self._users == 0
+        if close:
+            self.close()
+
+    def retire(self):
+        """교체된 스냅샷 표시 - 진행 중인 검색이 없으면 바로, 있으면 마지막 검색이 끝날 때 닫음"""
+        with self._users_lock:
+            self._retired = True
+            close = self._users == 0
+        if close:
+            self.close()
+
+    def close(self):
+        """메타데이터 DB 연결과 blob mmap 해제"""
+        with self._users_lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.metadata_store.close()
+        self.text_store.close()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "directory": str(self.directory),
+            "total_vectors": len(self.vectors),
+            "total_metadata": self.metadata_count,
+            "storage_format": self.storage_format,
+            "index_type": self.index_type,
+            "metric": self.metric,
+            "shards": len(self.index.shards),
+            "loaded_at": self.loaded_at
+        }
+
+    def search(self, query_vectors, top_k: int, date_from: Optional[str] = None,
+               date_to: Optional[str] = None) -> List[List[Tuple[float, int, Dict[str, Any]]]]:
+        """쿼리 벡터별 [(점수, 벡터 id, text_content를 채운 메타데이터)] (점수가 높은 순, 코사인이면 유사도)
+
+        FAISS 검색 한 번과 메타데이터 일괄 조회 한 번으로 처리한다 (텍스트는 반환하는 청크만 mmap으로 읽음).
+        """
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.index.d)
+        scores, ids = self.index.search(queries, top_k, date_from=date_from, date_to=date_to)
+        metas = iter(self.metadata_store.get_many([int(i) for row in ids for i in row if i != -1]))
+
+        results = []
+        for row_scores, row_ids in zip(scores, ids):
+            hits = []
+            for score, vector_id in zip(row_scores, row_ids):
+                if vector_id == -1:
+                    continue
+                meta = next(metas)
+                if meta is not None:
+                    hits.append((float(score), int(vector_id), self.text_store.with_text(meta)))
+            results.append(hits)
+        return results
+
+
+def load_search_snapshot(vector_dir: Path, store_name: str, metric: str = "cosine") -> Optional[SearchSnapshot]:
+    """current 포인터가 가리키는 스냅샷 로드 (벡터/메타데이터가 없거나 인덱스를 만들 수 없으면 None)
+
+    metric: "cosine" (기본), "inner_product", "l2" - 인덱스 정보 파일에 함께 기록된다.
+    """
+    version, directory = snapshot_directory(vector_dir, store_name)
+    faiss_metric, normalize = METRICS[metric]
+
+    # 벡터 로드 (연속 float32 행렬을 mmap으로 열어 복사 없이 사용)
+    vectors = load_vector_matrix(directory / f"{store_name}_vectors.npy")
+    if vectors is None or len(vectors) == 0:
+        print(f"❌ 벡터 파일을 찾을 수 없습니다: {directory}")
+        return None
+
+    # 메타데이터 저장소 열기 (전체를 메모리에 올리지 않고 검색 결과 id만 조회)
+    metadata_store = open_metadata_store(directory, store_name)
+    metadata_count = metadata_store.count()
+    if metadata_count == 0:
+        print(f"❌ 메타데이터를 찾을 수 없습니다: {directory}")
+        return None
+
+    # 양자화 저장 형식이 설정되어 있으면 해당 파일로 스칼라 양자화 인덱스 구축
+    storage_format = get_vector_storage_format()
+    stem = directory / f"{store_name}_vectors"
+    if storage_format != "float32" and not has_quantized(stem, storage_format):
+        storage_format = "float32"
+
+    # 거래일 샤드별 인덱스 (저장된 인덱스가 현재 벡터 파일과 같으면 mmap으로 로드, 아니면 구축 후 저장)
+    # 인덱스 종류 (VECTOR_INDEX_TYPE - flat / ivf_flat / ivf_pq / hnsw)
+    shards = load_manifest(manifest_path(directory, store_name), len(vectors))
+    spec = index_spec()
+    try:
+        index = ShardedIndex(stem, storage_format, faiss_metric, shards=shards, metadata_store=metadata_store,
+                             spec=spec, normalize=normalize)
+    except ValueError as e:
+        print(f"⚠️ {e}")
+        index = None
+    if storage_format != "float32" and (index is None or index.ntotal != metadata_count):
+        print(f"⚠️ {storage_format} 파일의 벡터 수가 메타데이터와 달라 float32로 구축합니다.")
+        storage_format = "float32"
+        index = ShardedIndex(stem, storage_format, faiss_metric, shards=shards, metadata_store=metadata_store,
+                             spec=spec, normalize=normalize)
+    if index.ntotal == 0:
+        print("❌ FAISS 인덱스를 구축할 벡터 파일이 없습니다!")
+        return None
+
+    print(f"✅ 벡터 스냅샷 로드 완료 ({version or '버전 없음'}): {len(vectors)}개 벡터, "
+          f"메타데이터 {metadata_count}개, {storage_format}/{spec['type']}/{metric}, {len(index.shards)}개 샤드")
+    text_store = TextBlobStore(directory, store_name, lengths=read_text_lengths(directory, store_name))
+    return SearchSnapshot(version, directory, vectors, metadata_store, text_store,
+                          index, storage_format, spec["type"], metric)
+
+
+class SnapshotHolder:
+    """서버의 현재 SearchSnapshot 참조 관리
+
+    검색은 요청마다 use()로 current를 한 번 잡아 그 묶음만 사용하고, 교체는 새 스냅샷을 다 로드한 뒤 참조 대입 한 번으로 한다.
+    이전 스냅샷의 메타데이터 DB와 blob mmap은 use()로 잡은 진행 중인 검색이 모두 끝나면 닫는다.
+    """
+
+    def __init__(self, vector_dir: Path, store_name: str, metric: str = "cosine"):
+        self.vector_dir = Path(vector_dir)
+        self.store_name = store_name
+        self.metric = metric
+        self.current: Optional[SearchSnapshot] = None
+        self._lock = threading.Lock()
+        # current 교체와 use()의 사용 등록을 묶는 잠금 (로드 중에도 검색이 막히지 않도록 _lock과 분리)
+        self._swap_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """포인터의 버전이 현재와 다르면 (force면 항상) 새 스냅샷으로 교체 (동시에 하나의 로드만 실행)"""
+        with self._lock:
+            version, _ = snapshot_directory(self.vector_dir, self.store_name)
+            previous = self.current
+            if previous is not None and not force and previous.version == version:
+                return {"reloaded": False, "version": version}
+
+            snapshot = load_search_snapshot(self.vector_dir, self.store_name, self.metric)
+            if snapshot is None:
+                return {"reloaded": False, "version": previous.version if previous else None,
+                        "error": "스냅샷 로드 실패 (이전 스냅샷 유지)"}
+            with self._swap_lock:
+                self.current = snapshot
+
+        if previous is not None:
+            previous.retire()
+            print(f"♻️ 벡터 스냅샷 교체: {previous.version} → {snapshot.version}")
+        return {"reloaded": True, "version": snapshot.version,
+                "previous_version": previous.version if previous else None,
+                "total_vectors": snapshot.index.ntotal}
+
+    @contextmanager
+    def use(self) -> Iterator[Optional[SearchSnapshot]]:
+        """검색 동안 현재 스냅샷을 잡아 둠 (그 사이 교체되어도 검색이 끝날 때까지 닫히지 않음, 로드 전이면 None)"""
+        with self._swap_lock:
+            snapshot = self.current
+            if snapshot is not None:
+                snapshot.acquire()
+        try:
+            yield snapshot
+        finally:
+            if snapshot is not None:
+                snapshot.release()
+
+    def watch(self, interval: float):
+        """interval초마다 포인터를 확인해 새 버전이면 교체하는 데몬 스레드 시작 (0 이하면 시작하지 않음)"""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def run():
+            failed_version = None
+            while not self._stop.wait(interval):
+                current = self.current
+                version = (read_pointer(self.vector_dir, self.store_name) or {}).get("version")
+                if not version or version == failed_version or (current is not None and version == current.version):
+                    continue
+                try:
+                    result = self.reload()
+                except Exception as e:
+                    result = {"error": str(e)}
+                if result.get("error"):
+                    # 같은 버전은 다시 시도하지 않음 (/admin/reload로 직접 다시 시도 가능)
+                    print(f"⚠️ 벡터 스냅샷 교체 실패 ({version}, 이전 스냅샷 유지): {result['error']}")
+                    failed_version = version
+
+        self._watcher = threading.Thread(target=run, name=f"{self.store_name}-snapshot-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+벡터 저장 형식 (float32 / float16 / int8)
+- float32: 연속 행렬 .npy 파일 (np.load(mmap_mode='r')로 복사 없이 열어 FAISS에 바로 전달)
+- float16: 차원당 2바이트, FAISS fp16 스칼라 양자화 인덱스에 코드 그대로 적재
+- int8: L2 정규화한 벡터를 FAISS QT_8bit 방식 (차원별 최솟값/범위)으로 양자화, 차원당 1바이트
+        코드를 FAISS 8bit 스칼라 양자화 인덱스에 그대로 적재 (코사인 검색 전용)
+- 구축한 FAISS 인덱스를 내용 해시와 함께 저장, 해시가 같으면 IO_FLAG_MMAP으로 바로 로드
+- float32 대비 검색 재현율 비교 도구
+- 인덱스 종류 선택 (flat / ivf_flat / ivf_pq / hnsw, VECTOR_INDEX_TYPE) - 저장 형식과 조합해 구축
+- 코사인 검색: 구축 시 한 번 L2 정규화한 벡터로 내적 인덱스 구축 (검색 서버는 쿼리만 정규화)
+
+파일 이름 규칙 (<stem> = 예: vector_db/hybrid_vectors)
+- float32: <stem>.npy (이전 버전의 <stem>.pkl 도 읽기 지원)
+- float16: <stem>.f16.npy
+- int8:    <stem>.int8.npy (uint8 코드), <stem>.int8_scale.npy (차원별 최솟값/범위, 2 x 차원)
+- 인덱스:  <stem>.faiss, <stem>.faiss.json (원본 파일 내용 해시, 형식, 거리 방식)
+- 샤드 인덱스: <stem>.shard-<키>.faiss, <stem>.shard-<키>.faiss.json (행 구간 내용 해시)
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from config import (
+    get_vector_index_type, get_vector_index_nlist, get_vector_index_nprobe, get_vector_index_pq_m,
+    get_vector_index_pq_bits, get_vector_index_hnsw_m, get_vector_index_ef_construction,
+    get_vector_index_ef_search
+)
+
+STORAGE_FORMATS = ("float32", "float16", "int8")
+
+# 검색 거리 방식 → (FAISS metric, 구축 시 L2 정규화 여부)
+METRICS = {
+    "cosine": (faiss.METRIC_INNER_PRODUCT, True),
+    "inner_product": (faiss.METRIC_INNER_PRODUCT, False),
+    "l2": (faiss.METRIC_L2, False),
+}
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# 이보다 벡터가 적은 인덱스 (작은 날짜 샤드 등)는 학습 없이 flat으로 구축 (정확 검색이 충분히 빠름)
+ANN_MIN_ROWS = 1000
+
+# IVF 학습에 쓸 최대 행 수
+_TRAIN_ROWS = 65536
+
+# 복원한 벡터를 FAISS에 추가할 때 한 번에 처리할 행 수 (메모리 사용량 제한)
+_ADD_BLOCK_ROWS = 65536
+
+# 내용 해시 계산 시 한 번에 읽을 크기
+_HASH_BLOCK_BYTES = 1 << 20
+
+
+def _save_array(path: Path, array: np.ndarray):
+    """배열을 .npy 파일로 원자적으로 저장 (같은 파일을 덮어쓰지 않아 스냅샷 하드 링크나 mmap 사용 중인 파일이 바뀌지 않음)"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.save(f, np.ascontiguousarray(array))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_vector_matrix(path: Path, vectors) -> np.ndarray:
+    """벡터 목록을 연속 float32 행렬 .npy 파일로 원자적으로 저장"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2:
+        matrix = matrix.reshape(len(matrix), -1) if len(matrix) else np.zeros((0, 0), dtype=np.float32)
+    _save_array(path, matrix)
+    return matrix
+
+
+def load_vector_matrix(path: Path, mmap: bool = True) -> Optional[np.ndarray]:
+    """float32 벡터 행렬 로드 (.npy는 mmap, 없으면 이전 형식 .pkl을 변환해서 로드, 둘 다 없으면 None)"""
+    path = Path(path)
+    if path.exists():
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    legacy_path = path.with_suffix(".pkl")
+    if legacy_path.exists():
+        print(f"ℹ️ 이전 형식 벡터 파일 사용: {legacy_path.name} (다음 저장 시 {path.name}로 변환)")
+        with open(legacy_path, 'rb') as f:
+            vectors = pickle.load(f)
+        matrix = np.asarray(vectors, dtype=np.float32)
+        return matrix.reshape(len(matrix), -1) if len(matrix) else np.zeros((0, 0), dtype=np.float32)
+    return None
+
+
+def quantized_files(stem: Path, fmt: str) -> List[Path]:
+    """형식별 양자화 파일 경로 목록 (float32는 별도 파일 없음)"""
+    stem = Path(stem)
+    if fmt == "float16":
+        return [stem.with_name(stem.name + ".f16.npy")]
+    if fmt == "int8":
+        return [stem.with_name(stem.name + ".int8.npy"), stem.with_name(stem.name + ".int8_scale.npy")]
+    return []
+
+
+def _int8_quantizer(params: np.ndarray) -> faiss.ScalarQuantizer:
+    """저장된 차원별 최솟값/범위로 학습 상태를 채운 FAISS QT_8bit 양자화기"""
+    params = np.ascontiguousarray(params, dtype=np.float32)
+    quantizer = faiss.ScalarQuantizer(params.shape[1], faiss.ScalarQuantizer.QT_8bit)
+    faiss.copy_array_to_vector(params.reshape(-1), quantizer.trained)
+    return quantizer
+
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """코사인 검색용 int8 양자화 - (uint8 코드, 차원별 [최솟값; 범위] 2 x d)
+
+    L2 정규화한 벡터를 FAISS QT_8bit와 같은 방식으로 인코딩하므로
+    코드를 IndexScalarQuantizer에 재양자화 없이 그대로 복사할 수 있다.
+    """
+    matrix = np.array(matrix, dtype=np.float32)
+    matrix = matrix.reshape(len(matrix), -1)
+    faiss.normalize_L2(matrix)
+    if not len(matrix):
+        return np.zeros(matrix.shape, dtype=np.uint8), np.zeros((2, matrix.shape[1]), dtype=np.float32)
+
+    vmin = matrix.min(axis=0)
+    vdiff = matrix.max(axis=0) - vmin
+    # 모든 벡터에서 값이 같은 차원은 0으로 나누지 않도록 범위 1 사용
+    vdiff[vdiff == 0] = 1.0
+    params = np.stack([vmin, vdiff]).astype(np.float32)
+    return _int8_quantizer(params).compute_codes(matrix), params
+
+
+def dequantize_int8(codes: np.ndarray, params: np.ndarray) -> np.ndarray:
+    """int8 코드를 float32로 복원 (FAISS QT_8bit 디코딩과 같은 계산)"""
+    return params[0] + (codes.astype(np.float32) + 0.5) / 255.0 * params[1]
+
+
+def save_quantized(stem: Path, matrix: np.ndarray, fmt: str):
+    """양자화 파일 저장 (다른 형식의 이전 파일은 삭제해 오래된 파일이 읽히지 않도록 함)"""
+    if fmt not in STORAGE_FORMATS:
+        raise ValueError(f"지원하지 않는 저장 형식: {fmt} ({', '.join(STORAGE_FORMATS)} 중 선택)")
+
+    for other in STORAGE_FORMATS:
+        if other != fmt:
+            for path in quantized_files(stem, other):
+                if path.exists():
+                    path.unlink()
+
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if fmt == "float16":
+        _save_array(quantized_files(stem, fmt)[0], matrix.astype(np.float16))
+    elif fmt == "int8":
+        codes, params = quantize_int8(matrix)
+        codes_path, params_path = quantized_files(stem, fmt)
+        _save_array(codes_path, codes)
+        _save_array(params_path, params)
+
+
+def has_quantized(stem: Path, fmt: str) -> bool:
+    """양자화 파일이 모두 있는지 확인"""
+    files = quantized_files(stem, fmt)
+    return bool(files) and all(path.exists() for path in files)
+
+
+def load_quantized(stem: Path, fmt: str, mmap: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """양자화 파일 로드 - (코드 행렬, int8 차원별 최솟값/범위 또는 None)"""
+    mmap_mode = 'r' if mmap else None
+    files = quantized_files(stem, fmt)
+    if fmt == "float16":
+        return np.load(files[0], mmap_mode=mmap_mode), None
+    if fmt == "int8":
+        return np.load(files[0], mmap_mode=mmap_mode), np.load(files[1], mmap_mode=mmap_mode)
+    raise ValueError(f"양자화 파일이 없는 형식: {fmt}")
+
+
+def index_spec(index_type: Optional[str] = None, **overrides) -> Dict[str, Any]:
+    """인덱스 종류와 파라미터 (지정하지 않은 값은 환경 변수 설정)"""
+    spec = {
+        "type": index_type or get_vector_index_type(),
+        "nlist": get_vector_index_nlist(),
+        "nprobe": get_vector_index_nprobe(),
+        "pq_m": get_vector_index_pq_m(),
+        "pq_bits": get_vector_index_pq_bits(),
+        "hnsw_m": get_vector_index_hnsw_m(),
+        "ef_construction": get_vector_index_ef_construction(),
+        "ef_search": get_vector_index_ef_search()
+    }
+    spec.update(overrides)
+    if spec["type"] not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 종류: {spec['type']} ({', '.join(INDEX_TYPES)} 중 선택)")
+    return spec
+
+
+def build_params(spec: Optional[Dict[str, Any]], n: int, dimension: int) -> Dict[str, Any]:
+    """n개 벡터로 실제 구축할 인덱스의 구조 파라미터 (검색 시점 파라미터 nprobe/ef_search는 제외)
+
+    벡터가 ANN_MIN_ROWS보다 적거나 flat이면 빈 dict (flat).
+    """
+    if not spec or spec["type"] == "flat" or n < ANN_MIN_ROWS:
+        return {}
+    if spec["type"] == "hnsw":
+        return {"type": "hnsw", "hnsw_m": spec["hnsw_m"], "ef_construction": spec["ef_construction"]}
+
+    # 클러스터당 학습 벡터가 39개 이상 되도록 클러스터 수 제한 (FAISS 권장)
+    nlist = spec["nlist"] or int(4 * np.sqrt(n))
+    params = {"type": spec["type"], "nlist": max(1, min(nlist, n // 39))}
+    if spec["type"] == "ivf_pq":
+        pq_m = max(1, min(spec["pq_m"], dimension))
+        while dimension % pq_m:
+            pq_m -= 1
+        params.update(pq_m=pq_m, pq_bits=spec["pq_bits"])
+    return params
+
+
+def configure_search(index: faiss.Index, spec: Optional[Dict[str, Any]]):
+    """검색 시점 파라미터 적용 (IVF nprobe, HNSW efSearch - 인덱스를 다시 구축하지 않고 바꿀 수 있음)"""
+    if not spec:
+        return
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(spec["nprobe"], ivf.nlist)
+    elif hasattr(index, "hnsw"):
+        index.hnsw.efSearch = spec["ef_search"]
+
+
+def search_parameters(index: faiss.Index, selector=None) -> faiss.SearchParameters:
+    """인덱스 종류에 맞는 검색 파라미터 (IVF 인덱스는 SearchParametersIVF만 받음)"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    if hasattr(index, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def metric_name(metric: int, normalize: bool = False) -> str:
+    return "cosine" if normalize else ("inner_product" if metric == faiss.METRIC_INNER_PRODUCT else "l2")
+
+
+def _float_rows(codes: np.ndarray, fmt: str, scales: Optional[np.ndarray], rows,
+                normalize: bool = False) -> np.ndarray:
+    """저장 형식의 행들을 float32로 복원 (normalize면 행별 L2 정규화한 사본)"""
+    if fmt == "int8":
+        block = dequantize_int8(codes[rows], scales)
+    else:
+        block = np.ascontiguousarray(codes[rows], dtype=np.float32)
+    if normalize:
+        # 원본이 읽기 전용 mmap일 수 있어 복사한 뒤 정규화
+        block = np.array(block, dtype=np.float32)
+        faiss.normalize_L2(block)
+    return block
+
+
+def _build_ann_index(codes: np.ndarray, fmt: str, scales: Optional[np.ndarray], metric: int,
+                     params: Dict[str, Any], normalize: bool = False) -> faiss.Index:
+    """근사 검색 인덱스 (IVF-Flat / IVF-PQ / HNSW) 생성
+
+    IVF-Flat과 HNSW는 float16/int8 형식이면 같은 크기의 스칼라 양자화 코드로 저장한다.
+    그래프/클러스터 구성에 float 벡터가 필요하므로 저장된 코드를 블록 단위로 복원해 학습/추가한다.
+    """
+    n, dimension = codes.shape
+    qtype = {"float16": faiss.ScalarQuantizer.QT_fp16, "int8": faiss.ScalarQuantizer.QT_8bit}.get(fmt)
+    if params["type"] == "hnsw":
+        if qtype is None:
+            index = faiss.IndexHNSWFlat(dimension, params["hnsw_m"], metric)
+        else:
+            index = faiss.IndexHNSWSQ(dimension, qtype, params["hnsw_m"], metric)
+        index.hnsw.efConstruction = params["ef_construction"]
+    else:
+        quantizer = faiss.IndexFlat(dimension, metric)
+        if params["type"] == "ivf_pq":
+            index = faiss.IndexIVFPQ(quantizer, dimension, params["nlist"], params["pq_m"], params["pq_bits"], metric)
+        elif qtype is None:
+            index = faiss.IndexIVFFlat(quantizer, dimension, params["nlist"], metric)
+        else:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dimension, params["nlist"], qtype, metric)
+
+    if not index.is_trained:
+        sample = np.linspace(0, n - 1, min(n, _TRAIN_ROWS)).astype(np.int64)
+        index.train(_float_rows(codes, fmt, scales, sample, normalize))
+    for start in range(0, n, _ADD_BLOCK_ROWS):
+        index.add(_float_rows(codes, fmt, scales, slice(start, start + _ADD_BLOCK_ROWS), normalize))
+    return index
+
+
+def build_index(codes: np.ndarray, fmt: str, scales: Optional[np.ndarray] = None,
+                metric: int = faiss.METRIC_INNER_PRODUCT, spec: Optional[Dict[str, Any]] = None,
+                normalize: bool = False) -> faiss.Index:
+    """저장 형식과 인덱스 종류에 맞는 FAISS 인덱스 생성
+
+    - float32: IndexFlat
+    - float16: IndexScalarQuantizer(QT_fp16) - fp16 코드를 인덱스 코드 배열에 그대로 복사
+    - int8:    IndexScalarQuantizer(QT_8bit) - 저장된 최솟값/범위와 코드를 인덱스에 그대로 복사
+               (정규화한 벡터의 코드라 normalize=True, 즉 코사인 검색에서만 사용 가능)
+    - spec으로 ivf_flat / ivf_pq / hnsw를 지정하면 근사 검색 인덱스 (벡터가 ANN_MIN_ROWS보다 적으면 위의 flat)
+    - normalize면 블록 단위로 L2 정규화해서 추가 (METRIC_INNER_PRODUCT와 함께 쓰면 코사인 유사도)
+    """
+    n, dimension = codes.shape
+    if fmt == "int8":
+        if scales is None or scales.shape != (2, dimension):
+            raise ValueError("int8 최솟값/범위 파일 형식이 맞지 않습니다 (벡터를 다시 저장해야 합니다)")
+        if not normalize:
+            raise ValueError("int8 형식은 정규화한 벡터를 저장하므로 코사인 검색에서만 사용할 수 있습니다")
+    params = build_params(spec, n, dimension)
+    if params:
+        index = _build_ann_index(codes, fmt, scales, metric, params, normalize)
+        configure_search(index, spec)
+        return index
+
+    if fmt == "int8":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, metric)
+        faiss.copy_array_to_vector(np.ascontiguousarray(scales, dtype=np.float32).reshape(-1), index.sq.trained)
+        index.is_trained = True
+        faiss.copy_array_to_vector(np.ascontiguousarray(codes, dtype=np.uint8).reshape(-1), index.codes)
+        index.ntotal = n
+        return index
+
+    if normalize:
+        if fmt == "float32":
+            index = faiss.IndexFlat(dimension, metric)
+        else:
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, metric)
+        if not index.is_trained:
+            sample = np.linspace(0, n - 1, min(n, _ADD_BLOCK_ROWS)).astype(np.int64)
+            index.train(_float_rows(codes, fmt, scales, sample, normalize))
+        for start in range(0, n, _ADD_BLOCK_ROWS):
+            index.add(_float_rows(codes, fmt, scales, slice(start, start + _ADD_BLOCK_ROWS), normalize))
+        return index
+
+    if fmt == "float32":
+        index = faiss.IndexFlat(dimension, metric)
+        index.add(np.ascontiguousarray(codes, dtype=np.float32))
+        return index
+
+    if fmt == "float16":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, metric)
+        raw = np.ascontiguousarray(codes, dtype=np.float16).view(np.uint8).reshape(-1)
+        faiss.copy_array_to_vector(raw, index.codes)
+        index.ntotal = n
+        return index
+
+    raise ValueError(f"지원하지 않는 저장 형식: {fmt}")
+
+
+def index_files(stem: Path, shard: Optional[str] = None) -> Tuple[Path, Path]:
+    """저장된 FAISS 인덱스 파일과 해시 정보 파일 경로 (shard가 있으면 <stem>.shard-<shard>.faiss)"""
+    stem = Path(stem)
+    name = stem.name if shard is None else f"{stem.name}.shard-{shard}"
+    return stem.with_name(name + ".faiss"), stem.with_name(name + ".faiss.json")
+
+
+def source_files(stem: Path, fmt: str) -> List[Path]:
+    """형식별 인덱스 구축 원본 파일 목록"""
+    stem = Path(stem)
+    return quantized_files(stem, fmt) if fmt != "float32" else [stem.with_name(stem.name + ".npy")]
+
+
+def content_hash(parts: List[Any], **params) -> str:
+    """원본 파일 (또는 배열) 내용과 구축 설정으로 만든 해시 (하나라도 바뀌면 인덱스를 다시 구축)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for key in sorted(params):
+        digest.update(f"{key}={params[key]};".encode())
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            # mmap 행렬의 연속 구간은 복사 없이 그대로 해시
+            digest.update(memoryview(np.ascontiguousarray(part)).cast('B'))
+            continue
+        with open(part, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_saved_index(index_path: Path, info_path: Path, expected_hash: str) -> Optional[faiss.Index]:
+    """해시가 일치하는 저장된 인덱스를 mmap으로 로드 (없거나 오래되었으면 None)"""
+    if not index_path.exists() or not info_path.exists():
+        return None
+    try:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            if json.load(f).get("content_hash") != expected_hash:
+                return None
+        return faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP)
+    except Exception as e:
+        print(f"⚠️ 저장된 인덱스 로드 실패, 다시 구축합니다: {e}")
+        return None
+
+
+def _write_saved_index(index_path: Path, info_path: Path, index: faiss.Index, info: Dict[str, Any]):
+    """인덱스와 해시 정보를 원자적으로 저장 (인덱스를 먼저 교체하고 해시 정보는 마지막에 기록)"""
+    tmp_index = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    faiss.write_index(index, str(tmp_index))
+    os.replace(tmp_index, index_path)
+
+    tmp_info = info_path.with_name(f"{info_path.name}.{os.getpid()}.tmp")
+    with open(tmp_info, 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_info, info_path)
+
+
+def load_or_build_index(stem: Path, fmt: str = "float32", metric: int = faiss.METRIC_INNER_PRODUCT,
+                        rows: Optional[Tuple[int, int]] = None, shard: Optional[str] = None,
+                        spec: Optional[Dict[str, Any]] = None, normalize: bool = False) -> Optional[faiss.Index]:
+    """저장된 인덱스가 원본과 같으면 mmap으로 로드하고, 아니면 구축 후 저장
+
+    rows=(start, end)를 주면 해당 행 구간만으로 인덱스를 만든다 (날짜 샤드, 인덱스 id는 구간 내 위치).
+    spec은 인덱스 종류와 파라미터 (index_spec, None이면 flat) - 구조 파라미터가 바뀌면 다시 구축한다.
+    normalize면 L2 정규화한 벡터로 구축한다 (코사인 검색, 정보 파일의 metric은 "cosine").
+    원본 파일이 없으면 None. float32 원본이 이전 형식 .pkl뿐이면 저장하지 않고 메모리에서만 구축한다.
+    """
+    stem = Path(stem)
+    sources = source_files(stem, fmt)
+    if not all(path.exists() for path in sources):
+        if fmt != "float32":
+            return None
+        matrix = load_vector_matrix(sources[0])
+        if matrix is not None and rows is not None:
+            matrix = matrix[rows[0]:rows[1]]
+        if matrix is None or not len(matrix):
+            return None
+        return build_index(matrix, fmt, metric=metric, spec=spec, normalize=normalize)
+
+    if fmt == "float32":
+        codes, scales = load_vector_matrix(sources[0]), None
+    else:
+        codes, scales = load_quantized(stem, fmt)
+    if rows is not None:
+        codes = codes[rows[0]:rows[1]]
+    if len(codes) == 0:
+        return None
+
+    # 전체 파일은 파일 내용, 샤드는 해당 행 구간의 내용으로 해시
+    hash_parts = sources if rows is None else [part for part in (codes, scales) if part is not None]
+    params = build_params(spec, *codes.shape)
+    if normalize:
+        params = dict(params, normalized=True)
+    expected_hash = content_hash(hash_parts, fmt=fmt, metric=int(metric), **params)
+    index_path, info_path = index_files(stem, shard)
+    index = _read_saved_index(index_path, info_path, expected_hash)
+    if index is not None:
+        configure_search(index, spec)
+        print(f"✅ 저장된 FAISS 인덱스 로드 (mmap): {index_path.name}, {index.ntotal}개 벡터")
+        return index
+
+    start = time.time()
+    index = build_index(codes, fmt, scales=scales, metric=metric, spec=spec, normalize=normalize)
+    try:
+        _write_saved_index(index_path, info_path, index, {
+            "content_hash": expected_hash,
+            "storage_format": fmt,
+            "index_type": params.get("type", "flat"),
+            "index_params": params,
+            "metric": metric_name(metric, normalize),
+            "rows": list(rows) if rows is not None else None,
+            "ntotal": int(index.ntotal),
+            "dimension": int(index.d),
+            "build_seconds": time.time() - start
+        })
+        print(f"💾 FAISS 인덱스 저장: {index_path.name} ({index.ntotal}개 벡터)")
+    except OSError as e:
+        print(f"⚠️ FAISS 인덱스 저장 실패 (다음 시작 시 다시 구축): {e}")
+    return index
+
+
+def bytes_per_vector(fmt: str, dimension: int) -> int:
+    """형식별 벡터 1개 저장 크기 (바이트)"""
+    return {"float32": 4 * dimension, "float16": 2 * dimension, "int8": dimension}[fmt]
+
+
+def compare_recall(matrix: np.ndarray, k: int = 10, n_queries: int = 200,
+                   metric: str = "cosine", seed: int = 0) -> List[Dict[str, Any]]:
+    """float32 정확 검색 대비 형식별 recall@k 비교
+
+    저장된 벡터 중 일부를 쿼리로 사용한다 (실제 쿼리도 같은 임베딩 공간의 벡터).
+    int8은 코사인 검색 전용이라 다른 거리 방식에서는 제외한다.
+    """
+    faiss_metric, normalize = METRICS[metric]
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    n, dimension = matrix.shape
+    k = min(k, n)
+    rng = np.random.default_rng(seed)
+    queries = np.array(matrix[rng.choice(n, size=min(n_queries, n), replace=False)])
+    if normalize:
+        faiss.normalize_L2(queries)
+
+    _, truth = build_index(matrix, "float32", metric=faiss_metric, normalize=normalize).search(queries, k)
+
+    report = []
+    for fmt in STORAGE_FORMATS:
+        if fmt == "float16":
+            codes, scales = matrix.astype(np.float16), None
+        elif fmt == "int8":
+            if not normalize:
+                continue
+            codes, scales = quantize_int8(matrix)
+        else:
+            codes, scales = matrix, None
+
+        start = time.time()
+        index = build_index(codes, fmt, scales=scales, metric=faiss_metric, normalize=normalize)
+        build_seconds = time.time() - start
+
+        start = time.time()
+        _, found = index.search(queries, k)
+        search_seconds = time.time() - start
+
+        hits = sum(len(set(truth[i]) & set(found[i])) for i in range(len(queries)))
+        report.append({
+            "format": fmt,
+            "recall_at_k": hits / (len(queries) * k) if k else 0.0,
+            "k": k,
+            "bytes_per_vector": bytes_per_vector(fmt, dimension),
+            "total_mb": bytes_per_vector(fmt, dimension) * n / 1024 / 1024,
+            "build_seconds": build_seconds,
+            "search_ms_per_query": search_seconds / len(queries) * 1000
+        })
+    return report
+
+
+if __name__ == "__main__":
+    # 사용법: python vector_storage.py [벡터 .npy 파일]
+    vectors_file = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent.parent / "vector_db" / "hybrid_vectors.npy"
+    vectors = load_vector_matrix(vectors_file)
+    if vectors is None:
+        print(f"❌ 벡터 파일을 찾을 수 없습니다: {vectors_file}")
+        sys.exit(1)
+
+    print(f"📊 저장 형식별 재현율 비교: {vectors_file.name} ({vectors.shape[0]}개 x {vectors.shape[1]}차원)")
+    for row in compare_recall(vectors):
+        print(f"  {row['format']:>8}: recall@{row['k']} {row['recall_at_k']:.4f}, "
+              f"{row['bytes_per_vector']}바이트/벡터 (총 {row['total_mb']:.1f}MB), "
+              f"검색 {row['search_ms_per_query']:.2f}ms/쿼리")